@@ -1,10 +1,19 @@
+from .analysis_frame import AnalysisFrame
+from .loa_accumulator import LoAAccumulator
+from .loa_out_of_core import loa_out_of_core
 from .loa_classic import loa_classic
+from .loa_cube import loa_cube
 from .loa_mixed_effect_model import loa_mixed_effect_model
 from .loa_regression_of_difference import loa_regression_of_difference
 from .loa_repeated_measurements import loa_repeated_measurements
 from .longitudinal_analysis import longitudinal_analysis
+from .longitudinal_cube import longitudinal_cube
+from .longitudinal_kernel import longitudinal_kernel
+from .longitudinal_per_cluster import longitudinal_per_cluster
+from .window_order import window_order
 from .extract_df_bias_loa import extract_df_bias_loa
 from .df_add_model_fits_residuals import df_add_model_fits_residuals
+from .df_from import df_from
 from .fig_bland_altman_plot import fig_bland_altman_plot
 from .fig_agreement_plot import fig_agreement_plot
 from .fig_time_series_plot import fig_time_series_plot
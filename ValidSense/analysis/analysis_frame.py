@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+class AnalysisFrame:
+    """
+    Compact struct-of-arrays container with the columns used by the limits of agreement analysis, as contiguous numpy
+    arrays. The dataframe is validated once at construction, so the loa_*, longitudinal_analysis and fig_* functions
+    skip their checks for missing values and work on the arrays instead of pandas indexing. Selecting rows with take()
+    is not validated again.
+    :param df: (pandas DataFrame) dataframe with column 'Mean' and 'Diff', and optionally 'Dev1' and 'Dev2'.
+    :param group_by: (str = None) cluster column, stored as integer codes in cluster and the labels in cluster_labels.
+    :param col_datetime: (str = None) column containing both date and time, stored in time as int64 nanoseconds since
+    the UNIX epoch.
+    """
+
+    __slots__ = ('diff', 'mean', 'dev1', 'dev2', 'cluster', 'cluster_labels', 'time', 'group_by', 'col_datetime')
+
+    def __init__(self, df: pd.DataFrame, group_by: str = None, col_datetime: str = None):
+
+        # warning
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+        if not isinstance(group_by, (str, type(None))):
+            raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+        if not isinstance(col_datetime, (str, type(None))):
+            raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str or NoneType")
+        if 'Diff' not in df.columns:
+            raise KeyError("Diff not existing in df")
+        if 'Mean' not in df.columns:
+            raise KeyError("Mean not existing in df")
+        if group_by is not None and group_by not in df.columns:
+            raise KeyError("group_by not existing in df")
+        if col_datetime is not None and col_datetime not in df.columns:
+            raise KeyError("col_datetime not existing in df")
+        if df['Diff'].isnull().values.any():
+            raise ValueError("Diff contains missing values")
+        if df['Mean'].isnull().values.any():
+            raise ValueError("Mean contains missing values")
+        if group_by is not None and df[group_by].isnull().values.any():
+            raise ValueError("group_by contains missing values")
+        if col_datetime is not None and df[col_datetime].isnull().values.any():
+            raise ValueError("col_datetime contains missing values")
+
+        self.diff = np.ascontiguousarray(df['Diff'].to_numpy(dtype=np.float64))
+        self.mean = np.ascontiguousarray(df['Mean'].to_numpy(dtype=np.float64))
+        self.dev1 = None
+        self.dev2 = None
+        if 'Dev1' in df.columns and pd.api.types.is_numeric_dtype(df['Dev1']):
+            self.dev1 = np.ascontiguousarray(df['Dev1'].to_numpy(dtype=np.float64))
+        if 'Dev2' in df.columns and pd.api.types.is_numeric_dtype(df['Dev2']):
+            self.dev2 = np.ascontiguousarray(df['Dev2'].to_numpy(dtype=np.float64))
+        self.group_by = group_by
+        self.col_datetime = col_datetime
+
+        # cluster codes, reused from preprocessing (see pre.df_sort_cluster) if available
+        if group_by is None:
+            self.cluster = None
+            self.cluster_labels = None
+        else:
+            codes = pre.cluster_codes(df=df, group_by=group_by)
+            if isinstance(codes, Exception):
+                raise codes
+            [self.cluster, self.cluster_labels] = codes
+            self.cluster = np.ascontiguousarray(self.cluster)
+
+        if col_datetime is None:
+            self.time = None
+        else:
+            self.time = np.ascontiguousarray(df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64))
+
+    def __len__(self):
+        return len(self.diff)
+
+    def take(self, index):
+        """
+        Function to select rows, without validating again.
+        :param index: (numpy array or slice) boolean mask, integer positions or slice of the rows.
+        :return: (AnalysisFrame) analysis frame with the selected rows.
+        """
+        af = object.__new__(AnalysisFrame)
+        for name in ['diff', 'mean', 'dev1', 'dev2', 'cluster', 'time']:
+            values = getattr(self, name)
+            setattr(af, name, values[index] if values is not None else None)
+        af.cluster_labels = self.cluster_labels
+        af.group_by = self.group_by
+        af.col_datetime = self.col_datetime
+        return af
+
+    def to_df(self):
+        """
+        Function to convert back to a dataframe, for functions that need pandas (statsmodels, plotly).
+        :return: (pandas DataFrame) dataframe with columns 'Diff', 'Mean', 'Dev1', 'Dev2', group_by and col_datetime if
+        available.
+        """
+        columns = {}
+        if self.dev1 is not None:
+            columns['Dev1'] = self.dev1
+        if self.dev2 is not None:
+            columns['Dev2'] = self.dev2
+        columns['Mean'] = self.mean
+        columns['Diff'] = self.diff
+        if self.group_by is not None:
+            columns[self.group_by] = pd.Series(self.cluster_labels[self.cluster]).infer_objects()
+        if self.col_datetime is not None:
+            columns[self.col_datetime] = self.time.view('datetime64[ns]')
+        return pd.DataFrame(columns)
@@ -0,0 +1,19 @@
+import pandas as pd
+from ValidSense import analysis
+
+
+def df_from(df):
+    """
+    Function to get a dataframe for the functions that need pandas (statsmodels, plotly): an AnalysisFrame is converted
+    back to a dataframe, see AnalysisFrame.to_df, a dataframe is returned as is.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe or analysis frame.
+    :return: (pandas DataFrame) dataframe.
+    """
+
+    # warning
+    if not isinstance(df, (pd.DataFrame, analysis.AnalysisFrame)):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame or AnalysisFrame")
+
+    if isinstance(df, analysis.AnalysisFrame):
+        return df.to_df()
+    return df
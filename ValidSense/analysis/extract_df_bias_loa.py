@@ -1,15 +1,32 @@
+import numpy as np
 import pandas as pd
+from ValidSense import analysis
 
 
-def extract_df_bias_loa(df: pd.DataFrame, df_bias_loa_time: pd.DataFrame, time_start: pd.Timestamp):
+def extract_df_bias_loa(df: pd.DataFrame, df_bias_loa_time: pd.DataFrame, time_start: pd.Timestamp = None,
+                        col_datetime: str = 'Datetime', window: int = None, window_mode: str = 'Time',
+                        group_by: str = None):
 
     """
     Function to extract bias and 95% LoA from df_bias_loa_time according to time_start. Moreover, filter df
-    based on time_start column in df.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    based on time_start column in df. Every window is the half-open interval [TimeStart, TimeEnd): rows at TimeEnd
+    belong to the next window. For the windows of a fixed number of measurements or clusters TimeEnd is 1 nanosecond
+    after the last measurement (the resolution of the time), so the interval ends at the last measurement. If
+    df_bias_loa_time has the row span of every window ('RowStart' and 'RowEnd' of analysis.longitudinal_analysis), the
+    rows of the window are selected by the span instead, so a window of measurements or clusters only holds its own
+    rows when other rows share its time.
+    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference, the
+    same rows as given to analysis.longitudinal_analysis.
     :param df_bias_loa_time: (pandas DataFrame) dataframe bias and limits of agreement for every step.
-    :param time_start: (pandas Timestamp) timestamp to extract.
-    :return: ([pandas DataFrame, str]) dataframe with statistics of the Longitudinal Analysis.
+    :param time_start: (pandas Timestamp = None) timestamp to extract, the first window that starts at time_start.
+    :param col_datetime: (str = 'Datetime') column containing both date and time, the rows from TimeStart up to but
+    not including TimeEnd of the window are selected.
+    :param window: (int = None) index of the window in df_bias_loa_time to extract instead of time_start, windows of
+    measurements can start at the same time.
+    :param window_mode: (str = 'Time') window_mode of analysis.longitudinal_analysis, for the row span.
+    :param group_by: (str = None) if window_mode is 'Clusters': rep_group_by of analysis.longitudinal_analysis.
+    :return: ([pandas DataFrame, pandas DataFrame]) dataframe with statistics of the Longitudinal Analysis, with the
+    slopes if df_bias_loa_time has column 'BiasSlope' (regression of difference), and the rows of df in the window.
     """
 
     # warning
@@ -17,26 +34,60 @@ def extract_df_bias_loa(df: pd.DataFrame, df_bias_loa_time: pd.DataFrame, time_s
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
     if not isinstance(df_bias_loa_time, pd.DataFrame):
         raise TypeError(f"df_bias_loa_time is of type {type(df_bias_loa_time).__name__}, should be pandas DataFrame")
-    if not isinstance(time_start, pd.Timestamp):
-        raise TypeError(f"time_start is of type {type(time_start).__name__}, should be pandas Timestamp")
+    if not isinstance(time_start, (pd.Timestamp, type(None))):
+        raise TypeError(f"time_start is of type {type(time_start).__name__}, should be pandas Timestamp or NoneType")
+    if not isinstance(col_datetime, str):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(window, (int, type(None))):
+        raise TypeError(f"window is of type {type(window).__name__}, should be int or NoneType")
+    if not isinstance(window_mode, str):
+        raise TypeError(f"window_mode is of type {type(window_mode).__name__}, should be str")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if time_start is None and window is None:
+        raise TypeError("time_start and window should not both be None")
+    if col_datetime not in df.columns:
+        raise KeyError("col_datetime not existing in df")
     if df_bias_loa_time.empty:
         raise Exception("df_bias_loa_time is empty")
 
     try:
-        # filter based on timebool
-        ind = df_bias_loa_time.index[df_bias_loa_time['TimeStart'] == time_start][
-            0]  # [0] to extract int instead of Int64Index
+        # window of time_start
+        if window is not None:
+            ind = window
+        else:
+            ind = df_bias_loa_time.index[df_bias_loa_time['TimeStart'] == time_start][
+                0]  # [0] to extract int instead of Int64Index
         df_bias_loa = pd.DataFrame(columns=['Bias', 'UpperLoA', 'LowerLoA'], index=['Intercept'])  # empty 1x3 dataframe
+        if 'BiasSlope' in df_bias_loa_time.columns:
+            df_bias_loa = pd.DataFrame(columns=['Bias', 'UpperLoA', 'LowerLoA'],
+                                       index=['Intercept', 'Slope'])  # empty 2x3 dataframe
 
         # save in df_bias_loa
-        df_bias_loa['Bias']['Intercept'] = df_bias_loa_time['Bias'][ind]
-        df_bias_loa['UpperLoA']['Intercept'] = df_bias_loa_time['UpperLoA'][ind]
-        df_bias_loa['LowerLoA']['Intercept'] = df_bias_loa_time['LowerLoA'][ind]
+        df_bias_loa.loc['Intercept', 'Bias'] = df_bias_loa_time['Bias'][ind]
+        df_bias_loa.loc['Intercept', 'UpperLoA'] = df_bias_loa_time['UpperLoA'][ind]
+        df_bias_loa.loc['Intercept', 'LowerLoA'] = df_bias_loa_time['LowerLoA'][ind]
+        if 'BiasSlope' in df_bias_loa_time.columns:
+            # regression of difference: the slopes of the window
+            df_bias_loa.loc['Slope', 'Bias'] = df_bias_loa_time['BiasSlope'][ind]
+            df_bias_loa.loc['Slope', 'UpperLoA'] = df_bias_loa_time['UpperLoASlope'][ind]
+            df_bias_loa.loc['Slope', 'LowerLoA'] = df_bias_loa_time['LowerLoASlope'][ind]
 
-        # filter df based on time window
-        df_filt = df.loc[df_bias_loa_time['TimeBoolean'][ind]]
+        if 'RowStart' in df_bias_loa_time.columns:
+            # filter df based on the row span of the window, in the order of df
+            result = analysis.window_order(df=df, col_datetime=col_datetime, window_mode=window_mode,
+                                           group_by=group_by)
+            if isinstance(result, Exception):
+                raise result
+            order = result[0]
+            df_filt = df.take(np.sort(order[df_bias_loa_time['RowStart'][ind]:df_bias_loa_time['RowEnd'][ind]]))
+        else:
+            # filter df based on time window, half-open [TimeStart, TimeEnd)
+            time_index = ((df[col_datetime] >= df_bias_loa_time['TimeStart'][ind]) &
+                          (df[col_datetime] < df_bias_loa_time['TimeEnd'][ind])).to_numpy()
+            df_filt = df.loc[time_index]
 
         return [df_bias_loa, df_filt]
 
     except Exception as e:
-        return e
\ No newline at end of file
+        return e
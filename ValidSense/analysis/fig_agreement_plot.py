@@ -24,13 +24,14 @@ size_label = 25
 size_tick = 25
 
 def fig_agreement_plot(df_bias_loa_time: pd.DataFrame, title_text = 'Agreement plot', xlabel: str = 'Time',
-                       ylabel: str = 'Difference'):
+                       ylabel: str = 'Difference', col_time: str = 'TimeStart'):
     """
     Function to make the agreement plot.
     :param df_bias_loa_time: (pandas DataFrame) dataframe with bias and limits of agreement statistics.
     :param title_text: (str = 'Agreement plot') title of the agreement plot.
     :param xlabel (str = 'Time') x label.
     :param ylabel (str = 'Difference') y label.
+    :param col_time: (str = 'TimeStart') column of the x-axis, 'Time' for the curve of analysis.longitudinal_kernel.
     :return: (plotly.graph_objs._figure.Figure) agreement plot figure.
     """
 
@@ -43,6 +44,10 @@ def fig_agreement_plot(df_bias_loa_time: pd.DataFrame, title_text = 'Agreement p
         raise TypeError(f"xlabel is of type {type(xlabel).__name__}, should be str")
     if not isinstance(ylabel, str):
         raise TypeError(f"ylabel is of type {type(ylabel).__name__}, should be str")
+    if not isinstance(col_time, str):
+        raise TypeError(f"col_time is of type {type(col_time).__name__}, should be str")
+    if col_time not in df_bias_loa_time.columns:
+        raise KeyError("col_time not existing in df_bias_loa_time")
 
     try:
         # filter df_bias_loa_time for saving figures in thesis
@@ -53,7 +58,7 @@ def fig_agreement_plot(df_bias_loa_time: pd.DataFrame, title_text = 'Agreement p
         fig = go.Figure()
         fig.add_trace(
             go.Scatter(
-                x=df_bias_loa_time['TimeStart'],
+                x=df_bias_loa_time[col_time],
                 y=df_bias_loa_time['UpperLoA'],
                 name="UpperLoA",
                 mode=mode,
@@ -64,7 +69,7 @@ def fig_agreement_plot(df_bias_loa_time: pd.DataFrame, title_text = 'Agreement p
         )
         fig.add_trace(
             go.Scatter(
-                x=df_bias_loa_time['TimeStart'],
+                x=df_bias_loa_time[col_time],
                 y=df_bias_loa_time['Bias'],
                 name="Bias",
                 mode=mode,
@@ -75,7 +80,7 @@ def fig_agreement_plot(df_bias_loa_time: pd.DataFrame, title_text = 'Agreement p
         )
         fig.add_trace(
             go.Scatter(
-                x=df_bias_loa_time['TimeStart'],
+                x=df_bias_loa_time[col_time],
                 y=df_bias_loa_time['LowerLoA'],
                 name="LowerLoA",
                 mode=mode,
@@ -2,6 +2,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from ValidSense import analysis, pre
 
 # variables
 height_text = 30            # height of text above line
@@ -28,7 +29,8 @@ def fig_bland_altman_plot(df: pd.DataFrame, df_bias_loa: pd.DataFrame, x: str =
                      heatmap_nbins: int = None, marginal: str = None, xlabel: str = 'Mean', ylabel: str = 'Difference'):
     """
     Function to make the Bland-Altman plot, based on the statistics in df or df_bias_loa.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param df_bias_loa: (pandas DataFrame) dataframe with bias and limits of agreement statistics.
     :param x: (str = 'Mean') x-axis.
     :param y: (str = 'Diff') y-axis.
@@ -42,6 +44,8 @@ def fig_bland_altman_plot(df: pd.DataFrame, df_bias_loa: pd.DataFrame, x: str =
     :return: (plotly.graph_objs._figure.Figure) Bland-Altman plot figure.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -79,9 +83,11 @@ def fig_bland_altman_plot(df: pd.DataFrame, df_bias_loa: pd.DataFrame, x: str =
     try:
         # group_color should be column of df
         if group_color is not None:
-            # sort by group_color
-            df.sort_values(by=[group_color], ascending=True, inplace=True)
-            df[group_color] = df[group_color].astype(str)
+            # sort by group_color, skipped when df is still in the order of preprocessing
+            result = pre.df_sort_cluster(df=df, group_by=group_color)
+            if isinstance(result, Exception):
+                raise result
+            [df, _] = result
 
         x_range = np.array([np.amin(df[x]), np.amax(df[x])])  # calculate the range of min/max x-values as np.array
 
@@ -157,7 +163,7 @@ def fig_bland_altman_plot(df: pd.DataFrame, df_bias_loa: pd.DataFrame, x: str =
                 y=y,
                 # hover_name='Sub',
                 hover_data=df.columns,
-                color=group_color,
+                color=df[group_color].astype(str) if group_color is not None else None,  # discrete colors, df unchanged
                 color_discrete_sequence=color_marker,
                 marginal_x=marginal,
                 marginal_y=marginal,
@@ -1,6 +1,7 @@
 import plotly.express as px
 import plotly.figure_factory as ff
 import pandas as pd
+from ValidSense import analysis
 
 # variables
 size_plot = [700, 500]      # width, height
@@ -14,13 +15,16 @@ def fig_histogram(df, column: str='Diff', number_bins: int = 0):
 
     """
     Function to visualize the distribution of column in a histogram figure.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param column: (str = 'Diff') extract the distribution of this column.
     :param number_bins: (int = 0) number of bins of histogram, if 0, plotly.express.histogram automatically define the
     number of bins.
     :return: (plotly.graph_objs._figure.Figure) histogram figure.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -3,6 +3,7 @@ from statsmodels.graphics.gofplots import qqplot
 import plotly.graph_objs as go
 import plotly.express as px
 import pandas as pd
+from ValidSense import analysis
 
 # source:
 # https://plotly.com/python/v3/normality-test/
@@ -20,7 +21,8 @@ size_tick = 25
 def fig_qq_plot(df, column: str = 'Diff', line: str = 's', fit: bool = True):
     """
     Function to create a probability distributions by plotting their quantiles against each other.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param column: (str = 'Diff') extract the distribution of this column.
     :param line: (str or None = 's') options for the reference line to which the data is compared: “45” - 45-degree
     line, “s” - standardized line, the expected order statistics are scaled by the standard deviation of the given
@@ -30,6 +32,8 @@ def fig_qq_plot(df, column: str = 'Diff', line: str = 's', fit: bool = True):
     :return: (plotly.graph_objs._figure.Figure) Q-Q plot figure.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -1,5 +1,6 @@
 import plotly.express as px
 import pandas as pd
+from ValidSense import analysis
 
 # variables
 size_plot = [700, 500]  # width, height
@@ -14,12 +15,15 @@ color_marker = px.colors.qualitative.Plotly
 def fig_residual_plot(df: pd.DataFrame, fits: str, residuals: str):
     """
     Function to create residual plot, with fitted values on the x-axis, residuals on the y-axis.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param fits: (str) fitted values of the regression model or mixed effect model
     :param residuals: (str) residuals of the regression model or mixed effect model
     :return: (plotly.graph_objs._figure.Figure) Residual plot with ordinary least squares trendline.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -1,6 +1,7 @@
 import plotly.express as px
 import pandas as pd
 import numpy as np
+from ValidSense import analysis, pre
 
 # variables
 size_plot = [700, 500]  # width, height
@@ -16,7 +17,8 @@ def fig_scatter_plot(df: pd.DataFrame, x: str = 'Mean', y: str = 'Diff', group_c
                      ylabel: str = 'Difference'):
     """
     Function to create a scatter plot.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param x: (str) x-axis
     :param y: (str) y-axis
     :param group_color: (str = None) column in df to group data by.
@@ -27,6 +29,8 @@ def fig_scatter_plot(df: pd.DataFrame, x: str = 'Mean', y: str = 'Diff', group_c
     :return: (plotly.graph_objs._figure.Figure) Scatter plot figure.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -54,8 +58,11 @@ def fig_scatter_plot(df: pd.DataFrame, x: str = 'Mean', y: str = 'Diff', group_c
     try:
         # group_color should be column of df
         if group_color is not None:
-            # sort by group_color
-            df.sort_values(by=[group_color], ascending=True, inplace=True)
+            # sort by group_color, skipped when df is still in the order of preprocessing
+            result = pre.df_sort_cluster(df=df, group_by=group_color)
+            if isinstance(result, Exception):
+                raise result
+            [df, _] = result
 
         fig = px.scatter(
             data_frame=df,
@@ -4,6 +4,7 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from ValidSense import analysis, pre
 
 # variables
 # mode = 'markers+lines'  # ['markers+lines', 'markers', 'lines']
@@ -40,7 +41,7 @@ def fig_time_series_plot(df: pd.DataFrame, x: str, y1: str = 'Dev1', y2: str = '
                     ):
     """
     Function to make a time series plot scatterplot with trendlines.
-    :param df: (pandas DataFrame) dataframe with all measurements
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with all measurements
     :param x: (str) x-axis indicating time.
     :param y1: (str = 'Dev1') y-axis Dev1.
     :param y2: (str = 'Dev2') y-axis Dev2.
@@ -57,6 +58,8 @@ def fig_time_series_plot(df: pd.DataFrame, x: str, y1: str = 'Dev1', y2: str = '
     :return: (plotly.graph_objs._figure.Figure) ) time series  figure of individual subjects with moving (median) average.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -102,32 +105,30 @@ def fig_time_series_plot(df: pd.DataFrame, x: str, y1: str = 'Dev1', y2: str = '
             df = df[df[x] >= filter_TimeStart]  # filter time start
             df = df[df[x] <= filter_TimeEnd]  # filter time end
 
+        # (cluster, time) order and cluster offsets, reused from preprocessing when df is still in that order
+        result = pre.df_sort_cluster(df=df, group_by=group_color, col_datetime=x)
+        if isinstance(result, Exception):
+            raise result
+        [df, offsets] = result
+
         if entry_bp != None:
-            # time relative to entry point
-            groups = df.groupby(group_color)  # group
-            time_relative = []  # empty list
-            for name, group in groups:  # loop through each group
-                timestamp_entry = group.loc[group['EntryBP'] == 1, x].iloc[0]  # find entryBP is 1
-                time_relative.extend(
-                    (group[x] - timestamp_entry).tolist())  # subtract timestamp_entry from timestamp
+            # time relative to entry point: first EntryBP of every cluster
             ColTimeRelativeEntryBP = 'TimeRelativeEntryBP'
-            df[ColTimeRelativeEntryBP] = pd.DataFrame(time_relative) + pd.to_datetime('1970/01/01') # add to df
-            df = df.sort_values([group_color, ColTimeRelativeEntryBP], ascending=[True, True])  # sort
+            df = pre.df_relative_time(df=df, group_by=group_color, col_datetime=x, col_anchor=entry_bp,
+                                      col_relative=ColTimeRelativeEntryBP)
+            if isinstance(df, Exception):
+                raise df
             xaxis=ColTimeRelativeEntryBP
         else:
             xaxis='Datetime'
-            df = df.sort_values([xaxis], ascending=True)  # sort
-
-        # median moving average
-        df_smoothed1 = df.groupby(group_color).apply(lambda x: x[y1].rolling(window_size_trendline, center=True).median())
-        df_smoothed2 = df.groupby(group_color).apply(lambda x: x[y2].rolling(window_size_trendline, center=True).median())
 
         # figure
         fig = make_subplots(specs=[[{"secondary_y": True}]])  # subplots with two y-axis
-        grouped_df = df.groupby(group_color)  # group
 
         count = 0  # count for colors
-        for name, group in grouped_df:
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            group = df.iloc[start:end]
+            name = group[group_color].iloc[0]
             if show_dev1:
                 # dots dev1
                 fig.add_trace(
@@ -147,17 +148,21 @@ def fig_time_series_plot(df: pd.DataFrame, x: str, y1: str = 'Dev1', y2: str = '
                     secondary_y=False,
                 )
             if show_dev1_trend:
-                # trendline dev1
+                # trendline dev1, median moving average
                 fig.add_trace(
-                    go.Scatter(x=group[xaxis], y=df_smoothed1[name].values, mode='lines',
+                    go.Scatter(x=group[xaxis],
+                               y=group[y1].rolling(window_size_trendline, center=True).median().values,
+                               mode='lines',
                                line=dict(color=color_marker[count], dash=line_dash[1], width=line_width),
                                name=f'{name} Trend {y1}'),
                     secondary_y=False,
                 )
             if show_dev2_trend:
-                # trendline dev2
+                # trendline dev2, median moving average
                 fig.add_trace(
-                    go.Scatter(x=group[xaxis], y=df_smoothed2[name].values, mode='lines',
+                    go.Scatter(x=group[xaxis],
+                               y=group[y2].rolling(window_size_trendline, center=True).median().values,
+                               mode='lines',
                                line=dict(color=color_marker[count], dash=line_dash[0], width=line_width),
                                name=f'{name} Trend {y2}'),
                     secondary_y=False,
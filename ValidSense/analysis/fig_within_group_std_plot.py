@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from ValidSense import analysis
 
 size_plot = [700, 700]  # [width, height]
 spac = [1, 5]  # additional spacing: [x_axis_range, y_axis_range]
@@ -13,11 +14,14 @@ color_marker = px.colors.qualitative.Plotly
 def fig_within_group_std_plot(df: pd.DataFrame, group: str):
     """
     Function to create the within-group standard deviation plot.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param group: (str) column in df to group by.
     :return: (plotly.graph_objs._figure.Figure) Within-Group Std plot figure.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
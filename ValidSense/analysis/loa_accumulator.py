@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+
+def _merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """
+    Function to merge the count, mean and sum of squared deviations of two sets (Chan et al.), elementwise for arrays.
+    :return: ([numpy array, numpy array, numpy array]) count, mean and sum of squared deviations of the union.
+    """
+    n = n_a + n_b
+    n_div = np.maximum(n, 1)    # empty sets stay empty instead of dividing by zero
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n_div
+    m2 = m2_a + m2_b + np.square(delta) * n_a * n_b / n_div
+    return [n, mean, m2]
+
+
+class LoAAccumulator:
+    """
+    Streaming and mergeable accumulator of the difference, for data that does not fit in memory or is processed by
+    several workers. It keeps the count, mean and sum of squared deviations (Welford) of all differences and of every
+    cluster. Chunks are added with update(), accumulators of other chunks, files or workers with merge(), and
+    loa_classic() and loa_repeated_measurements() give the same statistics as analysis.loa_classic and
+    analysis.loa_repeated_measurements on all data at once.
+    """
+
+    __slots__ = ('n', 'mean', 'm2', 'cluster_labels', 'cluster_n', 'cluster_mean', 'cluster_m2', '_cluster_index')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.cluster_labels = []                            # label of every cluster, in order of appearance
+        self.cluster_n = np.zeros(0, dtype=np.int64)
+        self.cluster_mean = np.zeros(0, dtype=np.float64)
+        self.cluster_m2 = np.zeros(0, dtype=np.float64)
+        self._cluster_index = {}                            # label to position in the cluster arrays
+
+    def _add_clusters(self, labels: list, n, mean, m2):
+        """
+        Function to merge the moments of clusters into the cluster arrays, new clusters are appended.
+        """
+        index = np.empty(len(labels), dtype=np.int64)
+        for i, label in enumerate(labels):
+            if label not in self._cluster_index:
+                self._cluster_index[label] = len(self.cluster_labels)
+                self.cluster_labels.append(label)
+            index[i] = self._cluster_index[label]
+        count_new = len(self.cluster_labels) - len(self.cluster_n)
+        if count_new > 0:
+            self.cluster_n = np.concatenate([self.cluster_n, np.zeros(count_new, dtype=np.int64)])
+            self.cluster_mean = np.concatenate([self.cluster_mean, np.zeros(count_new)])
+            self.cluster_m2 = np.concatenate([self.cluster_m2, np.zeros(count_new)])
+        [self.cluster_n[index], self.cluster_mean[index], self.cluster_m2[index]] = _merge_moments(
+            self.cluster_n[index], self.cluster_mean[index], self.cluster_m2[index], n, mean, m2)
+
+    @classmethod
+    def from_sums(cls, n, sum_diff, sum_diff2, cluster_labels: list = None, shift: float = 0.0):
+        """
+        Function to create an accumulator from the number of measurements and the sums of Diff and Diff^2 of every
+        cluster, for example of pre.df_cube.
+        :param n: (numpy array) number of measurements of every cluster.
+        :param sum_diff: (numpy array) sum of the difference of every cluster.
+        :param sum_diff2: (numpy array) sum of the squared difference of every cluster.
+        :param cluster_labels: (list = None) label of every cluster, None if the sums have no clusters.
+        :param shift: (float = 0.0) value subtracted from the difference before summing, to reduce rounding of the sum
+        of squares.
+        :return: (LoAAccumulator) accumulator with the moments of the sums.
+        """
+        accumulator = cls()
+        n = np.asarray(n, dtype=np.int64)
+        sum_diff = np.asarray(sum_diff, dtype=np.float64)
+        sum_diff2 = np.asarray(sum_diff2, dtype=np.float64)
+        n_div = np.maximum(n, 1)
+        # sum of squared deviations from the sums, not below zero because of rounding
+        m2 = np.maximum(sum_diff2 - np.square(sum_diff) / n_div, 0)
+        if cluster_labels is not None:
+            accumulator._add_clusters(labels=list(cluster_labels), n=n, mean=sum_diff / n_div + shift, m2=m2)
+        accumulator.n = int(np.sum(n))
+        if accumulator.n > 0:
+            accumulator.mean = float(np.sum(sum_diff) / accumulator.n) + shift
+            accumulator.m2 = float(max(np.sum(sum_diff2) - np.square(np.sum(sum_diff)) / accumulator.n, 0))
+        return accumulator
+
+    def update(self, diff, cluster=None):
+        """
+        Function to add a chunk of differences. Missing differences are skipped.
+        :param diff: (numpy array or pandas Series) difference of the chunk.
+        :param cluster: (numpy array or pandas Series = None) cluster of every difference, needed for
+        loa_repeated_measurements(). Rows with a missing cluster are skipped.
+        :return: (LoAAccumulator) the accumulator itself.
+        """
+        diff = np.asarray(diff, dtype=np.float64)
+        valid = ~np.isnan(diff)
+        if cluster is not None:
+            codes, uniques = pd.factorize(np.asarray(cluster))
+            if len(codes) != len(diff):
+                raise ValueError("diff and cluster should have the same length")
+            valid &= codes >= 0
+            codes = codes[valid]
+        diff = diff[valid]
+        if len(diff) == 0:
+            return self
+
+        # moments of the chunk, merged into the moments of all differences
+        mean_chunk = np.mean(diff)
+        [self.n, self.mean, self.m2] = _merge_moments(
+            self.n, self.mean, self.m2, len(diff), mean_chunk, np.sum(np.square(diff - mean_chunk)))
+
+        # moments of every cluster in the chunk, merged into the moments of the clusters
+        if cluster is not None:
+            n = np.bincount(codes, minlength=len(uniques))
+            mean = np.bincount(codes, weights=diff, minlength=len(uniques)) / np.maximum(n, 1)
+            m2 = np.bincount(codes, weights=np.square(diff - mean[codes]), minlength=len(uniques))
+            self._add_clusters(labels=list(uniques), n=n, mean=mean, m2=m2)
+        return self
+
+    def merge(self, other):
+        """
+        Function to add the differences of another accumulator, for example of another file or worker.
+        :param other: (LoAAccumulator) accumulator to add.
+        :return: (LoAAccumulator) the accumulator itself.
+        """
+        if not isinstance(other, LoAAccumulator):
+            raise TypeError(f"other is of type {type(other).__name__}, should be LoAAccumulator")
+        [self.n, self.mean, self.m2] = _merge_moments(self.n, self.mean, self.m2, other.n, other.mean, other.m2)
+        if len(other.cluster_labels) > 0:
+            self._add_clusters(labels=other.cluster_labels, n=other.cluster_n, mean=other.cluster_mean,
+                               m2=other.cluster_m2)
+        return self
+
+    def loa_classic(self):
+        """
+        Function to calculate the classic limits of agreement statistics, see analysis.loa_classic.
+        :return: ([pandas DataFrame, str]) dataframe with classic limits of agreement analysis statistics and their
+        assumptions.
+        """
+        assumptions = [
+            True,  # Assumption 0: Normal distribution of the difference
+            True,  # Assumption 1: Constant agreement over the measurement range
+            True,  # Assumption 2: Independent observations
+            False, # Assumption 3: Within-cluster-SD independent of cluster-mean
+            False, # Assumption 4: Normal distribution of residuals
+            False, # Assumption 5: Homogeneity of residuals
+            False, # Assumption 6: Exogeneity of fixed effects.
+        ]
+
+        df_bias_loa = pd.DataFrame(columns=['Bias', 'UpperLoA', 'LowerLoA'], index=['Intercept'])  # empty 1x3 dataframe
+        z = 1.96                    # z-score of the 95% estimated interval assuming a normal distribution of diff
+        b0 = self.mean if self.n > 0 else np.nan
+        std = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+        g0 = std * z
+
+        # save in df_bias_loa
+        df_bias_loa.loc['Intercept', 'Bias'] = b0
+        df_bias_loa.loc['Intercept', 'UpperLoA'] = b0 + g0
+        df_bias_loa.loc['Intercept', 'LowerLoA'] = b0 - g0
+        df_bias_loa['Std'] = std
+
+        return [df_bias_loa, assumptions]
+
+    def loa_repeated_measurements(self, group_by: str = 'Sub'):
+        """
+        Function to calculate the repeated measurements limits of agreement statistics from the moments of every
+        cluster, see analysis.loa_repeated_measurements.
+        :param group_by: (str = 'Sub') name of the cluster in the columns of the statistics.
+        :return: ([pandas DataFrame, str, NoneType]) dataframe with repeated (multiple observations per subject)
+        limits of agreement analysis statistics, assumptions and no model.
+        """
+        assumptions = [
+            True,  # Assumption 0: Normal distribution of the difference
+            True,  # Assumption 1: Constant agreement over the measurement range
+            False, # Assumption 2: Independent observations
+            True,  # Assumption 3: Within-cluster-SD independent of cluster-mean
+            False, # Assumption 4: Normal distribution of residuals
+            False, # Assumption 5: Homogeneity of residuals
+            False, # Assumption 6: Exogeneity of fixed effects.
+        ]
+
+        df_bias_loa = pd.DataFrame(columns=['Bias', 'UpperLoA', 'LowerLoA'], index=['Intercept'])  # empty 1x3 dataframe
+        obs_group = self.cluster_n[self.cluster_n > 0]  # observations per group (sub)
+        obs_sub = len(obs_group)  # number of subjects
+        obs_tot = int(np.sum(obs_group))  # total number of observations
+
+        if obs_sub < 2 or obs_sub >= obs_tot:
+            df_bias_loa.loc['Intercept', 'Bias'] = np.nan
+            df_bias_loa.loc['Intercept', 'UpperLoA'] = np.nan
+            df_bias_loa.loc['Intercept', 'LowerLoA'] = np.nan
+            print("Warning: Statistics of the Repeated Measurements can not be calculated. More than one subject and "
+                  "more items per group should be included in the data.")
+            return [df_bias_loa, assumptions, None]
+
+        z = 1.96  # z-score of the 95% estimated interval assuming a normal distribution of diff
+        b0 = self.mean
+
+        # one-way ANOVA from the moments of every group (sub)
+        filled = self.cluster_n > 0
+        MS_Sub = np.sum(self.cluster_n[filled] * np.square(self.cluster_mean[filled] - b0)) / (obs_sub - 1)
+        MS_Res = np.sum(self.cluster_m2[filled]) / (obs_tot - obs_sub)
+        obs_group_sq = np.sum(np.square(obs_group.astype(np.float64)))  # observation per group squared (sum(m^2,i)
+        div = (np.square(float(obs_tot)) - obs_group_sq) / \
+              ((obs_sub - 1) * obs_tot)  # divisor to corrected for heterogeneity
+        var_within_sub = MS_Res  # within subject variance
+        var_between_sub = (MS_Sub - MS_Res) / div  # between subject variance
+        std = np.sqrt((MS_Sub - MS_Res) / div + MS_Res)  # std corrected for repeated measurements
+        g0 = std * z
+
+        # save in df_bias_loa
+        df_bias_loa.loc['Intercept', 'Bias'] = b0
+        df_bias_loa.loc['Intercept', 'UpperLoA'] = b0 + g0
+        df_bias_loa.loc['Intercept', 'LowerLoA'] = b0 - g0
+        df_bias_loa['Between-'+group_by+'-var'] = var_between_sub
+        df_bias_loa['Within-'+group_by+'-var'] = var_within_sub
+        df_bias_loa['Between-'+group_by+'-std'] = np.sqrt(var_between_sub)
+        df_bias_loa['Within-'+group_by+'-std'] = np.sqrt(var_within_sub)
+        df_bias_loa['Total-std'] = std
+
+        return [df_bias_loa, assumptions, None]
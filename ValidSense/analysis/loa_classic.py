@@ -1,27 +1,30 @@
 import pandas as pd
 import numpy as np
+from ValidSense import analysis
 
 
-def loa_classic(df: pd.DataFrame):
+def loa_classic(df):
     """
     Function to calculate the bias and limits of agreement statistics according to the classic limits of agreement
     analysis, see https://pubmed.ncbi.nlm.nih.gov/2868172/.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference. An AnalysisFrame is already validated.
     :return: ([pandas DataFrame, str]) dataframe with classic limits of agreement analysis statistics and their
     assumptions.
     """
 
     # warning
-    if not isinstance(df, pd.DataFrame):
-        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
-    if 'Diff' not in df.columns:
-        raise KeyError("Diff not existing in df")
-    if 'Mean' not in df.columns:
-        raise KeyError("Mean not existing in df")
-    if df['Diff'].isnull().values.any():
-        raise ValueError("Diff contains missing values")
-    if df['Mean'].isnull().values.any():
-        raise ValueError("Mean contains missing values")
+    if not isinstance(df, (pd.DataFrame, analysis.AnalysisFrame)):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame or AnalysisFrame")
+    if isinstance(df, pd.DataFrame):
+        if 'Diff' not in df.columns:
+            raise KeyError("Diff not existing in df")
+        if 'Mean' not in df.columns:
+            raise KeyError("Mean not existing in df")
+        if df['Diff'].isnull().values.any():
+            raise ValueError("Diff contains missing values")
+        if df['Mean'].isnull().values.any():
+            raise ValueError("Mean contains missing values")
 
     assumptions = [
         True,  # Assumption 0: Normal distribution of the difference
@@ -40,8 +43,9 @@ def loa_classic(df: pd.DataFrame):
         z = 1.96                    # z-score of the 95% estimated interval assuming a normal distribution of diff
 
         # bias
-        b0 = np.mean(df['Diff'])    # mean of difference
-        std = np.std(df['Diff'], ddof=1)    # standard deviation of difference
+        diff = df.diff if isinstance(df, analysis.AnalysisFrame) else df['Diff']
+        b0 = np.mean(diff)          # mean of difference
+        std = np.std(diff, ddof=1)  # standard deviation of difference
 
         # limits of agreement
         g0 = std * z
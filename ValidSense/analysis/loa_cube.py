@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from ValidSense import analysis
+
+
+def loa_cube(df_cube: pd.DataFrame, loa_subtype: str = 'Classic', group_by: str = None, clusters: list = None,
+             time_start: pd.Timestamp = None, time_end: pd.Timestamp = None):
+    """
+    Function to calculate the limits of agreement of a subset of clusters and time buckets from the cube of sufficient
+    statistics of pre.df_cube, without the measurements. The statistics equal those of analysis.loa_classic,
+    analysis.loa_repeated_measurements and analysis.loa_regression_of_difference (bias_order=1, loa_order=0) on the
+    measurements of the subset, up to rounding. 'Regression of difference' needs at least three measurements and
+    different Mean values.
+    :param df_cube: (pandas DataFrame) cube of pre.df_cube.
+    :param loa_subtype: (str = 'Classic') 'Classic', 'Repeated measurements' or 'Regression of difference' (linear
+    bias and constant limits of agreement).
+    :param group_by: (str = None) cluster column of the cube, needed for 'Repeated measurements' and clusters.
+    :param clusters: (list = None) clusters to include, None includes all clusters.
+    :param time_start: (pandas Timestamp = None) include the buckets that start at or after time_start.
+    :param time_end: (pandas Timestamp = None) include the buckets that start before time_end.
+    :return: ([pandas DataFrame, str]) dataframe with limits of agreement analysis statistics and their assumptions.
+    """
+
+    subtypes = [
+        "Classic",
+        "Repeated measurements",
+        "Regression of difference",
+    ]
+
+    # warning
+    if not isinstance(df_cube, pd.DataFrame):
+        raise TypeError(f"df_cube is of type {type(df_cube).__name__}, should be pandas DataFrame")
+    if not isinstance(loa_subtype, str):
+        raise TypeError(f"loa_subtype is of type {type(loa_subtype).__name__}, should be str")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if not isinstance(clusters, (list, type(None))):
+        raise TypeError(f"clusters is of type {type(clusters).__name__}, should be list or NoneType")
+    if loa_subtype not in subtypes:
+        raise KeyError("loa_subtype should be of type 'Classic', 'Repeated measurements' or 'Regression of difference'")
+    if (loa_subtype == 'Repeated measurements' or clusters is not None) and group_by is None:
+        raise TypeError("group_by should not be None")
+    if group_by is not None and group_by not in df_cube.columns:
+        raise KeyError("group_by not existing in df_cube")
+    for col in ['TimeBucket', 'N', 'SumDiff', 'SumDiff2', 'SumMean', 'SumMean2', 'SumMeanDiff']:
+        if col not in df_cube.columns:
+            raise KeyError(f"{col} not existing in df_cube")
+
+    try:
+        # the sums of the cube are of the shifted Diff and Mean, see pre.df_cube
+        shift_diff = df_cube.attrs.get('cube', {}).get('shift_diff', 0.0)
+        shift_mean = df_cube.attrs.get('cube', {}).get('shift_mean', 0.0)
+
+        # cells of the subset
+        mask = np.ones(len(df_cube), dtype=bool)
+        if clusters is not None:
+            mask &= df_cube[group_by].isin(clusters).to_numpy()
+        if time_start is not None:
+            mask &= (df_cube['TimeBucket'] >= time_start).to_numpy()
+        if time_end is not None:
+            mask &= (df_cube['TimeBucket'] < time_end).to_numpy()
+        cells = np.flatnonzero(mask)
+
+        if loa_subtype == 'Classic':
+            accumulator = analysis.LoAAccumulator.from_sums(
+                n=[df_cube['N'].to_numpy()[cells].sum()],
+                sum_diff=[df_cube['SumDiff'].to_numpy()[cells].sum()],
+                sum_diff2=[df_cube['SumDiff2'].to_numpy()[cells].sum()],
+                shift=shift_diff,
+            )
+            return accumulator.loa_classic()
+
+        elif loa_subtype == 'Repeated measurements':
+            # sums of every cluster over the buckets of the subset
+            codes, uniques = pd.factorize(df_cube[group_by].to_numpy()[cells])
+            accumulator = analysis.LoAAccumulator.from_sums(
+                n=np.bincount(codes, weights=df_cube['N'].to_numpy()[cells], minlength=len(uniques)),
+                sum_diff=np.bincount(codes, weights=df_cube['SumDiff'].to_numpy()[cells], minlength=len(uniques)),
+                sum_diff2=np.bincount(codes, weights=df_cube['SumDiff2'].to_numpy()[cells], minlength=len(uniques)),
+                cluster_labels=list(uniques),
+                shift=shift_diff,
+            )
+            [df_bias_loa, assumptions, _] = accumulator.loa_repeated_measurements(group_by=group_by)
+            return [df_bias_loa, assumptions]
+
+        elif loa_subtype == 'Regression of difference':
+            assumptions = [
+                True,  # Assumption 0: Normal distribution of the difference
+                False, # Assumption 1: Constant agreement over the measurement range
+                True,  # Assumption 2: Independent observations
+                False, # Assumption 3: Within-cluster-SD independent of cluster-mean
+                True,  # Assumption 4: Normal distribution of residuals
+                True,  # Assumption 5: Homogeneity of residuals
+                False, # Assumption 6: Exogeneity of fixed effects.
+            ]
+            df_bias_loa = pd.DataFrame(columns=['Bias', 'UpperLoA', 'LowerLoA'],
+                                       index=['Intercept', 'Slope'])  # empty 2x3 dataframe
+            z = 1.96  # z-score of the 95% estimated interval assuming a normal distribution of diff
+            [n, s_d, s_dd, s_m, s_mm, s_md] = [df_cube[col].to_numpy()[cells].sum() for col in
+                                               ['N', 'SumDiff', 'SumDiff2', 'SumMean', 'SumMean2', 'SumMeanDiff']]
+
+            # ordinary least squares of Diff ~ Mean from the sums
+            s_xx = s_mm - s_m ** 2 / n      # sum of squared deviations of the mean
+            s_xy = s_md - s_m * s_d / n     # sum of cross deviations
+            s_yy = s_dd - s_d ** 2 / n      # sum of squared deviations of the difference
+            if n <= 2:
+                raise ValueError("Regression of difference needs at least three measurements")
+            if s_xx <= 1e-12 * s_mm:
+                raise ValueError("Regression of difference needs different values of Mean")
+            b1 = s_xy / s_xx
+            b0 = s_d / n + shift_diff - b1 * (s_m / n + shift_mean)
+            std = np.sqrt(max(s_yy - b1 * s_xy, 0) / (n - 2))  # deviation of diff around bias
+            g0 = std * z
+
+            # save in df_bias_loa
+            df_bias_loa.loc['Intercept', 'Bias'] = b0
+            df_bias_loa.loc['Intercept', 'UpperLoA'] = b0 + g0
+            df_bias_loa.loc['Intercept', 'LowerLoA'] = b0 - g0
+            df_bias_loa.loc['Slope', 'Bias'] = b1
+            df_bias_loa.loc['Slope', 'UpperLoA'] = b1
+            df_bias_loa.loc['Slope', 'LowerLoA'] = b1
+            df_bias_loa['SD-residuals-bias-model'] = [std, None]
+
+            return [df_bias_loa, assumptions]
+
+    except Exception as e:
+        return e
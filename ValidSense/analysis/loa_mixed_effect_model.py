@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 import statsmodels.formula.api as smf
 import warnings
+from ValidSense import analysis
 #
 def loa_mixed_effect_model(df: pd.DataFrame, bias_fixed_variable: list, bias_random_variable: list,
                            loa_fixed_variable: list, loa_random_variable: list):
@@ -9,7 +10,8 @@ def loa_mixed_effect_model(df: pd.DataFrame, bias_fixed_variable: list, bias_ran
     Function to calculate the bias, limits of agreement and standard deviation statistics according to the mixed effect
     model limits of agreement analysis. This subtype corrects for different fixed and random effects in both bias and
     limits of agreement, see https://pubmed.ncbi.nlm.nih.gov/27973556/.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param bias_fixed_variable: (list) list with fixed effects for bias.
     :param bias_random_variable: (list) list with random effects for bias.
     :param loa_fixed_variable: (list) list with fixed effects for loa.
@@ -19,6 +21,8 @@ def loa_mixed_effect_model(df: pd.DataFrame, bias_fixed_variable: list, bias_ran
     agreement analysis statistics, their assumptions, and model properties of bias and 95% LoA.
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+from ValidSense import analysis, pre
+
+
+def _iter_chunks(path: str, columns: list, chunksize: int, sep: str):
+    """
+    Function to read a CSV or Parquet file in chunks of at most chunksize rows with only the needed columns.
+    :param path: (str) path of the CSV or Parquet file.
+    :param columns: (list) columns to read.
+    :param chunksize: (int) number of rows per chunk.
+    :param sep: (str) delimiter of the CSV file.
+    :return: (generator) pandas DataFrame for every chunk.
+    """
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq    # only needed for Parquet
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, sep=sep, usecols=columns, chunksize=chunksize)
+
+
+def _histogram(counts: dict, bin_width: float):
+    """
+    Function to convert the counts per bin number to a dataframe, bin i covers [i * bin_width, (i + 1) * bin_width).
+    :return: (pandas DataFrame) dataframe with columns 'BinStart', 'BinEnd' and 'Counts'.
+    """
+    bins = np.array(sorted(counts), dtype=np.int64)
+    return pd.DataFrame({
+        'BinStart': bins * bin_width,
+        'BinEnd': (bins + 1) * bin_width,
+        'Counts': np.array([counts[b] for b in bins], dtype=np.int64),
+    })
+
+
+def loa_out_of_core(path, test_device: str, ref_device: str, group_by: str = None, chunksize: int = 1000000,
+                    bin_width: float = 1.0, sep: str = ';'):
+    """
+    Function to calculate the limits of agreement of CSV or Parquet files that do not fit in memory, without
+    Streamlit. The files are read in chunks with only the device (and cluster) columns, the mean and difference of
+    every chunk go into an analysis.LoAAccumulator and into histograms with fixed bins, and the chunk is released. The
+    memory is bounded by chunksize and the number of clusters and bins, not by the number of rows.
+    :param path: (str or list) path of a CSV or Parquet (.parquet) file, or a list of paths.
+    :param test_device: (str) column of the Test device.
+    :param ref_device: (str) column of the Reference device.
+    :param group_by: (str = None) cluster column for the repeated measurements limits of agreement.
+    :param chunksize: (int = 1000000) number of rows per chunk.
+    :param bin_width: (float = 1.0) width of the histogram bins of the difference and mean, bins start at multiples of
+    bin_width.
+    :param sep: (str = ';') delimiter of the CSV files.
+    :return: ([pandas DataFrame, pandas DataFrame, pandas DataFrame, pandas DataFrame, pandas DataFrame]) classic
+    limits of agreement statistics, repeated measurements limits of agreement statistics (None if group_by is None),
+    histogram of the difference, histogram of the mean (columns 'BinStart', 'BinEnd' and 'Counts') and dataframe with
+    the counts of the measurements that are read and removed because of missing values.
+    """
+
+    # warning
+    if not isinstance(path, (str, list)):
+        raise TypeError(f"path is of type {type(path).__name__}, should be str or list")
+    if not isinstance(test_device, str):
+        raise TypeError(f"test_device is of type {type(test_device).__name__}, should be str")
+    if not isinstance(ref_device, str):
+        raise TypeError(f"ref_device is of type {type(ref_device).__name__}, should be str")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if not isinstance(chunksize, int):
+        raise TypeError(f"chunksize is of type {type(chunksize).__name__}, should be int")
+    if not isinstance(bin_width, (int, float)):
+        raise TypeError(f"bin_width is of type {type(bin_width).__name__}, should be float")
+    if chunksize <= 0:
+        raise ValueError("chunksize is not a positive number")
+    if bin_width <= 0:
+        raise ValueError("bin_width is not a positive number")
+
+    try:
+        paths = [path] if isinstance(path, str) else path
+        columns = [test_device, ref_device] + ([group_by] if group_by is not None else [])
+        accumulator = analysis.LoAAccumulator()
+        counts_diff = {}    # counts per bin number of the difference
+        counts_mean = {}    # counts per bin number of the mean
+        counts_read = 0
+        counts_missing = 0
+
+        for file in paths:
+            for chunk in _iter_chunks(path=file, columns=columns, chunksize=chunksize, sep=sep):
+                counts_read += len(chunk)
+
+                # remove missing values, then the mean and difference of the chunk
+                valid = chunk[columns].notna().all(axis=1).to_numpy()
+                counts_missing += int(np.count_nonzero(~valid))
+                chunk = pre.df_diff_mean(df=chunk.take(np.flatnonzero(valid)), test_device=test_device,
+                                         ref_device=ref_device)
+                if isinstance(chunk, Exception):
+                    raise chunk
+
+                # moments of the difference, overall and per cluster
+                accumulator.update(diff=chunk['Diff'], cluster=chunk[group_by] if group_by is not None else None)
+
+                # histograms with fixed bins, so the counts of every chunk can be added
+                for counts, column in [(counts_diff, 'Diff'), (counts_mean, 'Mean')]:
+                    bins, counts_bin = np.unique(np.floor(chunk[column].to_numpy() / bin_width).astype(np.int64),
+                                                 return_counts=True)
+                    for b, c in zip(bins.tolist(), counts_bin.tolist()):
+                        counts[b] = counts.get(b, 0) + c
+
+        [df_bias_loa_classic, _] = accumulator.loa_classic()
+        if group_by is not None:
+            [df_bias_loa_repeated, _, _] = accumulator.loa_repeated_measurements(group_by=group_by)
+        else:
+            df_bias_loa_repeated = None
+
+        counts = np.array([counts_read, counts_missing])
+        df_counts = pd.DataFrame(
+            {'Counts': counts, 'Percentage': np.round(counts / max(counts_read, 1) * 100, 1)},
+            index=["Measurements read", "Missing measurements"],
+        )
+
+        return [df_bias_loa_classic, df_bias_loa_repeated, _histogram(counts_diff, bin_width),
+                _histogram(counts_mean, bin_width), df_counts]
+
+    except Exception as e:
+        return e
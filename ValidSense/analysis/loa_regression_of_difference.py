@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import statsmodels.formula.api as smf
+from ValidSense import analysis
 # from pymer4.models import Lm
 
 
@@ -9,7 +10,8 @@ def loa_regression_of_difference(df: pd.DataFrame, bias_order: int = 0, loa_orde
     Function to calculate the bias and limits of agreement statistics according to the regression of difference
     limits of agreement analysis. This subtype corrects for systematic relationship between difference and mean, see
     https://pubmed.ncbi.nlm.nih.gov/10501650/ (section 3.2).
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference.
     :param bias_order: (int = 0) order of equation for bias. 0 is horizontal bias, 1 is linear bias.
     :param loa_order: (int = 0) order of equation for limits of agreement. 0 is horizontal limits of agreement, 1 is
     linear limits of agreement.
@@ -19,6 +21,8 @@ def loa_regression_of_difference(df: pd.DataFrame, bias_order: int = 0, loa_orde
     respectively loa_order, is set to 1).
     """
 
+    df = analysis.df_from(df)
+
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -1,37 +1,45 @@
 import pandas as pd
 import numpy as np
 from bioinfokit.analys import stat
+from scipy import stats
+from ValidSense import analysis, pre
 
-def loa_repeated_measurements(df: pd.DataFrame, group_by: str = 'Sub'):
+def loa_repeated_measurements(df, group_by: str = 'Sub'):
 
     """
     Function to calculate the bias and limits of agreement statistics according to the repeated measurements (multiple
     observations per subject) limits of agreement analysis. This subtype corrects for multiple observations per
     subject, see https://pubmed.ncbi.nlm.nih.gov/10501650/ (section 5.2) and https://pubmed.ncbi.nlm.nih.gov/17613642/
     (section 3).
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference. An AnalysisFrame is already validated and its one-way ANOVA is calculated from the cluster codes, the
+    model then only contains the ANOVA table (anova_summary).
     :param group_by: (str= 'Sub') column in dataframe where multiple subjects are grouped by.
     :return: ([pandas DataFrame, str, bioinfokit analys stat]) dataframe with repeated (multiple observations per
     subject) limits of agreement analysis statistics, assumptions and model.
     """
 
     # warning
-    if not isinstance(df, pd.DataFrame):
-        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(df, (pd.DataFrame, analysis.AnalysisFrame)):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame or AnalysisFrame")
     if not isinstance(group_by, str):
         raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str")
-    if 'Diff' not in df.columns:
-        raise KeyError("Diff not existing in df")
-    if 'Mean' not in df.columns:
-        raise KeyError("Mean not existing in df")
-    if group_by not in df.columns:
-        raise KeyError("group_by not existing in df.")
-    if df['Diff'].isnull().values.any():
-        raise ValueError("Diff contains missing values")
-    if df['Mean'].isnull().values.any():
-        raise ValueError("Mean contains missing values")
-    if df[group_by].isnull().values.any():
-        raise ValueError("group_by contains missing values")
+    if isinstance(df, analysis.AnalysisFrame):
+        if df.group_by != group_by:
+            raise KeyError("group_by is not the cluster of the AnalysisFrame")
+    else:
+        if 'Diff' not in df.columns:
+            raise KeyError("Diff not existing in df")
+        if 'Mean' not in df.columns:
+            raise KeyError("Mean not existing in df")
+        if group_by not in df.columns:
+            raise KeyError("group_by not existing in df.")
+        if df['Diff'].isnull().values.any():
+            raise ValueError("Diff contains missing values")
+        if df['Mean'].isnull().values.any():
+            raise ValueError("Mean contains missing values")
+        if df[group_by].isnull().values.any():
+            raise ValueError("group_by contains missing values")
 
     assumptions = [
         True,  # Assumption 0: Normal distribution of the difference
@@ -49,10 +57,14 @@ def loa_repeated_measurements(df: pd.DataFrame, group_by: str = 'Sub'):
 
     try:
         df_bias_loa = pd.DataFrame(columns=['Bias', 'UpperLoA', 'LowerLoA'], index=['Intercept'])  # empty 1x3 dataframe
-        df[group_by] = df[group_by].astype(str)  # set groupby column to str, to prevent LinAlgError("SVD did not converge")
+        if isinstance(df, analysis.AnalysisFrame):
+            obs_group_all = np.bincount(df.cluster)  # observations per group (sub), including empty groups
+            unique_in_group_by = int(np.count_nonzero(obs_group_all))  # number of unique values
+        else:
+            df[group_by] = df[group_by].astype(str)  # set groupby column to str, to prevent LinAlgError("SVD did not converge")
+            unique_in_group_by = df[group_by].nunique()  # number of unique values
 
         # check if group_by in df consist of at least one group
-        unique_in_group_by = df[group_by].nunique()  # number of unique values
         if unique_in_group_by < 2:
             df_bias_loa['Bias']['Intercept'] = np.nan
             df_bias_loa['UpperLoA']['Intercept'] = np.nan
@@ -72,22 +84,52 @@ def loa_repeated_measurements(df: pd.DataFrame, group_by: str = 'Sub'):
             # variables (local)
             z = 1.96  # z-score of the 95% estimated interval assuming a normal distribution of diff
 
-            # bias
-            b0 = np.mean(df['Diff'])
+            if isinstance(df, analysis.AnalysisFrame):
+                # bias
+                b0 = np.mean(df.diff)
+
+                # limits of agreement, one-way ANOVA from the sums per group (sub)
+                mean_group = np.bincount(df.cluster, weights=df.diff) / np.maximum(obs_group_all, 1)
+                obs_group = obs_group_all[obs_group_all > 0]  # observations per group (sub)
+                obs_sub = len(obs_group)  # number of subjects
+                obs_tot = len(df)  # total number of observations
+                MS_Sub = np.sum(obs_group_all * np.square(mean_group - b0)) / (obs_sub - 1)  # mean square subject
+                MS_Res = np.sum(np.square(df.diff - mean_group[df.cluster])) / \
+                         (obs_tot - obs_sub)  # mean square residual
+                obs_group_sq = np.sum(np.square(obs_group))  # observation per group squared (sum(m^2,i)
+
+                # model with the same one-way ANOVA table as bioinfokit
+                mdl = stat()
+                F = MS_Sub / MS_Res
+                mdl.anova_summary = pd.DataFrame(
+                    {'df': [obs_sub - 1.0, float(obs_tot - obs_sub)],
+                     'sum_sq': [MS_Sub * (obs_sub - 1), MS_Res * (obs_tot - obs_sub)],
+                     'mean_sq': [MS_Sub, MS_Res],
+                     'F': [F, np.nan],
+                     'PR(>F)': [stats.f.sf(F, obs_sub - 1, obs_tot - obs_sub), np.nan]},
+                    index=[str('C(' + group_by + ')'), 'Residual'])
+            else:
+                # bias
+                b0 = np.mean(df['Diff'])
 
-            # limits of agreement
-            mdl = stat()  # empty results anova
-            formula = str('Diff' + ' ~ C(' + group_by + ')')  # dependent var ~ independent var
-            mdl.anova_stat(df=df, res_var='diff', anova_model=formula)  # results one-way ANOVA
-            # MS_Sub = res.anova_summary['mean_sq']['C(Sub)']           # mean square subject
-            MS_Sub = mdl.anova_summary['mean_sq'][str('C(' +
-                                                      group_by + ')')]  # mean square subject
-            MS_Res = mdl.anova_summary['mean_sq']['Residual']  # mean square residual
-            obs_group = df.groupby([group_by])[group_by].count()  # observations per group (sub)
-            obs_group_sq = sum(np.square(  # observation per group squared (sum(m^2,i)
-                df.groupby([group_by])[group_by].count()))
-            obs_sub = obs_group.count()  # number of subjects
-            obs_tot = df[group_by].count()  # total number of observations
+                # limits of agreement
+                mdl = stat()  # empty results anova
+                formula = str('Diff' + ' ~ C(' + group_by + ')')  # dependent var ~ independent var
+                mdl.anova_stat(df=df, res_var='diff', anova_model=formula)  # results one-way ANOVA
+                # MS_Sub = res.anova_summary['mean_sq']['C(Sub)']           # mean square subject
+                MS_Sub = mdl.anova_summary['mean_sq'][str('C(' +
+                                                          group_by + ')')]  # mean square subject
+                MS_Res = mdl.anova_summary['mean_sq']['Residual']  # mean square residual
+                # observations per group (sub), from the cluster codes of preprocessing if available
+                codes = pre.cluster_codes(df=df, group_by=group_by)
+                if isinstance(codes, Exception):
+                    raise codes
+                codes = codes[0]
+                obs_group = np.bincount(codes)
+                obs_group = obs_group[obs_group > 0]
+                obs_group_sq = np.sum(np.square(obs_group))  # observation per group squared (sum(m^2,i)
+                obs_sub = len(obs_group)  # number of subjects
+                obs_tot = len(codes)  # total number of observations
             div = (np.square(obs_tot) - obs_group_sq) / \
                   ((obs_sub - 1) * obs_tot)  # divisor to corrected for heterogeneity
             var_within_sub = MS_Res  # within subject variance
@@ -1,23 +1,72 @@
+import hashlib
 import pandas as pd
 import numpy as np
 from ValidSense import analysis
 
+
+def _sliding_abs_residual_sums(mean_sorted, diff_sorted, first, last, b0, b1, chunk: int = 10000000):
+    """
+    Function to calculate the sums of the absolute residuals of the bias model of every window, and of their product
+    with the mean: the second pass of the regression of difference, after the bias model of every window is known.
+    :return: ([numpy array, numpy array]) sum of the absolute residuals and sum of mean times absolute residuals.
+    """
+    length = last - first
+    sum_res = np.zeros(len(first))
+    sum_mean_res = np.zeros(len(first))
+
+    # windows in blocks of at most chunk (window, row) pairs, at least one window
+    cumulative = np.concatenate([[0], np.cumsum(length)])
+    start = 0
+    while start < len(first):
+        stop = max(int(np.searchsorted(cumulative, cumulative[start] + chunk, side='right')) - 1, start + 1)
+        w = np.arange(start, stop)
+        # row of every pair, the ranges first:last of the windows concatenated
+        pair_window = np.repeat(w, length[w])
+        offsets = np.repeat(cumulative[w] - cumulative[start], length[w])
+        pair_row = first[pair_window] + np.arange(len(pair_window)) - offsets
+        res = np.abs(diff_sorted[pair_row] - b0[pair_window] - b1[pair_window] * mean_sorted[pair_row])
+        sum_res[w] = np.bincount(pair_window - start, weights=res, minlength=len(w))
+        sum_mean_res[w] = np.bincount(pair_window - start, weights=res * mean_sorted[pair_row], minlength=len(w))
+        start = stop
+    return [sum_res, sum_mean_res]
+
 # maximal 100 caches
 # @st.experimental_memo(max_entries=100)
-def longitudinal_analysis(df: pd.DataFrame, window_unit: str, window_size: int, col_datetime: str = 'Datetime',
+def longitudinal_analysis(df, window_unit: str, window_size: int, col_datetime: str = 'Datetime',
+                     window_stride: int = 1, min_observations: int = 2, min_clusters: int = 2,
+                     window_mode: str = 'Time',
                      loa_subtype: str = 'Classic',
                      rep_group_by: str = None,
                      mem_bias_fixed_var: list = None, mem_bias_random_var: list = None, mem_loa_fixed_var: list = None,
-                     mem_loa_random_var: list = None):
+                     mem_loa_random_var: list = None, df_previous: pd.DataFrame = None, rod_bias_order: int = 0,
+                     rod_loa_order: int = 0):
 
     """
-    Function to calculate the bias and 95% LoA over time. For every step in window_unit in the
-    column col_datetime, the bias and 95% LoA are calculated. Rows with time windows where no data is
-    available are dropped. Similar for rows when the max of df[col_datetime] exceeds the window size.
-    :param df: (pandas DataFrame) dataframe with column 'mean' and 'diff', representing the mean and difference.
-    :param window_unit: (str) window unit in days (D), hours (h) or minutes(m).
-    :param window_size: (int) window size.
-    :param col_datetime: (str = 'Datetime') column containing both date and time.
+    Function to calculate the bias and 95% LoA over time. For every step of window_stride times window_unit in the
+    column col_datetime, the bias and 95% LoA are calculated. With window_mode 'Observations' or 'Clusters' every
+    window holds a fixed number of measurements or clusters instead of a fixed time span. The occupancy of every
+    window is counted up front, windows with fewer than min_observations measurements (or min_clusters clusters) are
+    not calculated. Rows with time windows where the statistics are not available are dropped. Windows that end after
+    the max of df[col_datetime] are not calculated. Every window has a fingerprint of its rows and the settings: after
+    rows are appended, the windows of df_previous with an unchanged fingerprint are reused and only the other windows
+    are calculated.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'mean' and 'diff', representing the mean and
+    difference. A dataframe is converted to an AnalysisFrame once for the 'Classic' and 'Repeated measurements'
+    subtypes, an AnalysisFrame is converted to a dataframe for the 'Mixed-effect' subtype.
+    :param window_unit: (str) window unit in weeks (W), days (D), hours (h), minutes (min) or seconds (s).
+    :param window_size: (int) window size, in window_unit, or in measurements or clusters (see window_mode).
+    :param col_datetime: (str = 'Datetime') column containing both date and time, or the time since the anchor of every
+    cluster of pre.df_relative_time to window on the same stage of every cluster (for example hours since admission).
+    :param window_stride: (int = 1) step between the start of consecutive windows, in window_unit, or in measurements
+    or clusters (see window_mode).
+    :param min_observations: (int = 2) minimal number of measurements in a window to calculate its statistics.
+    :param min_clusters: (int = 2) if subtype is 'Repeated measurements': minimal number of rep_group_by clusters in a
+    window to calculate its statistics.
+    :param window_mode: (str = 'Time') 'Time' for windows of window_size times window_unit, 'Observations' for windows
+    of window_size consecutive measurements in time, or 'Clusters' for windows of all measurements of window_size
+    rep_group_by clusters, consecutive in order of their first measurement. For 'Observations' and 'Clusters',
+    window_unit is not used and TimeStart and TimeEnd are the first measurement and 1 nanosecond (the resolution of the
+    time) after the last measurement.
     :param loa_subtype: (str = 'Classic') subtype of the limits of agreement analysis for the time series analysis.
     :param rep_group_by: (str = None) if subtype is 'Repeated Measurements': column in dataframe where multiple
     subjects are grouped by.
@@ -25,12 +74,21 @@ def longitudinal_analysis(df: pd.DataFrame, window_unit: str, window_size: int,
     :param mem_bias_random_var: (list = None) if subtype is 'Mixed-effect': list with random effects for bias
     :param mem_loa_fixed_var: (list = None) if subtype is 'Mixed-effect': list with fixed effects for loa
     :param mem_loa_random_var: (list = None) if subtype is 'Mixed-effect': list with random effects for loa
+    :param df_previous: (pandas DataFrame = None) dataframe of a previous longitudinal analysis, with column
+    'Fingerprint', to reuse the windows whose rows and settings did not change. The last window is always calculated,
+    for the assumptions and models. The 'Regression of difference' subtype calculates all windows at once and does not
+    reuse windows.
+    :param rod_bias_order: (int = 0) if subtype is 'Regression of difference': order of equation for bias, see
+    analysis.loa_regression_of_difference. The bias and 95% LoA models of all windows follow from sliding sums of the
+    mean and difference, the absolute residuals of the bias models from a second vectorised pass, and the slopes are
+    added as columns 'BiasSlope', 'UpperLoASlope' and 'LowerLoASlope'.
+    :param rod_loa_order: (int = 0) if subtype is 'Regression of difference': order of equation for limits of agreement.
     :return: ([pandas DataFrame, str, statsmodels.regression.mixed_linear_model.MixedLMResultsWrapper,
-    statsmodels.regression.mixed_linear_model.MixedLMResultsWrapper, bioinfokit analys stat]) dataframe
-    with limits of agreement variant statistics, assumptions and model.
-
-    dataframe with Time Analysis limits of agreement analysis statistics and their
-     assumptions.
+    statsmodels.regression.mixed_linear_model.MixedLMResultsWrapper, NoneType]) dataframe with limits of agreement
+    variant statistics (including the 'Fingerprint' of every window), assumptions, bias and LoA model of the last
+    Mixed-effect window (otherwise None) and None (no model of the repeated measurements windows is kept). Every window
+    is the half-open interval [TimeStart, TimeEnd), and the rows order[RowStart:RowEnd] of the order of
+    analysis.window_order, also for windows of measurements or clusters that share their time with other rows.
     """
 
     # global df_bias_loa
@@ -38,39 +96,73 @@ def longitudinal_analysis(df: pd.DataFrame, window_unit: str, window_size: int,
         "Classic",
         "Repeated measurements",
         "Mixed-effect",
+        "Regression of difference",
     ]
+    units = ['W', 'D', 'h', 'min', 's']
+    modes = ['Time', 'Observations', 'Clusters']
 
     # warning
-    if not isinstance(df, pd.DataFrame):
-        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(df, (pd.DataFrame, analysis.AnalysisFrame)):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame or AnalysisFrame")
     if not isinstance(window_unit, str):
         raise TypeError(f"window_unit is of type {type(window_unit).__name__}, should be str")
     if not isinstance(window_size, int):
         raise TypeError(f"window_size is of type {type(window_size).__name__}, should be int")
     if not isinstance(col_datetime, str):
         raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(window_stride, int):
+        raise TypeError(f"window_stride is of type {type(window_stride).__name__}, should be int")
+    if not isinstance(min_observations, int):
+        raise TypeError(f"min_observations is of type {type(min_observations).__name__}, should be int")
+    if not isinstance(min_clusters, int):
+        raise TypeError(f"min_clusters is of type {type(min_clusters).__name__}, should be int")
+    if not isinstance(window_mode, str):
+        raise TypeError(f"window_mode is of type {type(window_mode).__name__}, should be str")
+    if window_mode not in modes:
+        raise KeyError("window_mode should be of type 'Time', 'Observations' or 'Clusters'")
+    if window_unit not in units:
+        raise KeyError("window_unit should be of type 'W', 'D', 'h', 'min' or 's'")
     if not isinstance(loa_subtype, str):
         raise TypeError(f"loa_subtype is of type {type(loa_subtype).__name__}, should be str")
-    if col_datetime not in df.columns:
-        raise KeyError("col_datetime not existing in df")
-    if 'Diff' not in df.columns:
-        raise KeyError("Diff not existing in df")
-    if 'Mean' not in df.columns:
-        raise KeyError("Mean not existing in df")
     if loa_subtype not in subtypes:
-        raise KeyError("loa_subtype should be of type 'Classic', 'Repeated measurements' or 'Mixed-effect'")
-    if df['Diff'].isnull().values.any():
-        raise ValueError("Diff contains missing values")
-    if df['Mean'].isnull().values.any():
-        raise ValueError("Mean contains missing values")
+        raise KeyError("loa_subtype should be of type 'Classic', 'Repeated measurements', 'Mixed-effect' or "
+                       "'Regression of difference'")
+    if not isinstance(rod_bias_order, int):
+        raise TypeError(f"rod_bias_order is of type {type(rod_bias_order).__name__}, should be int")
+    if not isinstance(rod_loa_order, int):
+        raise TypeError(f"rod_loa_order is of type {type(rod_loa_order).__name__}, should be int")
+    if rod_bias_order not in [0, 1] or rod_loa_order not in [0, 1]:
+        raise ValueError("rod_bias_order and rod_loa_order should be 0 or 1")
+    if isinstance(df, analysis.AnalysisFrame):
+        if df.time is None or df.col_datetime != col_datetime:
+            raise KeyError("col_datetime is not the time of the AnalysisFrame")
+    else:
+        if col_datetime not in df.columns:
+            raise KeyError("col_datetime not existing in df")
+        if 'Diff' not in df.columns:
+            raise KeyError("Diff not existing in df")
+        if 'Mean' not in df.columns:
+            raise KeyError("Mean not existing in df")
+        if df['Diff'].isnull().values.any():
+            raise ValueError("Diff contains missing values")
+        if df['Mean'].isnull().values.any():
+            raise ValueError("Mean contains missing values")
+    if not isinstance(df_previous, (pd.DataFrame, type(None))):
+        raise TypeError(f"df_previous is of type {type(df_previous).__name__}, should be pandas DataFrame or NoneType")
+    if df_previous is not None:
+        for col in ['Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd', 'Fingerprint']:
+            if col not in df_previous.columns:
+                raise KeyError(f"{col} not existing in df_previous")
     if window_size <= 0:
         raise Exception("window_size is empty, window_size is not positive number")
-    if loa_subtype == 'Repeated measurements':
+    if window_stride <= 0:
+        raise Exception("window_stride is empty, window_stride is not positive number")
+    if loa_subtype == 'Repeated measurements' or window_mode == 'Clusters':
         if rep_group_by is None:
             raise TypeError(f"rep_group_by should not be None")
         if not isinstance(rep_group_by, str):
             raise TypeError(f"rep_group_by is of type {type(rep_group_by).__name__}, should be str")
-        if df[rep_group_by].isnull().values.any():
+        if isinstance(df, pd.DataFrame) and df[rep_group_by].isnull().values.any():
             raise ValueError("rep_group_by contains missing values")
     if loa_subtype == 'Mixed-effect':
         if not isinstance(mem_bias_fixed_var, list):
@@ -87,9 +179,123 @@ def longitudinal_analysis(df: pd.DataFrame, window_unit: str, window_size: int,
             raise Exception("mem_loa_random_var is empty, minimal 1 random effect for bias should be included")
 
     try:
-        date_first_floor = df[col_datetime].min().floor(freq=window_unit)
-        date_last_ceil = df[col_datetime].max().ceil(freq=window_unit)
-        count_rows = int((date_last_ceil - date_first_floor) / np.timedelta64(1, window_unit))
+        # validate and convert once: the windows use the arrays of the AnalysisFrame
+        if loa_subtype == 'Mixed-effect' and isinstance(df, analysis.AnalysisFrame):
+            df = df.to_df()
+        elif loa_subtype != 'Mixed-effect' and isinstance(df, pd.DataFrame):
+            df = analysis.AnalysisFrame(
+                df=df,
+                group_by=rep_group_by if loa_subtype == 'Repeated measurements' or window_mode == 'Clusters' else None,
+                col_datetime=col_datetime,
+            )
+
+        # cluster codes, needed for the clusters of Repeated measurements
+        if isinstance(df, analysis.AnalysisFrame):
+            time_ns = df.time
+            [cluster_codes, count_cluster_codes] = [df.cluster, len(df.cluster_labels)] if df.cluster is not None \
+                else [None, 0]
+        else:
+            time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            [cluster_codes, count_cluster_codes] = [None, 0]
+
+        # rows in window order, every window is the consecutive rows order[first:last]
+        result = analysis.window_order(df=df, col_datetime=col_datetime, window_mode=window_mode,
+                                       group_by=rep_group_by if window_mode == 'Clusters' else None)
+        if isinstance(result, Exception):
+            raise result
+        [order, bounds] = result
+        time_sorted = time_ns[order]
+
+        if window_mode == 'Time':
+            # window arithmetic on int64 nanoseconds since the UNIX epoch: integer comparisons instead of Timestamp
+            # comparisons, and correct across daylight saving time changes when Datetime is normalised to UTC
+            unit_ns = pd.Timedelta(value=1, unit=window_unit).value
+            date_first_floor = time_ns.min() // unit_ns * unit_ns
+            date_last_ceil = -(-time_ns.max() // unit_ns) * unit_ns
+            size_ns = window_size * unit_ns
+            stride_ns = window_stride * unit_ns
+
+            # start of every window that ends before date_last_ceil, one window every stride
+            count_windows = max(int((date_last_ceil - date_first_floor - size_ns) // stride_ns) + 1, 0)
+            window_start = date_first_floor + np.arange(count_windows, dtype=np.int64) * stride_ns
+            window_end = window_start + size_ns
+
+            # first and last (exclusive) row of every window in the rows sorted by time
+            first = np.searchsorted(time_sorted, window_start, side='left')
+            last = np.searchsorted(time_sorted, window_end, side='left')
+
+        elif window_mode == 'Observations':
+            # window_size consecutive rows in time, every window_stride rows: index arithmetic on the sorted rows
+            count_windows = max((len(time_ns) - window_size) // window_stride + 1, 0)
+            first = np.arange(count_windows, dtype=np.int64) * window_stride
+            last = first + window_size
+            window_start = time_sorted[first]
+            window_end = time_sorted[last - 1] + 1    # just after the last row, the end is exclusive
+
+        elif window_mode == 'Clusters':
+            # window_size consecutive clusters in order of entry (first measurement), every window_stride clusters:
+            # index arithmetic on the first row of every cluster
+            count_filled = len(bounds) - 1
+            count_windows = max((count_filled - window_size) // window_stride + 1, 0)
+            rank_first = np.arange(count_windows, dtype=np.int64) * window_stride
+            first = bounds[rank_first]
+            last = bounds[rank_first + window_size]
+            window_start = time_sorted[first]
+            if count_windows > 0:
+                exit_time = time_sorted[bounds[1:] - 1]     # last measurement of every cluster, in order of entry
+                exit_window = np.lib.stride_tricks.sliding_window_view(exit_time, window_size).max(axis=1)
+                window_end = exit_window[rank_first] + 1    # just after the last row, the end is exclusive
+            else:
+                window_end = window_start.copy()
+
+        # occupancy of every window: only windows with enough measurements (and clusters) are calculated
+        occupied = (last - first) >= min_observations
+        if loa_subtype == 'Repeated measurements':
+            # clusters of every window: a row counts for the windows that hold it but not the previous row of its
+            # cluster (in sorted order), so every cluster counts once. first and last do not decrease, the windows of
+            # every row are therefore one range, added as +1 and -1 to a difference array
+            position = np.empty(len(order), dtype=np.int64)
+            position[order] = np.arange(len(order))
+            cluster_order = np.lexsort((position, cluster_codes))
+            position_cluster = position[cluster_order]
+            cluster_sorted = cluster_codes[cluster_order]
+            same_cluster = np.concatenate([[False], cluster_sorted[1:] == cluster_sorted[:-1]])
+            position_previous = np.where(same_cluster, np.roll(position_cluster, 1), -1)
+            window_low = np.maximum(np.searchsorted(first, position_previous, side='right'),   # first after previous
+                                    np.searchsorted(last, position_cluster, side='right'))     # last after the row
+            window_high = np.searchsorted(first, position_cluster, side='right')                # first at or before row
+            counted = window_low < window_high
+            count_clusters_window = np.cumsum(np.bincount(window_low[counted], minlength=count_windows + 1) -
+                                              np.bincount(window_high[counted], minlength=count_windows + 1))
+            occupied &= count_clusters_window[:count_windows] >= min_clusters
+        windows = np.flatnonzero(occupied)
+
+        # fingerprint of every window: wrapping sum of the hashes of its rows, from prefix sums over the sorted rows,
+        # plus a hash of the settings, so appended rows only change the fingerprints of the windows they fall in
+        if isinstance(df, analysis.AnalysisFrame):
+            rows = {'Diff': df.diff, 'Time': time_ns}
+            if df.cluster is not None:
+                rows['Cluster'] = np.asarray(df.cluster_labels, dtype=object)[df.cluster]
+            hash_rows = pd.util.hash_pandas_object(pd.DataFrame(rows), index=False).to_numpy()
+        else:
+            hash_rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        hash_prefix = np.concatenate([np.zeros(1, dtype=np.uint64), np.cumsum(hash_rows[order], dtype=np.uint64)])
+        settings = str((loa_subtype, window_mode, window_unit, window_size, rep_group_by, mem_bias_fixed_var,
+                        mem_bias_random_var, mem_loa_fixed_var, mem_loa_random_var,
+                        None if isinstance(df, analysis.AnalysisFrame) else list(df.columns))
+                       + ((rod_bias_order, rod_loa_order) if loa_subtype == 'Regression of difference' else ()))
+        hash_settings = np.uint64(int.from_bytes(hashlib.blake2b(settings.encode(), digest_size=8).digest(), 'little'))
+        fingerprint = hash_prefix[last] - hash_prefix[first] + hash_settings
+
+        # statistics of the windows of df_previous, by start, end and fingerprint
+        previous = {}
+        if df_previous is not None:
+            previous = dict(zip(
+                zip(df_previous['TimeStart'].to_numpy(dtype='datetime64[ns]').view(np.int64).tolist(),
+                    df_previous['TimeEnd'].to_numpy(dtype='datetime64[ns]').view(np.int64).tolist(),
+                    df_previous['Fingerprint'].to_numpy(dtype=np.uint64).tolist()),
+                zip(df_previous['Bias'], df_previous['UpperLoA'], df_previous['LowerLoA']),
+            ))
 
         # empty lists
         bias = []
@@ -97,61 +303,172 @@ def longitudinal_analysis(df: pd.DataFrame, window_unit: str, window_size: int,
         lower_loa = []
         time_start = []
         time_end = []
-        time_bool = []
+        window_fingerprint = []
+        assumptions = None
         model_bias = None
         model_loa = None
         model_rep = None
 
-        # delta is step size for every loop
-        for delta in range(0, count_rows):
-            # start and end datetime
-            filt_start = date_first_floor + pd.Timedelta(value=0 + delta, unit=window_unit)
-            filt_end = date_first_floor + pd.Timedelta(value=window_size + delta, unit=window_unit)
-
-            # time index where df is in window
-            time_index = ((df[col_datetime] >= filt_start) & (df[col_datetime] < filt_end)).tolist()
-            df_filt = df.loc[time_index]
-
-            # limits of agreement analysis subtype
-            if loa_subtype == 'Classic':
-                # get limits of agreement classic statistics and assumptions
-                [df_bias_loa, assumptions] = analysis.loa_classic(df=df_filt)
-
-            elif loa_subtype == 'Repeated measurements':
-                # get limits of agreement repeated measurements statistics and assumptions
-                [df_bias_loa, assumptions, model_rep] = analysis.loa_repeated_measurements(df=df_filt, group_by=rep_group_by)
-
-            elif loa_subtype == 'Mixed-effect':
-                [df_bias_loa, assumptions, model_bias, model_loa] = analysis.loa_mixed_effect_model(
-                    df=df_filt,
-                    bias_fixed_variable=mem_bias_fixed_var,
-                    bias_random_variable=mem_bias_random_var,
-                    loa_fixed_variable=mem_loa_fixed_var,
-                    loa_random_variable=mem_loa_random_var,
-                )
-
-            # extract bias, upper loa, lower loa and time information
-            bias.append(df_bias_loa['Bias']['Intercept'])
-            upper_loa.append(df_bias_loa['UpperLoA']['Intercept'])
-            lower_loa.append(df_bias_loa['LowerLoA']['Intercept'])
-            time_start.append(filt_start)
-            time_end.append(filt_end)
-            time_bool.append(time_index)
+        if loa_subtype in ['Classic', 'Repeated measurements']:
+            # running count, sum and sum of squares of every cluster (one cluster for Classic), updated with the rows
+            # that enter and leave the window, so every window costs the rows that changed instead of all its rows
+            shift = float(np.mean(df.diff)) if len(df) > 0 else 0.0   # sums around the mean, for less rounding
+            diff_sorted = df.diff[order] - shift
+            if loa_subtype == 'Repeated measurements':
+                codes = cluster_codes[order]
+                cluster_labels = list(df.cluster_labels)
+            else:
+                codes = np.zeros(len(order), dtype=np.int64)
+                cluster_labels = None
+            count_clusters = count_cluster_codes if cluster_labels is not None else 1
+            count = np.zeros(count_clusters, dtype=np.int64)
+            sum_diff = np.zeros(count_clusters)
+            sum_diff2 = np.zeros(count_clusters)
+
+            first_prev, last_prev = 0, 0
+            for delta in windows:
+                # rows leaving and entering the window, since the previous calculated window
+                for rows, sign in [(slice(first_prev, min(first[delta], last_prev)), -1),
+                                   (slice(max(last_prev, first[delta]), last[delta]), 1)]:
+                    if rows.stop > rows.start:
+                        count += sign * np.bincount(codes[rows], minlength=count_clusters)
+                        sum_diff += sign * np.bincount(codes[rows], weights=diff_sorted[rows],
+                                                       minlength=count_clusters)
+                        sum_diff2 += sign * np.bincount(codes[rows], weights=np.square(diff_sorted[rows]),
+                                                        minlength=count_clusters)
+                sum_diff[count == 0] = 0    # no rounding remainders of clusters that left the window
+                sum_diff2[count == 0] = 0
+                first_prev, last_prev = first[delta], last[delta]
+
+                # reuse the statistics of an unchanged window
+                key = (int(window_start[delta]), int(window_end[delta]), int(fingerprint[delta]))
+                if key in previous and delta != windows[-1]:
+                    [b0, upper, lower] = previous[key]
+                else:
+                    # limits of agreement analysis subtype
+                    accumulator = analysis.LoAAccumulator.from_sums(n=count, sum_diff=sum_diff, sum_diff2=sum_diff2,
+                                                                    cluster_labels=cluster_labels, shift=shift)
+                    if loa_subtype == 'Classic':
+                        # get limits of agreement classic statistics and assumptions
+                        [df_bias_loa, assumptions] = accumulator.loa_classic()
+                    else:
+                        # get limits of agreement repeated measurements statistics and assumptions
+                        [df_bias_loa, assumptions, _] = accumulator.loa_repeated_measurements(group_by=rep_group_by)
+                    [b0, upper, lower] = [df_bias_loa[col]['Intercept'] for col in ['Bias', 'UpperLoA', 'LowerLoA']]
+
+                # extract bias, upper loa, lower loa and time information
+                bias.append(b0)
+                upper_loa.append(upper)
+                lower_loa.append(lower)
+                time_start.append(pd.Timestamp(window_start[delta]))
+                time_end.append(pd.Timestamp(window_end[delta]))
+                window_fingerprint.append(fingerprint[delta])
+
+        elif loa_subtype == 'Mixed-effect':
+            # delta is step size for every loop
+            for delta in windows:
+                # start and end datetime in nanoseconds
+                filt_start = window_start[delta]
+                filt_end = window_end[delta]
+
+                # reuse the statistics of an unchanged window
+                key = (int(filt_start), int(filt_end), int(fingerprint[delta]))
+                if key in previous and delta != windows[-1]:
+                    [b0, upper, lower] = previous[key]
+                else:
+                    # rows of the window, in the order of df
+                    df_filt = df.take(np.sort(order[first[delta]:last[delta]]))
+
+                    [df_bias_loa, assumptions, model_bias, model_loa] = analysis.loa_mixed_effect_model(
+                        df=df_filt,
+                        bias_fixed_variable=mem_bias_fixed_var,
+                        bias_random_variable=mem_bias_random_var,
+                        loa_fixed_variable=mem_loa_fixed_var,
+                        loa_random_variable=mem_loa_random_var,
+                    )
+                    [b0, upper, lower] = [df_bias_loa[col]['Intercept'] for col in ['Bias', 'UpperLoA', 'LowerLoA']]
+
+                # extract bias, upper loa, lower loa and time information
+                bias.append(b0)
+                upper_loa.append(upper)
+                lower_loa.append(lower)
+                time_start.append(pd.Timestamp(filt_start))
+                time_end.append(pd.Timestamp(filt_end))
+                window_fingerprint.append(fingerprint[delta])
+
+        elif loa_subtype == 'Regression of difference':
+            assumptions = [
+                True,  # Assumption 0: Normal distribution of the difference
+                False, # Assumption 1: Constant agreement over the measurement range
+                True,  # Assumption 2: Independent observations
+                False, # Assumption 3: Within-cluster-SD independent of cluster-mean
+                True,  # Assumption 4: Normal distribution of residuals
+                True,  # Assumption 5: Homogeneity of residuals
+                False, # Assumption 6: Exogeneity of fixed effects.
+            ]
+            z = 1.96  # z-score of the 95% estimated interval assuming a normal distribution of diff
+            corr_hlf_nrm = np.sqrt(np.pi / 2)  # correction for half normal distribution
+
+            # prefix sums over the sorted rows, around the means for less rounding, so the sums of every window are
+            # two lookups: all windows are calculated at once instead of one regression model per window
+            [shift_mean, shift_diff] = [float(np.mean(df.mean)), float(np.mean(df.diff))] if len(df) > 0 \
+                else [0.0, 0.0]
+            mean_sorted = df.mean[order] - shift_mean
+            diff_sorted = df.diff[order] - shift_diff
+            prefix = [np.concatenate([[0], np.cumsum(values)]) for values in
+                      [mean_sorted, diff_sorted, np.square(mean_sorted), mean_sorted * diff_sorted,
+                       np.square(diff_sorted)]]
+            [s_m, s_d, s_mm, s_md, s_dd] = [sums[last[windows]] - sums[first[windows]] for sums in prefix]
+            n = (last - first)[windows].astype(np.float64)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                s_xx = s_mm - np.square(s_m) / n    # sum of squared deviations of the mean
+                s_xy = s_md - s_m * s_d / n         # sum of cross deviations
+                s_yy = s_dd - np.square(s_d) / n    # sum of squared deviations of the difference
+
+                # bias: ordinary least squares of Diff ~ Mean, or the mean difference
+                if rod_bias_order == 1:
+                    b1 = np.where(s_xx > 0, s_xy / s_xx, np.nan)
+                    b0 = (s_d - b1 * s_m) / n
+                    std = np.sqrt(np.maximum(s_yy - b1 * s_xy, 0) / (n - 2))  # deviation of diff around bias
+                else:
+                    b1 = np.zeros(len(windows))
+                    b0 = s_d / n
+                    std = np.sqrt(np.maximum(s_yy, 0) / (n - 1))
+
+                # 95% LoA: ordinary least squares of AbsResiduals ~ Mean, the absolute residuals of the bias model of
+                # every window from a second pass over the rows of the windows
+                if rod_loa_order == 1:
+                    [s_r, s_mr] = _sliding_abs_residual_sums(mean_sorted, diff_sorted, first[windows], last[windows],
+                                                             b0, b1)
+                    c1 = np.where(s_xx > 0, (s_mr - s_m * s_r / n) / s_xx, np.nan)
+                    c0 = (s_r - c1 * s_m) / n
+                    g0 = c0 * z * corr_hlf_nrm
+                    g1 = c1 * z * corr_hlf_nrm
+                else:
+                    g0 = std * z
+                    g1 = np.zeros(len(windows))
+
+            # back from the sums around the means: intercepts at Mean = 0
+            b0 = b0 + shift_diff - b1 * shift_mean
+            g0 = g0 - g1 * shift_mean
+            bias = b0.tolist()
+            upper_loa = (b0 + g0).tolist()
+            lower_loa = (b0 - g0).tolist()
+            time_start = [pd.Timestamp(t) for t in window_start[windows]]
+            time_end = [pd.Timestamp(t) for t in window_end[windows]]
+            window_fingerprint = fingerprint[windows].tolist()
 
         # save in df_bias_loa
-        df_bias_loa_time = pd.DataFrame(list(zip(bias, upper_loa, lower_loa, time_start, time_end, time_bool)),
-                                 columns=['Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd', 'TimeBoolean'])
-
-        # drop rows when the max of df[col_datetime] exceeds the window size
-        df_bias_loa_time.drop(
-            df_bias_loa_time[
-                df_bias_loa_time['TimeEnd'] > df['Datetime']
-                .max()
-                .ceil(freq=window_unit)
-                ]
-                .index,
-            inplace=True
-        )
+        df_bias_loa_time = pd.DataFrame(list(zip(bias, upper_loa, lower_loa, time_start, time_end)),
+                                 columns=['Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd'])
+        df_bias_loa_time['RowStart'] = first[windows]
+        df_bias_loa_time['RowEnd'] = last[windows]
+        df_bias_loa_time['Fingerprint'] = np.array(window_fingerprint, dtype=np.uint64)
+        if loa_subtype == 'Regression of difference':
+            df_bias_loa_time['BiasSlope'] = b1
+            df_bias_loa_time['UpperLoASlope'] = b1 + g1
+            df_bias_loa_time['LowerLoASlope'] = b1 - g1
 
         # drop rows with nan: window where no data is available
         df_bias_loa_time = df_bias_loa_time.dropna(axis=0, how='any')
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+
+def longitudinal_cube(df_cube: pd.DataFrame, window_unit: str, window_size: int, window_stride: int = 1,
+                      loa_subtype: str = 'Classic', group_by: str = None, clusters: list = None,
+                      min_observations: int = 2, min_clusters: int = 2):
+    """
+    Function to calculate the bias and 95% LoA over time from the cube of sufficient statistics of pre.df_cube, without
+    the measurements. The windows are the same as those of analysis.longitudinal_analysis, the sums of every window
+    follow from prefix sums over the occupied time buckets of every cluster, so all windows of a window size are
+    calculated at once, with memory in the number of cells and windows. window_unit
+    should be a multiple of the bucket of the cube, otherwise analysis.longitudinal_analysis is needed.
+    :param df_cube: (pandas DataFrame) cube of pre.df_cube.
+    :param window_unit: (str) window unit in weeks (W), days (D), hours (h), minutes (min) or seconds (s).
+    :param window_size: (int) window size, in window_unit.
+    :param window_stride: (int = 1) step between the start of consecutive windows, in window_unit.
+    :param loa_subtype: (str = 'Classic') 'Classic' or 'Repeated measurements'.
+    :param group_by: (str = None) cluster column of the cube, needed for 'Repeated measurements' and clusters.
+    :param clusters: (list = None) clusters to include, None includes all clusters.
+    :param min_observations: (int = 2) minimal number of measurements in a window to calculate its statistics.
+    :param min_clusters: (int = 2) if subtype is 'Repeated measurements': minimal number of clusters in a window to
+    calculate its statistics.
+    :return: ([pandas DataFrame, str]) dataframe with Time Analysis limits of agreement analysis statistics and their
+    assumptions.
+    """
+
+    subtypes = [
+        "Classic",
+        "Repeated measurements",
+    ]
+    units = ['W', 'D', 'h', 'min', 's']
+
+    # warning
+    if not isinstance(df_cube, pd.DataFrame):
+        raise TypeError(f"df_cube is of type {type(df_cube).__name__}, should be pandas DataFrame")
+    if not isinstance(window_unit, str):
+        raise TypeError(f"window_unit is of type {type(window_unit).__name__}, should be str")
+    if not isinstance(window_size, int):
+        raise TypeError(f"window_size is of type {type(window_size).__name__}, should be int")
+    if not isinstance(window_stride, int):
+        raise TypeError(f"window_stride is of type {type(window_stride).__name__}, should be int")
+    if not isinstance(loa_subtype, str):
+        raise TypeError(f"loa_subtype is of type {type(loa_subtype).__name__}, should be str")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if not isinstance(clusters, (list, type(None))):
+        raise TypeError(f"clusters is of type {type(clusters).__name__}, should be list or NoneType")
+    if not isinstance(min_observations, int):
+        raise TypeError(f"min_observations is of type {type(min_observations).__name__}, should be int")
+    if not isinstance(min_clusters, int):
+        raise TypeError(f"min_clusters is of type {type(min_clusters).__name__}, should be int")
+    if window_unit not in units:
+        raise KeyError("window_unit should be of type 'W', 'D', 'h', 'min' or 's'")
+    if loa_subtype not in subtypes:
+        raise KeyError("loa_subtype should be of type 'Classic' or 'Repeated measurements'")
+    if (loa_subtype == 'Repeated measurements' or clusters is not None) and group_by is None:
+        raise TypeError("group_by should not be None")
+    if group_by is not None and group_by not in df_cube.columns:
+        raise KeyError("group_by not existing in df_cube")
+    for col in ['TimeBucket', 'N', 'SumDiff', 'SumDiff2', 'TimeMin', 'TimeMax']:
+        if col not in df_cube.columns:
+            raise KeyError(f"{col} not existing in df_cube")
+    if 'cube' not in df_cube.attrs:
+        raise KeyError("bucket of df_cube is unknown, df_cube should be made by pre.df_cube")
+    if window_size <= 0:
+        raise Exception("window_size is empty, window_size is not positive number")
+    if window_stride <= 0:
+        raise Exception("window_stride is empty, window_stride is not positive number")
+
+    try:
+        assumptions = [
+            True,  # Assumption 0: Normal distribution of the difference
+            True,  # Assumption 1: Constant agreement over the measurement range
+            loa_subtype == 'Classic',  # Assumption 2: Independent observations
+            loa_subtype == 'Repeated measurements',  # Assumption 3: Within-cluster-SD independent of cluster-mean
+            False, # Assumption 4: Normal distribution of residuals
+            False, # Assumption 5: Homogeneity of residuals
+            False, # Assumption 6: Exogeneity of fixed effects.
+        ]
+
+        bucket_ns = pd.Timedelta(df_cube.attrs['cube']['bucket']).value
+        shift_diff = df_cube.attrs['cube'].get('shift_diff', 0.0)  # the sums are of the shifted Diff, see pre.df_cube
+        unit_ns = pd.Timedelta(value=1, unit=window_unit).value
+        if unit_ns % bucket_ns != 0:
+            raise ValueError("window_unit is not a multiple of the bucket of df_cube")
+
+        # cells of the clusters
+        if clusters is not None:
+            df_cube = df_cube.take(np.flatnonzero(df_cube[group_by].isin(clusters).to_numpy()))
+        if df_cube.empty:
+            raise ValueError("df_cube has no measurements of the clusters")
+
+        # windows on int64 nanoseconds, as analysis.longitudinal_analysis
+        date_first_floor = df_cube['TimeMin'].min().value // unit_ns * unit_ns
+        date_last_ceil = -(-df_cube['TimeMax'].max().value // unit_ns) * unit_ns
+        size_ns = window_size * unit_ns
+        stride_ns = window_stride * unit_ns
+        count_windows = max(int((date_last_ceil - date_first_floor - size_ns) // stride_ns) + 1, 0)
+        starts = date_first_floor + np.arange(count_windows, dtype=np.int64) * stride_ns
+
+        # cells sorted by cluster (one cluster for Classic) and bucket, buckets counted from date_first_floor
+        bucket = (df_cube['TimeBucket'].to_numpy(dtype='datetime64[ns]').view(np.int64) - date_first_floor) // bucket_ns
+        if loa_subtype == 'Repeated measurements':
+            codes = pd.factorize(df_cube[group_by])[0]
+        else:
+            codes = np.zeros(len(df_cube), dtype=np.int64)
+        order = np.lexsort((bucket, codes))
+        bucket = bucket[order]
+        [cell_n, cell_s, cell_ss] = [df_cube[col].to_numpy(dtype=np.float64)[order] for col in ['N', 'SumDiff',
+                                                                                              'SumDiff2']]
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(codes[order])) + 1, [len(order)]])
+
+        # windows start and end at bucket boundaries: window w holds the buckets [first[w], last[w])
+        stride_buckets = stride_ns // bucket_ns
+        size_buckets = size_ns // bucket_ns
+        first = np.arange(count_windows, dtype=np.int64) * stride_buckets
+        last = first + size_buckets
+
+        # sums of every window, added cluster by cluster over the windows that overlap the cluster, so only the
+        # occupied buckets of a cluster and the windows are kept in memory (not clusters x buckets or x windows)
+        n = np.zeros(count_windows)
+        s = np.zeros(count_windows)
+        ss = np.zeros(count_windows)
+        if loa_subtype == 'Repeated measurements':
+            obs_sub = np.zeros(count_windows)         # clusters with measurements in the window
+            sum_s2_n = np.zeros(count_windows)        # sum over the clusters of SumDiff^2 / N
+            sum_n2 = np.zeros(count_windows)          # sum over the clusters of N^2
+            sum_ss_res = np.zeros(count_windows)      # sum over the clusters of the residual sum of squares
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            buckets = bucket[start:end]
+            w_first = max(-(-(int(buckets[0]) + 1 - size_buckets) // stride_buckets), 0)
+            w_last = min(int(buckets[-1]) // stride_buckets + 1, count_windows)
+            if w_first >= w_last:
+                continue
+            lo = np.searchsorted(buckets, first[w_first:w_last], side='left')
+            hi = np.searchsorted(buckets, last[w_first:w_last], side='left')
+            [n_c, s_c, ss_c] = [np.concatenate([[0.0], np.cumsum(cell[start:end])]) for cell in [cell_n, cell_s,
+                                                                                                   cell_ss]]
+            [n_c, s_c, ss_c] = [cum[hi] - cum[lo] for cum in [n_c, s_c, ss_c]]
+            n_c = np.rint(n_c)
+            n[w_first:w_last] += n_c
+            s[w_first:w_last] += s_c
+            ss[w_first:w_last] += ss_c
+            if loa_subtype == 'Repeated measurements':
+                n_div = np.maximum(n_c, 1)
+                obs_sub[w_first:w_last] += n_c > 0
+                sum_s2_n[w_first:w_last] += np.square(s_c) / n_div
+                sum_n2[w_first:w_last] += np.square(n_c)
+                sum_ss_res[w_first:w_last] += np.maximum(ss_c - np.square(s_c) / n_div, 0)
+
+        z = 1.96  # z-score of the 95% estimated interval assuming a normal distribution of diff
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b0 = s / n + shift_diff
+            if loa_subtype == 'Classic':
+                # classic limits of agreement of every window, see LoAAccumulator.loa_classic
+                std = np.sqrt(np.maximum(ss - np.square(s) / n, 0) / (n - 1))
+                occupied = n >= min_observations
+            else:
+                # one-way ANOVA of every window from the sums of every cluster, see
+                # LoAAccumulator.loa_repeated_measurements
+                ms_sub = (sum_s2_n - np.square(s) / n) / (obs_sub - 1)
+                ms_res = sum_ss_res / (n - obs_sub)
+                div = (np.square(n) - sum_n2) / ((obs_sub - 1) * n)
+                std = np.sqrt((ms_sub - ms_res) / div + ms_res)
+                occupied = (n >= min_observations) & (obs_sub >= min_clusters) & (obs_sub >= 2) & (obs_sub < n)
+        g0 = std * z
+
+        # save in df_bias_loa_time, windows that are not occupied or without statistics are dropped
+        df_bias_loa_time = pd.DataFrame({
+            'Bias': b0,
+            'UpperLoA': b0 + g0,
+            'LowerLoA': b0 - g0,
+            'TimeStart': starts.astype('datetime64[ns]'),
+            'TimeEnd': (starts + size_ns).astype('datetime64[ns]'),
+        })
+        df_bias_loa_time = df_bias_loa_time[occupied].dropna(axis=0, how='any')
+
+        return [df_bias_loa_time, assumptions]
+
+    except Exception as e:
+        return e
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from scipy import signal
+from ValidSense import analysis
+
+# kernels on u = (time - evaluation time) / bandwidth, and the |u| beyond which the weights are neglected
+kernels = {
+    'Gaussian': [lambda u: np.exp(-0.5 * np.square(u)), 4.0],
+    'Epanechnikov': [lambda u: np.maximum(1 - np.square(u), 0), 1.0],
+}
+
+
+def _weighted_sums_direct(time_sorted, diff_sorted, grid, bandwidth_ns, kernel: str, chunk: int = 10000000):
+    """
+    Function to calculate the sums of the weights, squared weights, weighted difference and weighted squared difference
+    for every evaluation time, from the measurements within the support of the kernel.
+    :return: (numpy array) sums with shape (4, len(grid)).
+    """
+    [weight, support] = kernels[kernel]
+    first = np.searchsorted(time_sorted, grid - support * bandwidth_ns, side='left')
+    last = np.searchsorted(time_sorted, grid + support * bandwidth_ns, side='right')
+    length = last - first
+    sums = np.zeros((4, len(grid)))
+
+    # evaluation times in blocks of at most chunk (evaluation time, measurement) pairs, at least one evaluation time
+    cumulative = np.concatenate([[0], np.cumsum(length)])
+    start = 0
+    while start < len(grid):
+        stop = max(int(np.searchsorted(cumulative, cumulative[start] + chunk, side='right')) - 1, start + 1)
+        g = np.arange(start, stop)
+        # measurement index of every pair, the ranges first:last of the evaluation times concatenated
+        pair_grid = np.repeat(g, length[g])
+        offsets = np.repeat(cumulative[g] - cumulative[start], length[g])
+        pair_row = first[pair_grid] + np.arange(len(pair_grid)) - offsets
+        w = weight((time_sorted[pair_row] - grid[pair_grid]) / bandwidth_ns)
+        d = diff_sorted[pair_row]
+        for k, values in enumerate([w, np.square(w), w * d, w * np.square(d)]):
+            sums[k, g] = np.bincount(pair_grid - start, weights=values, minlength=len(g))
+        start = stop
+    return sums
+
+
+def _weighted_sums_binned(time_sorted, diff_sorted, grid, bandwidth_ns, kernel: str):
+    """
+    Function to approximate the sums of _weighted_sums_direct with the measurements binned to the nearest evaluation
+    time and an FFT convolution with the kernel.
+    :return: (numpy array) sums with shape (4, len(grid)).
+    """
+    [weight, support] = kernels[kernel]
+    step_ns = grid[1] - grid[0] if len(grid) > 1 else bandwidth_ns
+    bins = np.clip(np.rint((time_sorted - grid[0]) / step_ns).astype(np.int64), 0, len(grid) - 1)
+    binned = [np.bincount(bins, weights=values, minlength=len(grid)) for values in
+              [np.ones(len(diff_sorted)), diff_sorted, np.square(diff_sorted)]]
+
+    # kernel on the grid of the bins
+    lags = np.arange(-int(support * bandwidth_ns // step_ns), int(support * bandwidth_ns // step_ns) + 1)
+    w = weight(lags * step_ns / bandwidth_ns)
+    sums = np.zeros((4, len(grid)))
+    for k, [kernel_values, values] in enumerate([(w, binned[0]), (np.square(w), binned[0]), (w, binned[1]),
+                                                 (w, binned[2])]):
+        sums[k] = signal.fftconvolve(values, kernel_values, mode='same')
+    sums[[0, 1, 3]] = np.maximum(sums[[0, 1, 3]], 0)   # no negative rounding remainders of the FFT
+    return sums
+
+
+def longitudinal_kernel(df, bandwidth: str = '1h', grid_step: str = '10min', kernel: str = 'Gaussian',
+                        method: str = 'Auto', col_datetime: str = 'Datetime', min_observations: float = 2.0):
+    """
+    Function to calculate the bias and 95% LoA as smooth functions of time. At every evaluation time of a regular grid,
+    the classic limits of agreement are calculated with kernel weights of the measurements instead of a hard window,
+    from vectorised weighted moments. method 'Direct' sums over the measurements within the support of the kernel,
+    'Binned' bins the measurements to the grid and convolves with the kernel by FFT, which is faster for large data
+    but places the measurements at the nearest evaluation time. The result can be shown with analysis.fig_agreement_plot
+    (col_time='Time').
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with column 'Diff' and col_datetime.
+    :param bandwidth: (str = '1h') bandwidth of the kernel, as pandas Timedelta string. The standard deviation of the
+    Gaussian kernel, the half-width of the Epanechnikov kernel.
+    :param grid_step: (str = '10min') step between the evaluation times, as pandas Timedelta string.
+    :param kernel: (str = 'Gaussian') 'Gaussian' (weights beyond 4 bandwidths are neglected) or 'Epanechnikov'.
+    :param method: (str = 'Auto') 'Direct', 'Binned' or 'Auto' ('Binned' for more than 100000 measurements).
+    :param col_datetime: (str = 'Datetime') column containing both date and time.
+    :param min_observations: (float = 2.0) minimal effective number of measurements, (sum of weights)^2 / sum of
+    squared weights, of an evaluation time to calculate its statistics.
+    :return: ([pandas DataFrame, str]) dataframe with columns 'Time', 'Bias', 'UpperLoA', 'LowerLoA', 'TimeStart',
+    'TimeEnd' (support of the kernel) and 'EffectiveN', and the assumptions.
+    """
+
+    methods = [
+        "Auto",
+        "Direct",
+        "Binned",
+    ]
+
+    # warning
+    if not isinstance(df, (pd.DataFrame, analysis.AnalysisFrame)):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame or AnalysisFrame")
+    if not isinstance(bandwidth, str):
+        raise TypeError(f"bandwidth is of type {type(bandwidth).__name__}, should be str")
+    if not isinstance(grid_step, str):
+        raise TypeError(f"grid_step is of type {type(grid_step).__name__}, should be str")
+    if not isinstance(kernel, str):
+        raise TypeError(f"kernel is of type {type(kernel).__name__}, should be str")
+    if not isinstance(method, str):
+        raise TypeError(f"method is of type {type(method).__name__}, should be str")
+    if not isinstance(col_datetime, str):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(min_observations, (int, float)):
+        raise TypeError(f"min_observations is of type {type(min_observations).__name__}, should be float")
+    if kernel not in kernels:
+        raise KeyError("kernel should be of type 'Gaussian' or 'Epanechnikov'")
+    if method not in methods:
+        raise KeyError("method should be of type 'Auto', 'Direct' or 'Binned'")
+    if isinstance(df, analysis.AnalysisFrame):
+        if df.time is None or df.col_datetime != col_datetime:
+            raise KeyError("col_datetime is not the time of the AnalysisFrame")
+    else:
+        if col_datetime not in df.columns:
+            raise KeyError("col_datetime not existing in df")
+        if 'Diff' not in df.columns:
+            raise KeyError("Diff not existing in df")
+        if df['Diff'].isnull().values.any():
+            raise ValueError("Diff contains missing values")
+        if df[col_datetime].isnull().values.any():
+            raise ValueError("col_datetime contains missing values")
+
+    try:
+        assumptions = [
+            True,  # Assumption 0: Normal distribution of the difference
+            True,  # Assumption 1: Constant agreement over the measurement range
+            True,  # Assumption 2: Independent observations
+            False, # Assumption 3: Within-cluster-SD independent of cluster-mean
+            False, # Assumption 4: Normal distribution of residuals
+            False, # Assumption 5: Homogeneity of residuals
+            False, # Assumption 6: Exogeneity of fixed effects.
+        ]
+
+        bandwidth_ns = pd.Timedelta(bandwidth).value
+        step_ns = pd.Timedelta(grid_step).value
+        if bandwidth_ns <= 0 or step_ns <= 0:
+            raise ValueError("bandwidth and grid_step should be positive durations")
+
+        # measurements sorted by time, the difference around its mean for less rounding
+        if isinstance(df, analysis.AnalysisFrame):
+            [time_ns, diff] = [df.time, df.diff]
+        else:
+            time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            diff = df['Diff'].to_numpy(dtype=np.float64)
+        if len(time_ns) == 0:
+            raise ValueError("df is empty")
+        order = np.argsort(time_ns, kind='stable')
+        time_sorted = time_ns[order]
+        shift = float(np.mean(diff))
+        diff_sorted = diff[order] - shift
+
+        # evaluation times at multiples of grid_step since the UNIX epoch
+        grid_first = time_sorted[0] // step_ns * step_ns
+        grid = grid_first + np.arange(int((time_sorted[-1] - grid_first) // step_ns) + 1, dtype=np.int64) * step_ns
+
+        if method == 'Auto':
+            method = 'Binned' if len(time_sorted) > 100000 else 'Direct'
+        if method == 'Direct':
+            [w0, ww, w1, w2] = _weighted_sums_direct(time_sorted, diff_sorted, grid, bandwidth_ns, kernel)
+        else:
+            [w0, ww, w1, w2] = _weighted_sums_binned(time_sorted, diff_sorted, grid, bandwidth_ns, kernel)
+
+        # weighted mean and unbiased weighted standard deviation (reliability weights)
+        z = 1.96  # z-score of the 95% estimated interval assuming a normal distribution of diff
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n_eff = np.square(w0) / ww
+            b0 = w1 / w0
+            std = np.sqrt(np.maximum(w2 - np.square(w1) / w0, 0) / (w0 - ww / w0))
+        g0 = std * z
+
+        # save in df_bias_loa_time, evaluation times with too few measurements are dropped
+        support_ns = int(kernels[kernel][1] * bandwidth_ns)
+        df_bias_loa_time = pd.DataFrame({
+            'Time': grid.astype('datetime64[ns]'),
+            'Bias': b0 + shift,
+            'UpperLoA': b0 + shift + g0,
+            'LowerLoA': b0 + shift - g0,
+            'TimeStart': (grid - support_ns).astype('datetime64[ns]'),
+            'TimeEnd': (grid + support_ns).astype('datetime64[ns]'),
+            'EffectiveN': n_eff,
+        })
+        df_bias_loa_time = df_bias_loa_time[n_eff >= min_observations].dropna(axis=0, how='any')
+
+        return [df_bias_loa_time, assumptions]
+
+    except Exception as e:
+        return e
@@ -0,0 +1,114 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from ValidSense import analysis
+
+
+def _longitudinal_batch(df_batch: pd.DataFrame, group_by: str, settings: dict):
+    """
+    Function to run the classic longitudinal analysis of every cluster of a batch, in a worker process.
+    :param df_batch: (pandas DataFrame) measurements of the clusters of the batch, in cluster order.
+    :param group_by: (str) cluster column.
+    :param settings: (dict) arguments of analysis.longitudinal_analysis.
+    :return: (list) dataframe with the windows of every cluster.
+    """
+    codes = pd.factorize(df_batch[group_by])[0]
+    bounds = np.flatnonzero(np.diff(codes)) + 1     # first row of every cluster after the first
+    results = []
+    for rows in np.split(np.arange(len(df_batch)), bounds):
+        df_cluster = df_batch.take(rows)
+        result = analysis.longitudinal_analysis(df=df_cluster, loa_subtype='Classic', **settings)
+        if isinstance(result, Exception):
+            raise result
+        df_bias_loa_time = result[0].reset_index(drop=True)
+        df_bias_loa_time.insert(0, 'Window', np.arange(len(df_bias_loa_time)))
+        df_bias_loa_time.insert(0, group_by, df_cluster[group_by].iloc[0])
+        results.append(df_bias_loa_time)
+    return results
+
+
+def longitudinal_per_cluster(df: pd.DataFrame, group_by: str, window_unit: str, window_size: int,
+                             col_datetime: str = 'Datetime', window_stride: int = 1, min_observations: int = 2,
+                             window_mode: str = 'Time', max_workers: int = None, batches_per_worker: int = 4):
+    """
+    Function to calculate the agreement trajectory of every cluster on its own, for example per patient over the stay:
+    the classic longitudinal analysis (see analysis.longitudinal_analysis) of the measurements of one cluster, with
+    windows from the first measurement of that cluster. The clusters are divided in batches that run in a pool of
+    processes.
+    :param df: (pandas DataFrame) dataframe with columns 'Diff', 'Mean', col_datetime and group_by.
+    :param group_by: (str) cluster column.
+    :param window_unit: (str) window unit in weeks (W), days (D), hours (h), minutes (min) or seconds (s).
+    :param window_size: (int) window size, in window_unit, or in measurements for window_mode 'Observations'.
+    :param col_datetime: (str = 'Datetime') column containing both date and time.
+    :param window_stride: (int = 1) step between the start of consecutive windows.
+    :param min_observations: (int = 2) minimal number of measurements in a window to calculate its statistics.
+    :param window_mode: (str = 'Time') 'Time' or 'Observations', see analysis.longitudinal_analysis.
+    :param max_workers: (int = None) number of processes, None for the number of processors, 1 to run in this process.
+    :param batches_per_worker: (int = 4) number of batches of clusters per process, more batches balance the load.
+    :return: (pandas DataFrame) long table with columns group_by, 'Window' (number of the window of the cluster),
+    'Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd', 'RowStart', 'RowEnd' (row span in the rows of the
+    cluster sorted by time) and 'Fingerprint', one row for every window of every cluster.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(group_by, str):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str")
+    if not isinstance(max_workers, (int, type(None))):
+        raise TypeError(f"max_workers is of type {type(max_workers).__name__}, should be int or NoneType")
+    if not isinstance(batches_per_worker, int):
+        raise TypeError(f"batches_per_worker is of type {type(batches_per_worker).__name__}, should be int")
+    if not isinstance(window_mode, str):
+        raise TypeError(f"window_mode is of type {type(window_mode).__name__}, should be str")
+    if window_mode not in ['Time', 'Observations']:
+        raise KeyError("window_mode should be of type 'Time' or 'Observations'")
+    for col in ['Diff', 'Mean', col_datetime, group_by]:
+        if col not in df.columns:
+            raise KeyError(f"{col} not existing in df")
+    if df[group_by].isnull().values.any():
+        raise ValueError("group_by contains missing values")
+    if max_workers is not None and max_workers <= 0:
+        raise ValueError("max_workers is not a positive number")
+    if batches_per_worker <= 0:
+        raise ValueError("batches_per_worker is not a positive number")
+
+    try:
+        settings = {
+            'window_unit': window_unit,
+            'window_size': window_size,
+            'col_datetime': col_datetime,
+            'window_stride': window_stride,
+            'min_observations': min_observations,
+            'window_mode': window_mode,
+        }
+
+        # only the needed columns, in cluster order, divided in batches of whole clusters
+        codes = pd.factorize(df[group_by])[0]
+        order = np.argsort(codes, kind='stable')
+        df_sorted = df[[group_by, col_datetime, 'Diff', 'Mean']].take(order)
+        cluster_first = np.searchsorted(codes[order], np.arange(codes.max() + 1 if len(codes) > 0 else 0))
+        workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        count_batches = max(min(workers * batches_per_worker, len(cluster_first)), 1)
+        batch_first = cluster_first[np.linspace(0, len(cluster_first), count_batches, endpoint=False).astype(int)] \
+            if len(cluster_first) > 0 else np.zeros(0, dtype=np.int64)
+        batches = [df_sorted.iloc[start:stop] for start, stop in zip(batch_first, np.append(batch_first[1:],
+                                                                                            len(df_sorted)))]
+
+        # batches in a pool of processes, or in this process
+        if workers == 1:
+            results = [_longitudinal_batch(batch, group_by, settings) for batch in batches]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_longitudinal_batch, batches, [group_by] * len(batches),
+                                            [settings] * len(batches)))
+
+        results = [df_cluster for result in results for df_cluster in result]
+        if len(results) == 0:
+            return pd.DataFrame(columns=[group_by, 'Window', 'Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd',
+                                         'RowStart', 'RowEnd', 'Fingerprint'])
+        return pd.concat(results, ignore_index=True)
+
+    except Exception as e:
+        return e
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from ValidSense import analysis, pre
+
+
+def window_order(df, col_datetime: str = 'Datetime', window_mode: str = 'Time', group_by: str = None):
+    """
+    Function to get the order of the rows in which the windows of analysis.longitudinal_analysis are consecutive rows:
+    sorted by time for window_mode 'Time' and 'Observations', and for 'Clusters' sorted by the rank of the cluster by
+    its first measurement and then by time. The rows of a window are order[RowStart:RowEnd] of df_bias_loa_time.
+    :param df: (pandas DataFrame or AnalysisFrame) dataframe with col_datetime, and group_by for 'Clusters'.
+    :param col_datetime: (str = 'Datetime') column containing both date and time.
+    :param window_mode: (str = 'Time') 'Time', 'Observations' or 'Clusters', see analysis.longitudinal_analysis.
+    :param group_by: (str = None) if window_mode is 'Clusters': cluster column.
+    :return: ([numpy array, numpy array]) position of the rows in window order (int64), and for 'Clusters' the first
+    row of every cluster in window order plus the number of rows (None for the other window modes).
+    """
+
+    modes = ['Time', 'Observations', 'Clusters']
+
+    # warning
+    if not isinstance(df, (pd.DataFrame, analysis.AnalysisFrame)):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame or AnalysisFrame")
+    if not isinstance(col_datetime, str):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(window_mode, str):
+        raise TypeError(f"window_mode is of type {type(window_mode).__name__}, should be str")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if window_mode not in modes:
+        raise KeyError("window_mode should be of type 'Time', 'Observations' or 'Clusters'")
+    if window_mode == 'Clusters' and group_by is None:
+        raise TypeError("group_by should not be None")
+    if isinstance(df, analysis.AnalysisFrame):
+        if df.time is None or df.col_datetime != col_datetime:
+            raise KeyError("col_datetime is not the time of the AnalysisFrame")
+        if window_mode == 'Clusters' and df.group_by != group_by:
+            raise KeyError("group_by is not the cluster of the AnalysisFrame")
+    else:
+        if col_datetime not in df.columns:
+            raise KeyError("col_datetime not existing in df")
+        if window_mode == 'Clusters' and group_by not in df.columns:
+            raise KeyError("group_by not existing in df")
+
+    try:
+        if isinstance(df, analysis.AnalysisFrame):
+            time_ns = df.time
+        else:
+            time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+        if window_mode != 'Clusters':
+            return [np.argsort(time_ns, kind='stable'), None]
+
+        # cluster codes in sorted order of the clusters, as the AnalysisFrame
+        if isinstance(df, analysis.AnalysisFrame):
+            [codes, labels] = [df.cluster, df.cluster_labels]
+        else:
+            codes = pre.cluster_codes(df=df, group_by=group_by)
+            if isinstance(codes, Exception):
+                raise codes
+            [codes, labels] = codes
+
+        # clusters ranked by entry (first measurement), rows sorted by the rank of their cluster and time
+        entry = np.full(len(labels), np.iinfo(np.int64).max)
+        np.minimum.at(entry, codes, time_ns)
+        cluster_rank = np.empty(len(labels), dtype=np.int64)
+        cluster_rank[np.argsort(entry, kind='stable')] = np.arange(len(labels))  # clusters without rows are last
+        order = np.lexsort((time_ns, cluster_rank[codes]))
+        count_filled = int(np.count_nonzero(np.bincount(codes, minlength=len(labels))))
+        bounds = np.searchsorted(cluster_rank[codes][order], np.arange(count_filled + 1))
+        return [order, bounds]
+
+    except Exception as e:
+        return e
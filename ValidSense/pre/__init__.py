@@ -1,4 +1,18 @@
+from .cluster_codes import cluster_codes
+from .df_cube import df_cube
+from .df_cube_load import df_cube_load
+from .df_cube_save import df_cube_save
 from .df_diff_mean import df_diff_mean
+from .df_downsample import df_downsample
+from .df_drop_duplicates import df_drop_duplicates
+from .df_fingerprint import df_fingerprint
+from .df_long_to_paired import df_long_to_paired
+from .df_pair_asof import df_pair_asof
+from .df_relative_time import df_relative_time
 from .df_rename_col import df_rename_col
+from .df_sort_cluster import df_sort_cluster
 from .df_to_datetime import df_to_datetime
 from .missing import missing
+from .missing_mask import missing_mask
+from .pipeline import pipeline
+from .plausibility_mask import plausibility_mask
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+
+def cluster_codes(df: pd.DataFrame, group_by: str):
+    """
+    Function to get integer codes of the clusters, in sorted order of the clusters. A dataframe that is still in the
+    (cluster, time) order of pre.df_sort_cluster, also after selecting rows, reuses the sorted clusters in
+    df.attrs['cluster_index']: only the clusters at the boundaries between consecutive clusters are looked up, instead
+    of hashing every row. Otherwise the clusters are factorised.
+    :param df: (pandas DataFrame) dataframe with group_by.
+    :param group_by: (str) cluster column.
+    :return: ([numpy array, numpy array]) cluster code of every row (int64) and the sorted clusters.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(group_by, str):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str")
+    if group_by not in df.columns:
+        raise KeyError("group_by not existing in df")
+
+    try:
+        # clusters of every run of equal consecutive values, looked up in the sorted clusters of preprocessing
+        cluster_index = df.attrs.get('cluster_index')
+        if cluster_index is not None and cluster_index['group_by'] == group_by and len(df) > 0 and \
+                cluster_index.get('labels') is not None and len(cluster_index['labels']) > 0:
+            labels = cluster_index['labels']
+            values = df[group_by].to_numpy()
+            start = np.concatenate([[0], np.flatnonzero(values[1:] != values[:-1]) + 1])
+            try:
+                run_codes = np.searchsorted(labels, values[start])
+                found = np.all(run_codes < len(labels)) and \
+                    np.all(labels[np.minimum(run_codes, len(labels) - 1)] == values[start])
+            except TypeError:
+                found = False   # clusters of different types can not be compared
+            # every cluster is one run, in sorted order of the clusters
+            if found and np.all(np.diff(run_codes) > 0):
+                codes = np.repeat(run_codes.astype(np.int64), np.diff(np.append(start, len(values))))
+                return [codes, labels]
+
+        codes, uniques = pd.factorize(df[group_by], sort=True)
+        return [codes.astype(np.int64), np.asarray(uniques)]
+
+    except Exception as e:
+        return e
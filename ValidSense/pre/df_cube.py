@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+
+def df_cube(df: pd.DataFrame, group_by: str = None, col_datetime: str = 'Datetime', bucket: str = '1h'):
+    """
+    Function to build the cube of sufficient statistics per cluster and time bucket: the number of measurements, the
+    sums of Diff, Diff^2, Mean, Mean^2 and Mean*Diff and the first and last time. The classic, repeated measurements
+    and linear regression of difference limits of agreement of any subset of clusters and time buckets follow from sums
+    of the cube, see analysis.loa_cube, without the measurements. The sums are of Diff and Mean minus their overall
+    mean (saved in df_cube.attrs['cube'] as 'shift_diff' and 'shift_mean'), so the sums of squares do not cancel for
+    large offsets. The cube is a small dataframe that can be saved instead of the data, see pre.df_cube_save.
+    :param df: (pandas DataFrame) dataframe with columns 'Mean', 'Diff' and col_datetime, without missing values.
+    :param group_by: (str = None) cluster column, None for one cluster.
+    :param col_datetime: (str = 'Datetime') column containing both date and time.
+    :param bucket: (str = '1h') size of the time buckets, as pandas Timedelta string, buckets start at multiples of
+    bucket since the UNIX epoch.
+    :return: (pandas DataFrame) cube with columns group_by (if not None), 'TimeBucket' (start of the bucket), 'N',
+    'SumDiff', 'SumDiff2', 'SumMean', 'SumMean2', 'SumMeanDiff' (sums of the shifted Diff and Mean), 'TimeMin' and
+    'TimeMax', one row for every non-empty cluster and bucket.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if not isinstance(col_datetime, str):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(bucket, str):
+        raise TypeError(f"bucket is of type {type(bucket).__name__}, should be str")
+    for col in ['Mean', 'Diff', col_datetime] + ([group_by] if group_by is not None else []):
+        if col not in df.columns:
+            raise KeyError(f"{col} not existing in df")
+        if df[col].isnull().values.any():
+            raise ValueError(f"{col} contains missing values")
+
+    try:
+        bucket_ns = pd.Timedelta(bucket).value
+        if bucket_ns <= 0:
+            raise ValueError("bucket is not a positive duration")
+
+        # bucket number of every measurement, relative to the first bucket
+        time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        time_bucket = time_ns // bucket_ns
+        bucket_first = time_bucket.min() if len(time_bucket) > 0 else 0
+        time_bucket -= bucket_first
+        count_buckets = int(time_bucket.max()) + 1 if len(time_bucket) > 0 else 1
+
+        # cluster codes in sorted order of the clusters
+        if group_by is None:
+            codes = np.zeros(len(df), dtype=np.int64)
+            uniques = None
+        else:
+            codes, uniques = pd.factorize(df[group_by], sort=True)
+
+        # one cell per non-empty (cluster, bucket)
+        key = codes.astype(np.int64) * count_buckets + time_bucket
+        cells, cell = np.unique(key, return_inverse=True)
+        diff = df['Diff'].to_numpy(dtype=np.float64)
+        mean = df['Mean'].to_numpy(dtype=np.float64)
+
+        # shifted by the overall mean, the sums of squares of the cells are then of the deviations
+        shift_diff = float(np.mean(diff)) if len(diff) > 0 else 0.0
+        shift_mean = float(np.mean(mean)) if len(mean) > 0 else 0.0
+        diff = diff - shift_diff
+        mean = mean - shift_mean
+
+        cube = {}
+        if group_by is not None:
+            cube[group_by] = np.asarray(uniques)[cells // count_buckets]
+        cube['TimeBucket'] = ((cells % count_buckets + bucket_first) * bucket_ns).astype('datetime64[ns]')
+        cube['N'] = np.bincount(cell, minlength=len(cells))
+        cube['SumDiff'] = np.bincount(cell, weights=diff, minlength=len(cells))
+        cube['SumDiff2'] = np.bincount(cell, weights=np.square(diff), minlength=len(cells))
+        cube['SumMean'] = np.bincount(cell, weights=mean, minlength=len(cells))
+        cube['SumMean2'] = np.bincount(cell, weights=np.square(mean), minlength=len(cells))
+        cube['SumMeanDiff'] = np.bincount(cell, weights=mean * diff, minlength=len(cells))
+
+        # first and last time of every cell, for windows that start and end at the first and last measurement
+        order = np.argsort(cell, kind='stable')
+        time_cell = time_ns[order]
+        bounds = np.searchsorted(cell[order], np.arange(len(cells)))
+        if len(cells) > 0:
+            cube['TimeMin'] = np.minimum.reduceat(time_cell, bounds).astype('datetime64[ns]')
+            cube['TimeMax'] = np.maximum.reduceat(time_cell, bounds).astype('datetime64[ns]')
+        else:
+            cube['TimeMin'] = time_cell.astype('datetime64[ns]')
+            cube['TimeMax'] = time_cell.astype('datetime64[ns]')
+        df_cube = pd.DataFrame(cube)
+        df_cube.attrs['cube'] = {'group_by': group_by, 'col_datetime': col_datetime, 'bucket': bucket,
+                                 'shift_diff': shift_diff, 'shift_mean': shift_mean}
+
+        return df_cube
+
+    except Exception as e:
+        return e
@@ -0,0 +1,26 @@
+import pandas as pd
+
+
+def df_cube_load(path: str):
+    """
+    Function to load a cube saved by pre.df_cube_save, as Parquet if path ends with '.parquet' (needs pyarrow),
+    otherwise as pickle. Only load pickles saved by yourself, loading a pickle can run any code.
+    :param path: (str) path of the file.
+    :return: (pandas DataFrame) cube of pre.df_cube, with its bucket and shifts in df_cube.attrs['cube'].
+    """
+
+    # warning
+    if not isinstance(path, str):
+        raise TypeError(f"path is of type {type(path).__name__}, should be str")
+
+    try:
+        if path.lower().endswith('.parquet'):
+            df_cube = pd.read_parquet(path)
+        else:
+            df_cube = pd.read_pickle(path)
+        if not isinstance(df_cube, pd.DataFrame) or 'cube' not in df_cube.attrs:
+            raise ValueError(f"{path} does not contain a cube of pre.df_cube")
+        return df_cube
+
+    except Exception as e:
+        return e
@@ -0,0 +1,30 @@
+import pandas as pd
+
+
+def df_cube_save(df_cube: pd.DataFrame, path: str):
+    """
+    Function to save the cube of pre.df_cube, with its bucket and shifts (df_cube.attrs['cube']), so it can be reused
+    without the data, see pre.df_cube_load. The cube is saved as Parquet if path ends with '.parquet' (needs pyarrow),
+    otherwise as pickle.
+    :param df_cube: (pandas DataFrame) cube of pre.df_cube.
+    :param path: (str) path of the file.
+    :return: (str) path of the saved file.
+    """
+
+    # warning
+    if not isinstance(df_cube, pd.DataFrame):
+        raise TypeError(f"df_cube is of type {type(df_cube).__name__}, should be pandas DataFrame")
+    if not isinstance(path, str):
+        raise TypeError(f"path is of type {type(path).__name__}, should be str")
+    if 'cube' not in df_cube.attrs:
+        raise KeyError("bucket of df_cube is unknown, df_cube should be made by pre.df_cube")
+
+    try:
+        if path.lower().endswith('.parquet'):
+            df_cube.to_parquet(path, index=False)  # attrs are saved in the metadata of the file
+        else:
+            df_cube.to_pickle(path)
+        return path
+
+    except Exception as e:
+        return e
@@ -0,0 +1,144 @@
+import pandas as pd
+import numpy as np
+
+
+def _segment_statistic(values: np.ndarray, start: np.ndarray, end: np.ndarray, statistic: str):
+    """
+    Function to calculate the mean or median of the segments values[start:end], vectorised over all segments.
+    :param values: (numpy array) values, sorted such that every segment is contiguous.
+    :param start: (numpy array) first index of every segment.
+    :param end: (numpy array) index after the last value of every segment.
+    :param statistic: (str) 'mean' or 'median'.
+    :return: ([numpy array, numpy array]) statistic (nan for empty segments) and number of values per segment.
+    """
+    counts = end - start
+    result = np.full(len(start), np.nan)
+    filled = counts > 0
+    if statistic == 'mean':
+        cumsum = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+        result[filled] = (cumsum[end[filled]] - cumsum[start[filled]]) / counts[filled]
+    elif statistic == 'median' and filled.any():
+        # values of all segments after each other, then sort the values within every segment
+        lengths = counts[filled]
+        segment = np.repeat(np.arange(len(lengths)), lengths)
+        offset = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        index = np.repeat(start[filled] - offset, lengths) + np.arange(lengths.sum())
+        segment_values = values[index]
+        segment_values = segment_values[np.lexsort((segment_values, segment))]
+        result[filled] = (segment_values[offset + (lengths - 1) // 2] + segment_values[offset + lengths // 2]) / 2
+    return [result, counts]
+
+
+def df_downsample(df: pd.DataFrame, device: str, col_datetime: str = 'Datetime', group_by: str = None,
+                  window: str = '1min', statistic: str = 'mean', anchor: str = None):
+    """
+    Function to downsample high-frequency measurements of one device (for example an arterial line) to the mean or
+    median per window, per cluster. With anchor, the windows are centered around the time of every measurement in the
+    anchor column (for example the Test device), and the rows of the high-frequency device are replaced by the
+    anchor rows with the downsampled value. Without anchor, the windows are fixed intervals from the UNIX epoch, and
+    the rows of the high-frequency device are replaced by one row per window, at the start of the window. Other rows
+    are kept. The measurements are sorted once, and every window is a contiguous slice of the sorted measurements.
+    :param df: (pandas DataFrame) dataframe with high-frequency measurements in column device.
+    :param device: (str) column with the high-frequency measurements.
+    :param col_datetime: (str = 'Datetime') column containing both date and time, in datetime64[ns].
+    :param group_by: (str = None) column in dataframe with clusters, windows only contain measurements of one cluster.
+    :param window: (str = '1min') window size, e.g. '30s', '1min'.
+    :param statistic: (str = 'mean') 'mean' or 'median' of the measurements in the window.
+    :param anchor: (str = None) column of the measurements (e.g. 'Dev1') where the windows are centered around.
+    :return: (pandas DataFrame) dataframe with the downsampled measurements in column device and the number of
+    measurements in the window in column device + 'Count'.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(device, str):
+        raise TypeError(f"device is of type {type(device).__name__}, should be str")
+    if not isinstance(col_datetime, str):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if not isinstance(window, str):
+        raise TypeError(f"window is of type {type(window).__name__}, should be str")
+    if not isinstance(anchor, (str, type(None))):
+        raise TypeError(f"anchor is of type {type(anchor).__name__}, should be str or NoneType")
+    if device not in df.columns:
+        raise KeyError("device not existing in df")
+    if col_datetime not in df.columns:
+        raise KeyError("col_datetime not existing in df")
+    if group_by is not None and group_by not in df.columns:
+        raise KeyError("group_by not existing in df")
+    if anchor is not None and anchor not in df.columns:
+        raise KeyError("anchor not existing in df")
+    if statistic not in ['mean', 'median']:
+        raise ValueError("statistic is not 'mean' or 'median'")
+    if pd.Timedelta(window) <= pd.Timedelta(0):
+        raise ValueError("window is not a positive time duration")
+
+    try:
+        window_ns = pd.Timedelta(window).value  # window in ns
+        col_count = device + 'Count'
+
+        # cluster codes, measurements without cluster or time are not downsampled
+        if group_by is None:
+            codes = np.zeros(len(df), dtype=np.int64)
+        else:
+            codes = pd.factorize(df[group_by])[0].astype(np.int64)
+        time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        key_available = (codes >= 0) & (~np.isnat(df[col_datetime].to_numpy(dtype='datetime64[ns]')))
+
+        # high-frequency measurements, sorted by cluster and time
+        is_device = key_available & df[device].notna().to_numpy()
+        device_index = np.flatnonzero(is_device)
+        order = np.lexsort((time_ns[device_index], codes[device_index]))
+        device_index = device_index[order]
+        device_codes = codes[device_index]
+        device_time = time_ns[device_index]
+        device_values = df[device].to_numpy(dtype=float)[device_index]
+
+        if anchor is not None:
+            # windows around every anchor measurement
+            is_anchor = key_available & df[anchor].notna().to_numpy()
+            anchor_index = np.flatnonzero(is_anchor)
+            anchor_codes = codes[anchor_index]
+            anchor_time = time_ns[anchor_index]
+
+            # time as rank in all high-frequency times, so (cluster, rank) fits in one sortable int64 key
+            times_sorted = np.sort(device_time)
+            n_rank = len(times_sorted) + 1
+            device_key = device_codes * n_rank + np.searchsorted(times_sorted, device_time, side='left')
+            start_key = anchor_codes * n_rank + np.searchsorted(times_sorted, anchor_time - window_ns // 2, side='left')
+            end_key = anchor_codes * n_rank + np.searchsorted(times_sorted, anchor_time + window_ns // 2, side='right')
+            start = np.searchsorted(device_key, start_key, side='left')
+            end = np.searchsorted(device_key, end_key, side='left')
+
+            [result, counts] = _segment_statistic(device_values, start, end, statistic)
+
+            # anchor rows with downsampled measurements, other rows except the high-frequency measurements
+            df_anchor = df.iloc[anchor_index].copy()
+            df_anchor[device] = result
+            df_anchor[col_count] = counts
+            keep = ~is_device & ~is_anchor
+            df_downsampled = pd.concat([df_anchor, df.iloc[np.flatnonzero(keep)]])
+            return df_downsampled.sort_values(by=col_datetime, kind='stable')
+
+        # fixed windows: measurements of the same cluster and window are contiguous after sorting
+        device_window = device_time // window_ns
+        new_segment = np.concatenate([[True], (np.diff(device_codes) != 0) | (np.diff(device_window) != 0)])
+        start = np.flatnonzero(new_segment)
+        end = np.append(start[1:], len(device_index))
+
+        [result, counts] = _segment_statistic(device_values, start, end, statistic)
+
+        df_window = pd.DataFrame({
+            col_datetime: (device_window[start] * window_ns).astype('datetime64[ns]'),
+            device: result,
+            col_count: counts,
+        })
+        if group_by is not None:
+            df_window.insert(loc=0, column=group_by, value=df[group_by].to_numpy()[device_index[start]])
+        df_downsampled = pd.concat([df_window, df.iloc[np.flatnonzero(~is_device)]], ignore_index=True)
+        return df_downsampled.sort_values(by=col_datetime, kind='stable')
+
+    except Exception as e:
+        return e
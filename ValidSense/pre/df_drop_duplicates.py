@@ -0,0 +1,69 @@
+import pandas as pd
+import numpy as np
+
+
+def df_drop_duplicates(df: pd.DataFrame, key_col: list, col_filename: str = 'Filename'):
+    """
+    Function to remove duplicate measurements, for example from overlapping files. A measurement is a duplicate when
+    the values in key_col are equal to those of an earlier row. The key columns are hashed per row, and duplicates are
+    found with a hash table in a single pass, without sorting the dataframe. Only the rows with a shared hash are
+    compared on their values, so a hash collision does not remove a measurement.
+    :param df: (pandas DataFrame) dataframe with duplicate measurements.
+    :param key_col: (list) columns identifying a measurement, for example the cluster, datetime, Dev1 and Dev2.
+    :param col_filename: (str = 'Filename') column with the file name, to report the duplicates per file.
+    :return: ([pandas DataFrame, pandas DataFrame]) dataframe without duplicates and dataframe with the number and
+    percentage of removed duplicates per file.
+    """
+
+    dec_perc = 1    # number of decimals for percentage
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(key_col, list):
+        raise TypeError(f"key_col is of type {type(key_col).__name__}, should be list")
+    if not isinstance(col_filename, (str, type(None))):
+        raise TypeError(f"col_filename is of type {type(col_filename).__name__}, should be str or NoneType")
+    if len(key_col) == 0:
+        raise Exception("key_col is empty, minimal 1 key column should be included")
+    if not all(col in df.columns for col in key_col):
+        raise KeyError("key_col not existing in df")
+
+    try:
+        # 64-bit hash of the key columns per row: rows with a unique hash are no duplicates
+        row_hash = pd.util.hash_pandas_object(df[key_col], index=False).to_numpy()
+        candidate = np.flatnonzero(pd.Series(row_hash).duplicated(keep=False).to_numpy())
+
+        # equality of the key columns is confirmed for the rows with a shared hash only, the first occurrence is kept
+        duplicate = np.zeros(len(df), dtype=bool)
+        if len(candidate) > 0:
+            duplicate[candidate] = df[key_col].iloc[candidate].duplicated(keep='first').to_numpy()
+
+        # number of duplicates per file
+        counts_total = df.shape[0]
+        if col_filename is not None and col_filename in df.columns:
+            counts = df[col_filename].iloc[np.flatnonzero(duplicate)].value_counts(sort=False)
+            index = ["Duplicate measurements: " + str(file_name) for file_name in counts.index]
+            counts = counts.to_numpy()
+        else:
+            index = []
+            counts = np.array([], dtype=np.int64)
+        counts = np.append(counts, np.count_nonzero(duplicate))
+        index.append("Duplicate measurements")
+
+        df_duplicates = pd.DataFrame(
+            {
+                'Counts': counts,
+                'Percentage': np.round(counts / max(counts_total, 1) * 100, dec_perc),
+            },
+            index=index,
+        )
+
+        # remove duplicates, only when there are duplicates
+        if duplicate.any():
+            df = df.take(np.flatnonzero(~duplicate))
+
+        return [df, df_duplicates]
+
+    except Exception as e:
+        return e
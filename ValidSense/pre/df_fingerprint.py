@@ -0,0 +1,26 @@
+import hashlib
+import pandas as pd
+
+
+def df_fingerprint(df: pd.DataFrame):
+    """
+    Function to calculate a fingerprint of the content of a dataframe, to recognise the same dataset, for example as
+    cache key. The column names, data types, index and all values are included.
+    :param df: (pandas DataFrame) dataframe.
+    :return: (str) hexadecimal fingerprint of df.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+
+    try:
+        fingerprint = hashlib.blake2b(digest_size=16)
+        # shape, column names and data types
+        fingerprint.update(str((df.shape, list(df.columns), [str(dtype) for dtype in df.dtypes])).encode())
+        # values and index, vectorised hash per row
+        fingerprint.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return fingerprint.hexdigest()
+
+    except Exception as e:
+        return e
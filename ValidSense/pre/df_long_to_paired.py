@@ -0,0 +1,81 @@
+import pandas as pd
+import numpy as np
+
+
+def df_long_to_paired(df: pd.DataFrame, col_device: str, col_value: str, key_col: list, test_label,
+                      ref_label):
+    """
+    Function to convert long format (one row per device measurement, with the device in column col_device) to paired
+    format, with the Test and Reference measurement of the same key in one row, in column 'Dev1' and 'Dev2'. Keys with
+    more than one Test or Reference measurement are reported and removed instead of aggregated. Keys with only a Test
+    or only a Reference measurement get a missing value for the other device.
+    :param df: (pandas DataFrame) dataframe in long format.
+    :param col_device: (str) column indicating the device.
+    :param col_value: (str) column with the measurements.
+    :param key_col: (list) columns identifying a pair, for example the subject and time.
+    :param test_label: value in col_device of the Test device measurements.
+    :param ref_label: value in col_device of the Reference device measurements.
+    :return: ([pandas DataFrame, pandas DataFrame]) dataframe in paired format with key_col, 'Dev1' and 'Dev2', and
+    dataframe with the rows of the duplicate keys.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(col_device, str):
+        raise TypeError(f"col_device is of type {type(col_device).__name__}, should be str")
+    if not isinstance(col_value, str):
+        raise TypeError(f"col_value is of type {type(col_value).__name__}, should be str")
+    if not isinstance(key_col, list):
+        raise TypeError(f"key_col is of type {type(key_col).__name__}, should be list")
+    if len(key_col) == 0:
+        raise Exception("key_col is empty, minimal 1 key column should be included")
+    if col_device not in df.columns:
+        raise KeyError("col_device not existing in df")
+    if col_value not in df.columns:
+        raise KeyError("col_value not existing in df")
+    if not all(col in df.columns for col in key_col):
+        raise KeyError("key_col not existing in df")
+    if test_label == ref_label:
+        raise ValueError("test_label and ref_label should be different")
+
+    try:
+        # only measurements of the Test and Reference device
+        device = df[col_device].to_numpy()
+        is_test = device == test_label
+        is_ref = device == ref_label
+        df_long = df.iloc[np.flatnonzero(is_test | is_ref)]
+        is_test = is_test[is_test | is_ref]
+
+        # key code per row (hash-based factorisation of the key columns)
+        if len(key_col) == 1:
+            key_code = pd.factorize(df_long[key_col[0]], use_na_sentinel=False)[0]
+        else:
+            key_code = df_long.groupby(key_col, sort=False, dropna=False).ngroup().to_numpy()
+        n_keys = key_code.max() + 1 if len(key_code) > 0 else 0
+
+        # number of Test and Reference measurements per key
+        count_test = np.bincount(key_code[is_test], minlength=n_keys)
+        count_ref = np.bincount(key_code[~is_test], minlength=n_keys)
+        duplicate_key = (count_test > 1) | (count_ref > 1)
+        duplicate_row = duplicate_key[key_code]
+        df_duplicates = df_long.iloc[np.flatnonzero(duplicate_row)]
+
+        # first row per key holds the key columns, Test and Reference measurement scattered by key code
+        valid_key = ~duplicate_key
+        first_row = np.full(n_keys, len(key_code))
+        np.minimum.at(first_row, key_code, np.arange(len(key_code)))
+        df_paired = df_long[key_col].iloc[first_row[valid_key]].reset_index(drop=True)
+
+        values = df_long[col_value].to_numpy()
+        dev1 = np.full(n_keys, np.nan)
+        dev2 = np.full(n_keys, np.nan)
+        dev1[key_code[is_test]] = values[is_test]
+        dev2[key_code[~is_test]] = values[~is_test]
+        df_paired['Dev1'] = dev1[valid_key]
+        df_paired['Dev2'] = dev2[valid_key]
+
+        return [df_paired, df_duplicates]
+
+    except Exception as e:
+        return e
@@ -0,0 +1,95 @@
+import pandas as pd
+import numpy as np
+
+
+def df_pair_asof(df: pd.DataFrame, col_datetime: str = 'Datetime', test_device: str = 'Dev1',
+                 ref_device: str = 'Dev2', group_by: str = None, tolerance: str = None, direction: str = 'nearest'):
+    """
+    Function to pair unsynchronised measurements of the Test and Reference device, for example when both devices are
+    recorded in separate files. Rows where test_device is available form the Test stream, rows where ref_device is
+    available form the Reference stream. Every Test measurement is paired with the Reference measurement of the same
+    cluster that is nearest in time (sorted as-of join), within the tolerance. A Reference measurement can be paired
+    with multiple Test measurements. Test measurements without a Reference measurement are removed.
+    :param df: (pandas DataFrame) dataframe with the Test and Reference stream.
+    :param col_datetime: (str = 'Datetime') column containing both date and time, in datetime64[ns].
+    :param test_device: (str = 'Dev1') column name of Test device.
+    :param ref_device: (str = 'Dev2') column name of Reference device.
+    :param group_by: (str = None) column in dataframe with clusters, only measurements of the same cluster are paired.
+    :param tolerance: (str = None) maximal time between paired measurements (e.g. '5min'), None is no maximum.
+    :param direction: (str = 'nearest') search for the Reference measurement 'backward', 'forward' or 'nearest' in
+    time.
+    :return: ([pandas DataFrame, pandas DataFrame]) dataframe with paired measurements sorted by col_datetime, with
+    the time of the Reference measurement in column col_datetime + 'Ref', and dataframe with the number of paired and
+    unpaired Test measurements.
+    """
+
+    dec_perc = 1    # number of decimals for percentage
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(col_datetime, str):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(test_device, str):
+        raise TypeError(f"test_device is of type {type(test_device).__name__}, should be str")
+    if not isinstance(ref_device, str):
+        raise TypeError(f"ref_device is of type {type(ref_device).__name__}, should be str")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if not isinstance(tolerance, (str, type(None))):
+        raise TypeError(f"tolerance is of type {type(tolerance).__name__}, should be str or NoneType")
+    if col_datetime not in df.columns:
+        raise KeyError("col_datetime not existing in df")
+    if test_device not in df.columns:
+        raise KeyError("test_device not existing in df")
+    if ref_device not in df.columns:
+        raise KeyError("ref_device not existing in df")
+    if group_by is not None and group_by not in df.columns:
+        raise KeyError("group_by not existing in df")
+    if direction not in ['backward', 'forward', 'nearest']:
+        raise ValueError("direction is not 'backward', 'forward' or 'nearest'")
+
+    try:
+        col_datetime_ref = col_datetime + 'Ref'
+        col_key = [col_datetime] if group_by is None else [col_datetime, group_by]
+
+        # time and cluster are required for pairing
+        key_available = df[col_key].notna().all(axis=1).to_numpy()
+
+        # Test stream with all other columns, Reference stream with time, cluster and Reference measurements
+        test_stream = df.loc[key_available & df[test_device].notna().to_numpy()]
+        test_stream = test_stream.drop(columns=ref_device).sort_values(by=col_datetime, kind='stable')
+        ref_stream = df.loc[key_available & df[ref_device].notna().to_numpy(), col_key + [ref_device]]
+        ref_stream = ref_stream.rename(columns={col_datetime: col_datetime_ref}).sort_values(
+            by=col_datetime_ref, kind='stable')
+
+        # sorted as-of join, per cluster when group_by is used
+        df_paired = pd.merge_asof(
+            left=test_stream,
+            right=ref_stream,
+            left_on=col_datetime,
+            right_on=col_datetime_ref,
+            by=group_by,
+            tolerance=None if tolerance is None else pd.Timedelta(tolerance),
+            direction=direction,
+        )
+
+        # remove unpaired Test measurements
+        paired = df_paired[ref_device].notna().to_numpy()
+        if not paired.all():
+            df_paired = df_paired.take(np.flatnonzero(paired))
+        df_paired = df_paired.reset_index(drop=True)
+
+        counts_test = int(df[test_device].notna().sum())
+        counts = np.array([counts_test, len(df_paired), counts_test - len(df_paired)])
+        df_pairing = pd.DataFrame(
+            {
+                'Counts': counts,
+                'Percentage': np.round(counts / max(counts_test, 1) * 100, dec_perc),
+            },
+            index=["Test measurements", "Paired measurements", "Unpaired measurements"],
+        )
+        return [df_paired, df_pairing]
+
+    except Exception as e:
+        return e
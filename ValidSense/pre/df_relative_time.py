@@ -0,0 +1,54 @@
+import pandas as pd
+import numpy as np
+
+
+def df_relative_time(df: pd.DataFrame, group_by: str, col_datetime: str = 'Datetime', col_anchor: str = None,
+                     col_relative: str = 'TimeRelative'):
+    """
+    Function to align the clusters in time: the time of every measurement relative to the anchor of its cluster, for
+    example hours since admission. The anchor is the first measurement of the cluster where col_anchor is 1 (for
+    example 'EntryBP'), or the first measurement of the cluster if col_anchor is None. The relative time is saved as
+    datetime since 1970/01/01, so it can be used as col_datetime of the longitudinal analyses and as x-axis of the
+    figures.
+    :param df: (pandas DataFrame) dataframe with group_by and col_datetime.
+    :param group_by: (str) cluster column.
+    :param col_datetime: (str = 'Datetime') column containing both date and time.
+    :param col_anchor: (str = None) column that is 1 at the anchor event, None for the first measurement.
+    :param col_relative: (str = 'TimeRelative') column name of the relative time.
+    :return: (pandas DataFrame) dataframe with the relative time added as column.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(group_by, str):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str")
+    if not isinstance(col_datetime, str):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str")
+    if not isinstance(col_anchor, (str, type(None))):
+        raise TypeError(f"col_anchor is of type {type(col_anchor).__name__}, should be str or NoneType")
+    if not isinstance(col_relative, str):
+        raise TypeError(f"col_relative is of type {type(col_relative).__name__}, should be str")
+    for col in [group_by, col_datetime] + ([col_anchor] if col_anchor is not None else []):
+        if col not in df.columns:
+            raise KeyError(f"{col} not existing in df")
+    if df[group_by].isnull().values.any():
+        raise ValueError("group_by contains missing values")
+    if df[col_datetime].isnull().values.any():
+        raise ValueError("col_datetime contains missing values")
+
+    try:
+        # anchor of every cluster: the earliest anchor measurement, on int64 nanoseconds
+        codes, uniques = pd.factorize(df[group_by])
+        time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        anchor = np.ones(len(time_ns), dtype=bool) if col_anchor is None else df[col_anchor].to_numpy() == 1
+        time_anchor = np.full(len(uniques), np.iinfo(np.int64).max)
+        np.minimum.at(time_anchor, codes[anchor], time_ns[anchor])
+        if np.any(time_anchor == np.iinfo(np.int64).max):
+            raise ValueError(f"{col_anchor} is not 1 in every {group_by}")
+
+        df[col_relative] = (time_ns - time_anchor[codes]).view('datetime64[ns]')  # since 1970/01/01
+        return df
+
+    except Exception as e:
+        return e
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+def df_sort_cluster(df: pd.DataFrame, group_by: str = None, col_datetime: str = None):
+    """
+    Function to put the dataframe in the canonical (cluster, time) order, with the offsets of every cluster, so the
+    rows of cluster i are df.iloc[offsets[i]:offsets[i + 1]]. The order, the offsets and the sorted clusters are stored
+    in df.attrs['cluster_index'], the cluster codes follow from them (see pre.cluster_codes). A dataframe that is
+    already in this order, also after selecting rows, is returned without sorting, which is checked in one pass over
+    the cluster codes and time.
+    :param df: (pandas DataFrame) dataframe to sort.
+    :param group_by: (str = None) cluster column, None sorts by time only.
+    :param col_datetime: (str = None) column with the time within every cluster, None sorts by cluster only.
+    :return: ([pandas DataFrame, numpy array]) dataframe in (cluster, time) order with a default index and the offsets
+    of every cluster (length is the number of clusters + 1).
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if not isinstance(col_datetime, (str, type(None))):
+        raise TypeError(f"col_datetime is of type {type(col_datetime).__name__}, should be str or NoneType")
+    if group_by is not None and group_by not in df.columns:
+        raise KeyError("group_by not existing in df")
+    if col_datetime is not None and col_datetime not in df.columns:
+        raise KeyError("col_datetime not existing in df")
+
+    try:
+        n = len(df)
+        if col_datetime is not None:
+            time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        else:
+            time_ns = None
+
+        # reuse the order of preprocessing, if the dataframe is still sorted by (at least) the requested keys
+        cluster_index = df.attrs.get('cluster_index')
+        if cluster_index is not None and cluster_index['group_by'] == group_by and \
+                col_datetime in [None, cluster_index['col_datetime']]:
+            if group_by is not None:
+                codes = pre.cluster_codes(df=df, group_by=group_by)
+                if isinstance(codes, Exception):
+                    raise codes
+                codes = codes[0]
+                same_cluster = np.diff(codes) == 0
+                is_sorted = bool(np.all(np.diff(codes) >= 0))
+            else:
+                same_cluster = np.ones(max(n - 1, 0), dtype=bool)
+                is_sorted = True
+            if is_sorted and time_ns is not None:
+                is_sorted = bool(np.all((np.diff(time_ns) >= 0) | ~same_cluster))
+            if is_sorted:
+                if n == 0:
+                    offsets = np.zeros(1, dtype=np.int64)
+                else:
+                    # the offsets follow from the boundaries of the current cluster codes, the rows or clusters may
+                    # have been selected or edited since preprocessing
+                    offsets = np.concatenate([[0], np.flatnonzero(~same_cluster) + 1, [n]]).astype(np.int64)
+                return [df, offsets]
+
+        # integer cluster codes in sorted order of the clusters, missing clusters last
+        if group_by is not None:
+            codes, uniques = pd.factorize(df[group_by], sort=True)
+            codes = np.where(codes < 0, len(uniques), codes).astype(np.int64)
+            labels = np.asarray(uniques)
+        else:
+            codes = np.zeros(n, dtype=np.int64)
+            labels = None
+
+        # stable sort by cluster and time within the cluster
+        if time_ns is not None:
+            order = np.lexsort((time_ns, codes))
+        else:
+            order = np.argsort(codes, kind='stable')
+        df = df.take(order)
+        df.reset_index(drop=True, inplace=True)
+        codes = codes[order]
+
+        # offsets of every cluster
+        offsets = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1, [n]]).astype(np.int64) if n > 0 \
+            else np.zeros(1, dtype=np.int64)
+        df.attrs['cluster_index'] = {'group_by': group_by, 'col_datetime': col_datetime, 'offsets': offsets,
+                                     'labels': labels}
+
+        return [df, offsets]
+
+    except Exception as e:
+        return e
@@ -1,8 +1,159 @@
+import datetime as dt
+import numpy as np
 import pandas as pd
 
 
+def _factorized_apply(col: pd.Series, func):
+    """
+    Function to apply func only once to every unique value in col. Measurements share few unique dates and times, so
+    parsing the unique values and taking them back by code is much faster than parsing every row.
+    :param col: (pandas Series) column to convert.
+    :param func: (function) conversion of a numpy array with unique values to a datetime64 or timedelta64 array.
+    :return: (numpy array) converted col, missing values are NaT.
+    """
+    codes, uniques = pd.factorize(col)
+    parsed = np.asarray(func(np.asarray(uniques, dtype=object)))
+    # append NaT at the end, so code -1 (missing value) takes NaT
+    parsed = np.append(parsed, np.array(['NaT'], dtype=parsed.dtype))
+    return parsed[codes]
+
+
+def _to_str(uniques):
+    """
+    Function to convert the unique values of a date or time column to strings, except values that are already dates or
+    times. Numbers are written without decimals if they are whole (e.g. 20240201.0 of a column with missing values
+    becomes '20240201'), so numbers are parsed as text (a date 20240201, a time 815) instead of as nanoseconds since the
+    UNIX epoch.
+    :param uniques: (numpy array) unique values.
+    :return: (numpy array) values as str, or as date or time.
+    """
+    values = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        if isinstance(value, (dt.date, dt.time, np.datetime64, pd.Timestamp)):
+            values[i] = value
+        elif isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool) and \
+                float(value).is_integer():
+            values[i] = str(int(value))
+        else:
+            values[i] = str(value)
+    return values
+
+
+def _to_date(col: pd.Series, format_date: str = None):
+    """
+    Function to convert a date column to datetime64[ns] at midnight. Excel date cells (datetime64 or datetime.date) are
+    converted without going through strings, numbers (e.g. 20240201) are parsed as text.
+    :param col: (pandas Series) column containing date.
+    :param format_date: (str = None) format of the date.
+    :return: (numpy array) dates in datetime64[ns].
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col.dt.normalize().to_numpy(dtype='datetime64[ns]')
+    return _factorized_apply(
+        col=col,
+        func=lambda uniques: pd.to_datetime(_to_str(uniques), format=format_date).normalize().to_numpy(
+            dtype='datetime64[ns]'),
+    )
+
+
+def _to_timedelta(col: pd.Series, format_time: str = None):
+    """
+    Function to convert a time column to timedelta64[ns] since midnight. Excel time cells (timedelta64, datetime64 or
+    datetime.time) are converted without going through strings. Numbers (e.g. 815) need format_time, they are not
+    read as a duration in nanoseconds.
+    :param col: (pandas Series) column containing time.
+    :param format_time: (str = None) format of the time.
+    :return: (numpy array) times in timedelta64[ns].
+    """
+    if pd.api.types.is_timedelta64_dtype(col):
+        return col.to_numpy(dtype='timedelta64[ns]')
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return (col - col.dt.normalize()).to_numpy(dtype='timedelta64[ns]')
+
+    def parse(uniques):
+        if all(isinstance(value, dt.time) for value in uniques):
+            # datetime.time from Excel, in microseconds since midnight
+            return np.array(
+                [((value.hour * 60 + value.minute) * 60 + value.second) * 10 ** 6 + value.microsecond
+                 for value in uniques],
+                dtype='timedelta64[us]',
+            ).astype('timedelta64[ns]')
+        values = _to_str(uniques).astype(str)
+        if format_time is None:
+            numbers = [value for value in values if value.replace('.', '', 1).isdigit()]
+            if numbers:
+                # pd.to_timedelta would read a number as nanoseconds
+                raise ValueError(f"time {numbers[0]} is a number, format_strftime is needed (e.g. '%Y%m%d %H%M')")
+            try:
+                return pd.to_timedelta(values).to_numpy(dtype='timedelta64[ns]')
+            except ValueError:
+                pass    # not in [days] hh:mm:ss format, parse as datetime
+        datetimes = pd.to_datetime(values, format=format_time)
+        return (datetimes - datetimes.normalize()).to_numpy(dtype='timedelta64[ns]')
+
+    return _factorized_apply(col=col, func=parse)
+
+
+def _split_format(format_strftime: str, col_time: pd.Series):
+    """
+    Function to split format_strftime in the format of the date column and the format of the time column. The time
+    format is the last tokens (separated by spaces) of format_strftime, as many as the tokens of the time column, so
+    date formats with spaces (e.g. '%d %b %Y %H:%M') and times with AM/PM (e.g. '%d-%m-%Y %I:%M %p') are split
+    correctly.
+    :param format_strftime: (str) format of the date and time.
+    :param col_time: (pandas Series) column containing time.
+    :return: ([str, str]) format of the date and format of the time, [None, None] if format_strftime can not be split.
+    """
+    tokens_format = format_strftime.split()
+    values = col_time.dropna()
+    tokens_time = len(str(values.iloc[0]).split()) if len(values) > 0 and isinstance(values.iloc[0], str) else 1
+    if len(tokens_format) <= tokens_time:
+        return [None, None]
+    return [' '.join(tokens_format[:-tokens_time]), ' '.join(tokens_format[-tokens_time:])]
+
+
+def _to_utc(col: pd.Series, timezone: str = None, cluster: pd.Series = None):
+    """
+    Function to normalise datetimes to naive UTC. Naive local wall-clock times are localised to timezone first, times
+    with an UTC offset in the input are converted directly. Local times that do not exist (skipped hour at the start of
+    daylight saving time) are shifted forward to the end of the skipped hour. Local times in the repeated hour at the
+    end of daylight saving time are resolved from the order of the measurements of every cluster (the measurements of
+    a cluster are in time order in the file), ambiguous times that can not be resolved become NaT.
+    :param col: (pandas Series) column in datetime64[ns], datetime64[ns, tz] or object with mixed UTC offsets.
+    :param timezone: (str = None) IANA time zone of naive local times, e.g. 'Europe/Amsterdam'.
+    :param cluster: (pandas Series = None) cluster of every measurement, None if all measurements are one series.
+    :return: (pandas Series) column in datetime64[ns] in UTC.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(col):
+        # mixed UTC offsets, e.g. '+02:00' in summer and '+01:00' in winter
+        col = pd.to_datetime(col, utc=True)
+    if col.dt.tz is not None:
+        return col.dt.tz_convert('UTC').dt.tz_localize(None)
+
+    def localise(values: pd.Series, ambiguous):
+        return values.dt.tz_localize(timezone, ambiguous=ambiguous, nonexistent='shift_forward') \
+            .dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+    utc = localise(col, ambiguous='NaT')
+    ambiguous = np.isnat(utc) & col.notna().to_numpy()
+    if ambiguous.any():
+        # the repeated hour is inferred from the order of the measurements, only for clusters with ambiguous times
+        codes = np.zeros(len(col), dtype=np.int64) if cluster is None else \
+            pd.factorize(cluster, use_na_sentinel=False)[0]
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(codes.max() + 2))
+        for c in np.unique(codes[ambiguous]):
+            rows = order[bounds[c]:bounds[c + 1]]
+            try:
+                utc[rows] = localise(col.iloc[rows], ambiguous='infer')
+            except Exception:
+                pass    # not in time order, the ambiguous times of the cluster stay NaT
+    return pd.Series(utc, index=col.index)
+
+
 def df_to_datetime(df: pd.DataFrame, separate_datetime: bool, datetime: str = None, time: str = None,
-                   date: str = None, format_strftime: str = None, datetime_unit: str = None):
+                   date: str = None, format_strftime: str = None, datetime_unit: str = None, timezone: str = None,
+                   group_by: str = None):
     """
     Function to convert column in dataframe to datetime64[ns] format. Date and time could be in separate columns or in
     one column. Column will be renamed to 'Datetime'. Format of datetime input can be changed.
@@ -12,9 +163,16 @@ def df_to_datetime(df: pd.DataFrame, separate_datetime: bool, datetime: str = No
     :param time: (str = None) column containing time.
     :param date: (str = None) column containing date.
     :param format_strftime: (str = None) change format input
-    (https://docs.python.org/3/library/datetime.html#strftime-and-strptime-behavior).
+    (https://docs.python.org/3/library/datetime.html#strftime-and-strptime-behavior). If date and time are in separate
+    columns, the time format is the last part of format_strftime with as many space-separated parts as the time
+    column, e.g. '%d-%m-%Y %H:%M' or '%d %b %Y %I:%M %p'.
     :param datetime_unit: (str = None) unit of datetime (D,s,ms,us,ns) after UNIX epoch start (January 1, 1970,
      at 00:00:00 UTC").
+    :param timezone: (str = None) IANA time zone of the measurements, e.g. 'Europe/Amsterdam'. If given, 'Datetime' is
+    normalised to UTC, so it increases monotonically across daylight saving time changes. Local times in the repeated
+    hour at the end of daylight saving time that can not be resolved from the order of the measurements are removed.
+    UNIX timestamps are already in UTC.
+    :param group_by: (str = None) cluster column, the repeated hour is resolved from the order within every cluster.
     :return: (pandas DataFrame) dataframe with colum 'Datetime' in format datetime64[ns].
     """
 
@@ -35,8 +193,19 @@ def df_to_datetime(df: pd.DataFrame, separate_datetime: bool, datetime: str = No
         raise TypeError(f"format_strftime is of type {type(format_strftime).__name__}, should be str or NoneType")
     if not isinstance(datetime_unit, (str, type(None))):
         raise TypeError(f"datetime_unit is of type {type(datetime_unit).__name__}, should be str or NoneType")
+    if not isinstance(timezone, (str, type(None))):
+        raise TypeError(f"timezone is of type {type(timezone).__name__}, should be str or NoneType")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if group_by is not None and group_by not in df.columns:
+        raise KeyError("group_by not existing in df")
 
     try:
+        # separate format of date and time
+        [format_date, format_time] = [None, None]
+        if separate_datetime and format_strftime is not None:
+            [format_date, format_time] = _split_format(format_strftime=format_strftime, col_time=df[time])
+
         # if datetime is in one colum
         if not separate_datetime:
             df[datetime] = pd.to_datetime(
@@ -46,9 +215,8 @@ def df_to_datetime(df: pd.DataFrame, separate_datetime: bool, datetime: str = No
             )
             # rename column time to Datetime
             df.rename(columns={datetime: 'Datetime'}, inplace=True)
-            return df
-        # if date and time is in separate columns
-        elif separate_datetime:
+        # if date and time is in separate columns, with unix timestamps or a format without separate date and time
+        elif separate_datetime and (datetime_unit is not None or (format_strftime is not None and format_date is None)):
             # from object to datetime64[ns] via str
             df[time] = pd.to_datetime(
                 arg=df[date].astype(str) + ' ' + df[time].astype(str),
@@ -59,7 +227,25 @@ def df_to_datetime(df: pd.DataFrame, separate_datetime: bool, datetime: str = No
             df.rename(columns={time: 'Datetime'}, inplace=True)
             # remove column date
             df = df.drop(columns=date)
-            return df
+        # if date and time is in separate columns
+        elif separate_datetime:
+            # datetime64[ns] (date at midnight) + timedelta64[ns] (time since midnight)
+            df[time] = _to_date(col=df[date], format_date=format_date) + \
+                       _to_timedelta(col=df[time], format_time=format_time)
+            # rename column time to Datetime
+            df.rename(columns={time: 'Datetime'}, inplace=True)
+            # remove column date
+            df = df.drop(columns=date)
+
+        # normalise to UTC, ambiguous local times that can not be resolved are removed
+        if timezone is not None and datetime_unit is None:
+            missing = df['Datetime'].isna().to_numpy()
+            df['Datetime'] = _to_utc(col=df['Datetime'], timezone=timezone,
+                                     cluster=df[group_by] if group_by is not None else None)
+            unresolved = df['Datetime'].isna().to_numpy() & ~missing
+            if unresolved.any():
+                df = df.take(np.flatnonzero(~unresolved))
+        return df
 
     except Exception as e:
         return e
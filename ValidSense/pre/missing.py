@@ -1,5 +1,5 @@
 import pandas as pd
-import numpy as np
+from ValidSense import pre
 
 
 def missing(df: pd.DataFrame, subset_col: list = None):
@@ -11,8 +11,6 @@ def missing(df: pd.DataFrame, subset_col: list = None):
     :return: ([pandas Dataframe, pandas Dataframe]) returns dataframes with information about missing values.
     """
 
-    dec_perc = 1    # number of decimals for percentage
-
     # warning
     if not isinstance(df, pd.DataFrame):
         raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
@@ -20,18 +18,16 @@ def missing(df: pd.DataFrame, subset_col: list = None):
         raise TypeError(f"subset_col is of type {type(subset_col).__name__}, should be list or NoneType")
 
     try:
-        # count total rows
-        counts_total = df.shape[0]
-
-        # drop rows with missing values from subsetCol
-        df.dropna(axis=0, how='any', inplace=True, subset=subset_col)
+        # valid rows and counts of missing values
+        [mask, df_counts] = pre.missing_mask(df=df, subset_col=subset_col)
 
-        # missing values
-        counts_missing = counts_total - df.shape[0]
+        # drop rows with missing values from subsetCol, only when there are missing values
+        if not mask.all():
+            df = df[mask]
 
         subset_n_perc = [
-            str(counts_missing) + " (" + str(round(counts_missing / counts_total * 100, dec_perc)) + ")",
-            str(counts_total) + " (" + str(round(counts_total / counts_total * 100, dec_perc)) + ")"
+            str(df_counts['Counts'][row]) + " (" + str(df_counts['Percentage'][row]) + ")"
+            for row in ["Missing measurements", "Total"]
         ]
 
         df_missing = pd.DataFrame(
@@ -0,0 +1,50 @@
+import pandas as pd
+import numpy as np
+
+
+def missing_mask(df: pd.DataFrame, subset_col: list = None):
+    """
+    Function to find rows with missing values (nan), only in the subset of columns, in a single pass. The dataframe is
+    not changed; rows can be removed later with df[mask], and only when mask contains False.
+    :param df: (pandas DataFrame) dataframe with missing values.
+    :param subset_col: (list, default None) subset of columns of dataframe where rows with missing values are invalid.
+    If None, all columns are used.
+    :return: ([numpy array, pandas DataFrame]) boolean row mask (True is valid row) and dataframe with the number and
+    percentage of missing values per column in subset_col, the number of rows with missing values and the total number
+    of rows.
+    """
+
+    dec_perc = 1    # number of decimals for percentage
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(subset_col, (list, type(None))):
+        raise TypeError(f"subset_col is of type {type(subset_col).__name__}, should be list or NoneType")
+    if subset_col is not None and not all(col in df.columns for col in subset_col):
+        raise KeyError("subset_col not existing in df")
+
+    try:
+        if subset_col is None:
+            subset_col = list(df.columns)
+
+        # missing values of all subset columns at once, rows x columns
+        is_missing = df[subset_col].isna().to_numpy()
+
+        # row is valid when none of the subset columns is missing
+        mask = ~is_missing.any(axis=1)
+
+        counts_total = df.shape[0]
+        counts = np.append(is_missing.sum(axis=0), [counts_total - np.count_nonzero(mask), counts_total])
+
+        df_missing = pd.DataFrame(
+            {
+                'Counts': counts,
+                'Percentage': np.round(counts / max(counts_total, 1) * 100, dec_perc),
+            },
+            index=subset_col + ["Missing measurements", "Total"],
+        )
+        return [mask, df_missing]
+
+    except Exception as e:
+        return e
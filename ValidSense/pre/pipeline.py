@@ -0,0 +1,252 @@
+import time
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+def pipeline(df: pd.DataFrame, config: dict):
+    """
+    Function to run all preprocessing steps on one working copy of the dataframe: project the needed columns, rename
+    the Test and Reference device to 'Dev1' and 'Dev2', convert the datetime, remove rows with missing values and
+    calculate the difference and mean. The result is sorted by cluster and time once, see pre.df_sort_cluster, so the
+    analysis and figures do not sort again. The input dataframe is not changed.
+    :param df: (pandas DataFrame) loaded (merged) dataframe.
+    :param config: (dict) preprocessing settings with keys:
+        'test_device' (str) column of the Test device,
+        'ref_device' (str) column of the Reference device,
+        'long_device', 'long_value' (str = None), 'long_key' (list) and 'long_test_label', 'long_ref_label' for data
+        in long format, instead of 'test_device' and 'ref_device', see pre.df_long_to_paired,
+        'group_by' (str = None) cluster column,
+        'columns' (list = None) columns to keep, None keeps all columns,
+        'separate_datetime' (bool = None) None if no datetime is available, otherwise see pre.df_to_datetime,
+        'datetime', 'date', 'time', 'format_strftime', 'datetime_unit', 'timezone' (str = None) see pre.df_to_datetime,
+        'drop_duplicates' (bool = False) remove duplicate measurements with equal cluster, Datetime, Dev1 and Dev2,
+        see pre.df_drop_duplicates, requires datetime,
+        'downsample' (str = None) 'Dev1' or 'Dev2' to downsample high-frequency measurements, see pre.df_downsample,
+        'downsample_window' (str = '1min'), 'downsample_statistic' (str = 'mean') and 'downsample_anchor' (str = None)
+        see pre.df_downsample,
+        'pair' (bool = False) pair unsynchronised Test and Reference measurements by time, see pre.df_pair_asof,
+        'pair_tolerance' (str = None) and 'pair_direction' (str = 'nearest') see pre.df_pair_asof,
+        'subset_col' (list = None) subset of columns (after renaming) where rows with missing values are deleted,
+        'rules' (list = None) rules to remove implausible measurements (after calculating Mean and Diff), see
+        pre.plausibility_mask.
+    :return: ([pandas DataFrame, pandas DataFrame, pandas DataFrame]) preprocessed dataframe, dataframe with the removed
+    measurements of every step (see pre.df_to_datetime, pre.df_long_to_paired, pre.df_drop_duplicates,
+    pre.df_pair_asof, pre.missing_mask and pre.plausibility_mask) and dataframe with the duration of every preprocessing
+    step in seconds. An error of a step is returned as Exception with the name of the step (the keys of the duration
+    dataframe) before the message, for example 'Datetime: ...'.
+    """
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(config, dict):
+        raise TypeError(f"config is of type {type(config).__name__}, should be dict")
+    if config.get('long_device') is None and 'test_device' not in config:
+        raise KeyError("test_device not existing in config")
+    if config.get('long_device') is None and 'ref_device' not in config:
+        raise KeyError("ref_device not existing in config")
+    if config.get('long_device') is not None and not isinstance(config.get('long_key'), list):
+        raise TypeError(f"long_key is of type {type(config.get('long_key')).__name__}, should be list")
+    if not isinstance(config.get('columns'), (list, type(None))):
+        raise TypeError(f"columns is of type {type(config.get('columns')).__name__}, should be list or NoneType")
+    if config.get('pair', False) and config.get('separate_datetime') is None:
+        raise ValueError("pair requires datetime, separate_datetime should not be None")
+    if config.get('downsample') is not None and config.get('separate_datetime') is None:
+        raise ValueError("downsample requires datetime, separate_datetime should not be None")
+    if config.get('drop_duplicates', False) and config.get('separate_datetime') is None:
+        raise ValueError("drop_duplicates requires datetime, separate_datetime should not be None")
+
+    long_device = config.get('long_device')
+    test_device = config.get('test_device')
+    ref_device = config.get('ref_device')
+    group_by = config.get('group_by')
+    separate_datetime = config.get('separate_datetime')
+
+    # columns in the raw dataframe that are required by the preprocessing steps
+    if long_device is None:
+        col_required = [test_device, ref_device, group_by]
+    else:
+        col_required = [long_device, config.get('long_value'), group_by] + config['long_key']
+    if separate_datetime is False:
+        col_required += [config.get('datetime')]
+    elif separate_datetime is True:
+        col_required += [config.get('date'), config.get('time')]
+    for col in col_required:
+        if col is not None and col not in df.columns:
+            raise KeyError(f"{col} not existing in df")
+
+    step = None     # preprocessing step, to report where the preprocessing failed
+    try:
+        timing = {}
+        reports = []    # removed measurements of every step
+
+        if long_device is None:
+            # projection: the only copy of the dataframe, all following steps work in place on this copy
+            step = 'Projection'
+            time_step = time.perf_counter()
+            if config.get('columns') is None:
+                columns = list(df.columns)
+            else:
+                columns = [col for col in df.columns if col in config['columns'] or col in col_required]
+            df = df[columns].copy()
+            timing['Projection'] = time.perf_counter() - time_step
+
+            # rename test and reference device
+            step = 'Rename'
+            time_step = time.perf_counter()
+            df = pre.df_rename_col(df=df, column_name_old=test_device, column_name_new='Dev1')
+            df = pre.df_rename_col(df=df, column_name_old=ref_device, column_name_new='Dev2')
+            timing['Rename'] = time.perf_counter() - time_step
+        else:
+            # long format to Dev1 and Dev2 per key, creates the working copy with the key columns
+            step = 'Long to paired'
+            time_step = time.perf_counter()
+            result = pre.df_long_to_paired(
+                df=df,
+                col_device=long_device,
+                col_value=config.get('long_value'),
+                key_col=config['long_key'],
+                test_label=config.get('long_test_label'),
+                ref_label=config.get('long_ref_label'),
+            )
+            if isinstance(result, Exception):
+                raise result
+            counts_long = int(df[long_device].isin([config.get('long_test_label'),
+                                                    config.get('long_ref_label')]).sum())
+            [df, df_duplicates] = result
+            counts = np.array([counts_long, len(df_duplicates)])
+            reports.append(pd.DataFrame(
+                {'Counts': counts, 'Percentage': np.round(counts / max(counts_long, 1) * 100, 1)},
+                index=["Measurements in long format", "Measurements with duplicate key"],
+            ))
+            timing['Long to paired'] = time.perf_counter() - time_step
+
+        # conversion to datetime
+        step = 'Datetime'
+        time_step = time.perf_counter()
+        if separate_datetime is not None:
+            counts_datetime = len(df)
+            df = pre.df_to_datetime(
+                df=df,
+                separate_datetime=separate_datetime,
+                datetime=config.get('datetime'),
+                date=config.get('date'),
+                time=config.get('time'),
+                format_strftime=config.get('format_strftime'),
+                datetime_unit=config.get('datetime_unit'),
+                timezone=config.get('timezone'),
+                group_by=group_by,
+            )
+            if isinstance(df, Exception):
+                raise df
+            if config.get('timezone') is not None:
+                counts = np.array([counts_datetime - len(df)])
+                reports.append(pd.DataFrame(
+                    {'Counts': counts, 'Percentage': np.round(counts / max(counts_datetime, 1) * 100, 1)},
+                    index=["Ambiguous local times at the end of daylight saving time"],
+                ))
+        timing['Datetime'] = time.perf_counter() - time_step
+
+        # remove duplicate measurements, for example of overlapping files
+        if config.get('drop_duplicates', False):
+            step = 'Duplicates'
+            time_step = time.perf_counter()
+            key_col = [col for col in [group_by, 'Datetime', 'Dev1', 'Dev2'] if col is not None]
+            result = pre.df_drop_duplicates(df=df, key_col=key_col, col_filename='Filename')
+            if isinstance(result, Exception):
+                raise result
+            [df, df_duplicates] = result
+            reports.append(df_duplicates)
+            timing['Duplicates'] = time.perf_counter() - time_step
+
+        # downsample high-frequency measurements
+        if config.get('downsample') is not None:
+            step = 'Downsampling'
+            time_step = time.perf_counter()
+            df = pre.df_downsample(
+                df=df,
+                device=config['downsample'],
+                col_datetime='Datetime',
+                group_by=group_by,
+                window=config.get('downsample_window', '1min'),
+                statistic=config.get('downsample_statistic', 'mean'),
+                anchor=config.get('downsample_anchor'),
+            )
+            if isinstance(df, Exception):
+                raise df
+            timing['Downsampling'] = time.perf_counter() - time_step
+
+        # pair unsynchronised Test and Reference measurements
+        if config.get('pair', False):
+            step = 'Pairing'
+            time_step = time.perf_counter()
+            result = pre.df_pair_asof(
+                df=df,
+                col_datetime='Datetime',
+                test_device='Dev1',
+                ref_device='Dev2',
+                group_by=group_by,
+                tolerance=config.get('pair_tolerance'),
+                direction=config.get('pair_direction', 'nearest'),
+            )
+            if isinstance(result, Exception):
+                raise result
+            [df, df_pairing] = result
+            reports.append(df_pairing)
+            timing['Pairing'] = time.perf_counter() - time_step
+
+        # remove missing values: one validity mask over the subset, applied only when rows are invalid
+        step = 'Missing'
+        time_step = time.perf_counter()
+        result = pre.missing_mask(df=df, subset_col=config.get('subset_col'))
+        if isinstance(result, Exception):
+            raise result
+        [mask, df_missing] = result
+        reports.append(df_missing)
+        if not mask.all():
+            df = df.take(np.flatnonzero(mask))
+        timing['Missing'] = time.perf_counter() - time_step
+
+        # difference and mean
+        step = 'Difference and mean'
+        time_step = time.perf_counter()
+        df = pre.df_diff_mean(df=df, test_device='Dev1', ref_device='Dev2')
+        if isinstance(df, Exception):
+            raise df
+        timing['Difference and mean'] = time.perf_counter() - time_step
+
+        # remove implausible measurements: one mask for all rules, applied only when rows are implausible
+        if config.get('rules'):
+            step = 'Plausibility'
+            time_step = time.perf_counter()
+            result = pre.plausibility_mask(df=df, rules=config['rules'], group_by=group_by, col_datetime='Datetime')
+            if isinstance(result, Exception):
+                raise result
+            [mask, df_rules] = result
+            reports.append(df_rules)
+            if not mask.all():
+                df = df.take(np.flatnonzero(mask))
+            timing['Plausibility'] = time.perf_counter() - time_step
+
+        # canonical (cluster, time) order with cluster codes and offsets, reused by the analysis and figures
+        if group_by is not None or 'Datetime' in df.columns:
+            step = 'Sorting'
+            time_step = time.perf_counter()
+            result = pre.df_sort_cluster(
+                df=df,
+                group_by=group_by,
+                col_datetime='Datetime' if 'Datetime' in df.columns else None,
+            )
+            if isinstance(result, Exception):
+                raise result
+            [df, _] = result
+            timing['Sorting'] = time.perf_counter() - time_step
+
+        df_removed = pd.concat(reports)
+        df_timing = pd.DataFrame({'Time (s)': timing.values()}, index=timing.keys())
+
+        return [df, df_removed, df_timing]
+
+    except Exception as e:
+        return Exception(f"{step}: {e}")
@@ -0,0 +1,118 @@
+import pandas as pd
+import numpy as np
+
+
+def plausibility_mask(df: pd.DataFrame, rules: list, group_by: str = None, col_datetime: str = 'Datetime'):
+    """
+    Function to find implausible measurements (artefacts) with a set of rules, evaluated as vectorised masks. Rules
+    are dicts with key 'rule' and the settings of the rule:
+        {'rule': 'range', 'column': 'Dev1', 'min': 40, 'max': 300, 'abs': False}: value outside [min, max], min or
+        max can be None, with 'abs' True the absolute value is used (e.g. |Diff|).
+        {'rule': 'rate', 'column': 'Dev1', 'max': 20, 'unit': 'min'}: spike, the absolute change compared to both the
+        previous and the next measurement of the same cluster is larger than max per unit of time. A single large
+        change (a step) is plausible, so the first and last measurement of a cluster are never a spike. A change
+        between measurements at the same time has no rate and never exceeds max.
+        {'rule': 'flatline', 'column': 'Dev1', 'min_length': 5}: at least min_length consecutive measurements of the
+        same cluster with an equal value.
+    Missing values are not implausible, see pre.missing_mask. The dataframe is not changed.
+    :param df: (pandas DataFrame) dataframe with measurements.
+    :param rules: (list) list of dicts with rules.
+    :param group_by: (str = None) column in dataframe with clusters, for the 'rate' and 'flatline' rules.
+    :param col_datetime: (str = 'Datetime') column containing both date and time, for the 'rate' and 'flatline'
+    rules.
+    :return: ([numpy array, pandas DataFrame]) boolean row mask (True is plausible row) and dataframe with the number
+    and percentage of implausible measurements per rule and in total.
+    """
+
+    dec_perc = 1    # number of decimals for percentage
+
+    # warning
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"df is of type {type(df).__name__}, should be pandas DataFrame")
+    if not isinstance(rules, list):
+        raise TypeError(f"rules is of type {type(rules).__name__}, should be list")
+    if not isinstance(group_by, (str, type(None))):
+        raise TypeError(f"group_by is of type {type(group_by).__name__}, should be str or NoneType")
+    if group_by is not None and group_by not in df.columns:
+        raise KeyError("group_by not existing in df")
+    for rule in rules:
+        if not isinstance(rule, dict):
+            raise TypeError(f"rule is of type {type(rule).__name__}, should be dict")
+        if rule.get('rule') not in ['range', 'rate', 'flatline']:
+            raise ValueError("rule is not 'range', 'rate' or 'flatline'")
+        if rule.get('column') not in df.columns:
+            raise KeyError(f"column {rule.get('column')} of rule not existing in df")
+        if rule['rule'] in ['rate', 'flatline'] and col_datetime not in df.columns:
+            raise KeyError("col_datetime not existing in df")
+
+    try:
+        counts_total = df.shape[0]
+        mask = np.ones(counts_total, dtype=bool)
+        index = []
+        counts = []
+
+        # order by cluster and time, only once and only when a rule depends on the previous measurement
+        order = None
+        same_cluster = None
+        if any(rule['rule'] in ['rate', 'flatline'] for rule in rules):
+            codes = np.zeros(counts_total, dtype=np.int64) if group_by is None else pd.factorize(df[group_by])[0]
+            time_ns = df[col_datetime].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            order = np.lexsort((time_ns, codes))
+            time_sorted = time_ns[order]
+            same_cluster = np.diff(codes[order]) == 0   # row i + 1 has the same cluster as row i
+
+        for rule in rules:
+            values = df[rule['column']].to_numpy(dtype=float)
+            invalid = np.zeros(counts_total, dtype=bool)
+
+            if rule['rule'] == 'range':
+                if rule.get('abs', False):
+                    values = np.abs(values)
+                if rule.get('min') is not None:
+                    invalid |= values < rule['min']
+                if rule.get('max') is not None:
+                    invalid |= values > rule['max']
+                name = f"Range {'|' + rule['column'] + '|' if rule.get('abs', False) else rule['column']} " \
+                       f"[{rule.get('min')}, {rule.get('max')}]"
+
+            elif rule['rule'] == 'rate':
+                unit_ns = pd.Timedelta(1, unit=rule.get('unit', 'min')).value
+                values_sorted = values[order]
+                step = np.diff(time_sorted) / unit_ns
+                # change i is between measurement i and i + 1, missing values and zero time steps do not exceed max
+                with np.errstate(invalid='ignore'):
+                    exceeds = same_cluster & (step > 0) & (np.abs(np.diff(values_sorted)) > rule['max'] * step)
+                # a measurement is a spike when the changes to the previous and to the next measurement exceed max
+                spike = np.zeros(counts_total, dtype=bool)
+                spike[1:-1] = exceeds[:-1] & exceeds[1:]
+                invalid[order] = spike
+                name = f"Rate {rule['column']} > {rule['max']} per {rule.get('unit', 'min')}"
+
+            elif rule['rule'] == 'flatline':
+                values_sorted = values[order]
+                # a run continues when the cluster and value are equal to the previous measurement
+                new_run = np.concatenate([[True], ~(same_cluster & (np.diff(values_sorted) == 0))])
+                run = np.cumsum(new_run) - 1
+                run_length = np.bincount(run)
+                invalid[order] = run_length[run] >= rule['min_length']
+                name = f"Flat line {rule['column']} >= {rule['min_length']} measurements"
+
+            index.append(rule.get('name', name))
+            counts.append(np.count_nonzero(invalid))
+            mask &= ~invalid
+
+        index.append("Implausible measurements")
+        counts.append(counts_total - np.count_nonzero(mask))
+        counts = np.array(counts)
+
+        df_rules = pd.DataFrame(
+            {
+                'Counts': counts,
+                'Percentage': np.round(counts / max(counts_total, 1) * 100, dec_perc),
+            },
+            index=index,
+        )
+        return [mask, df_rules]
+
+    except Exception as e:
+        return e
@@ -1,5 +1,5 @@
 import streamlit as st
-from ValidSense import load
+from ValidSense import load, pre
 
 ################################################## DEFAULT SETTINGS ###################################################
 fig6 = "ExampleGoodStructureLoading.PNG"
@@ -101,4 +101,5 @@ st.header("Loaded Table")
 st.write("Check if the table is correctly loaded and merged, before continue to the _Preprocessing page_.")
 st.dataframe(df)
 st.session_state.dfLoadMerged = df.copy() # save in session state
+st.session_state.dfLoadMergedFingerprint = pre.df_fingerprint(df)  # cache key of the preprocessing page
 
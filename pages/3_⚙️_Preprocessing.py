@@ -3,6 +3,29 @@ import pandas as pd
 import streamlit as st
 from ValidSense import pre
 
+################################################## DEFAULT SETTINGS ###################################################
+maxEntriesPreprocessing = 10    # number of preprocessed datasets kept in memory, the least recently used is evicted
+cubeBucket = '1h'               # time bucket of the cube of sufficient statistics
+
+
+@st.cache_resource(max_entries=maxEntriesPreprocessing, show_spinner=False)
+def pipeline_cached(fingerprint: str, config: dict, _df: pd.DataFrame):
+    """
+    Cached pre.pipeline, keyed on the fingerprint of the loaded dataset and the preprocessing settings. _df is not
+    hashed. The cached result is returned without copying and should not be changed.
+    """
+    return pre.pipeline(df=_df, config=config)
+
+
+@st.cache_resource(max_entries=maxEntriesPreprocessing, show_spinner=False)
+def cube_cached(fingerprint: str, config: dict, bucket: str, _df: pd.DataFrame):
+    """
+    Cached pre.df_cube of the preprocessed dataset, keyed like pipeline_cached. _df is not hashed. The cube is only
+    kept in memory, with the same number of entries as the preprocessed datasets.
+    """
+    return pre.df_cube(df=_df, group_by=config['group_by'], col_datetime='Datetime', bucket=bucket)
+
+
 ###################################################### STREAMLIT ######################################################
 st.set_page_config(layout="wide", page_title="ValidSense | Preprocessing")
 st.title("⚙️ Preprocessing")
@@ -29,10 +52,15 @@ with info_c.expander("**Explanation of the preprocessing steps**"):
         	* Reference device's measurements.
         	* Cluster variable, such as _Subjects_ (except when using the Classic LoA analysis).
         	* Datetime (when using the Longitudinal analysis).
-        * Rename the Test and Reference device's variable to _Dev1_ and _Dev2_.
+        * Rename the Test and Reference device's variable to _Dev1_ and _Dev2_, or pair the Test and Reference 
+        measurements when the device is indicated in a single variable (long format).
         * Convert Datetime to the standardised datatype, and rename it to _Datetime_.
+        * Optionally, remove duplicate measurements of overlapping files.
+        * Optionally, downsample high-frequency measurements to the mean or median per window.
+        * Optionally, pair unsynchronised Test and Reference measurements by time.
         * Remove missing values in the variables utilised in the LoA analysis.
         * Calculate the Difference and Mean between _Dev1_ and _Dev2_.
+        * Optionally, remove implausible measurements (artefacts) by range, rate of change or flat line.
         """
     )
     st.write(" ")
@@ -80,7 +108,9 @@ with info_c.expander("**Explanation of the preprocessing steps**"):
 
 ########################################### GET VARIABLES FROM SESSION STATE ###########################################
 if 'dfLoadMerged' in st.session_state:
-    df = st.session_state.dfLoadMerged.copy(deep=True)
+    df = st.session_state.dfLoadMerged  # not changed, pre.pipeline works on its own copy
+    if 'dfLoadMergedFingerprint' not in st.session_state:
+        st.session_state.dfLoadMergedFingerprint = pre.df_fingerprint(df)
 else:
     warn_c.error("Data not loaded. Go back to the loading page.")
     df = None
@@ -115,21 +145,63 @@ variablesOptions = [None] + df.columns.array.tolist()  # list with all the optio
 
 st.sidebar.subheader("Select variables")
 
-# test variable
-oldColDev1 = st.sidebar.selectbox(
-    label="Test variable",
-    options=variablesOptions,
-    key='oldColDev1',
-    help="The variable indicating the Test device measurements is renamed to _Dev1_.",
+# layout of the measurements
+layoutOptions = ["Test and Reference in separate variables", "Device in a single variable (long format)"]
+layoutSel = st.sidebar.radio(
+    label="Layout of the measurements",
+    options=layoutOptions,
+    key='layoutSel',
+    help="In long format, every row contains one measurement, and a variable indicates the device. The Test and "
+         "Reference measurements with the same values in the _Variables identifying a pair_ are paired.",
 )
 
-# reference variable
-oldColDev2 = st.sidebar.selectbox(
-    label="Reference variable",
-    options=variablesOptions,
-    key='oldColDev2',
-    help="The variable indicating the Reference device measurements is renamed to _Dev2_.",
-)
+if layoutSel == layoutOptions[0]:
+    # test variable
+    oldColDev1 = st.sidebar.selectbox(
+        label="Test variable",
+        options=variablesOptions,
+        key='oldColDev1',
+        help="The variable indicating the Test device measurements is renamed to _Dev1_.",
+    )
+
+    # reference variable
+    oldColDev2 = st.sidebar.selectbox(
+        label="Reference variable",
+        options=variablesOptions,
+        key='oldColDev2',
+        help="The variable indicating the Reference device measurements is renamed to _Dev2_.",
+    )
+    longDevice = None
+else:
+    oldColDev1 = None
+    oldColDev2 = None
+    # device variable
+    longDevice = st.sidebar.selectbox(
+        label="Device variable",
+        options=variablesOptions,
+        key='longDevice',
+        help="The variable indicating the device of the measurement.",
+    )
+    # measurement variable
+    longValue = st.sidebar.selectbox(
+        label="Measurement variable",
+        options=variablesOptions,
+        key='longValue',
+        help="The variable with the measurements of all devices.",
+    )
+    deviceOptions = [None] if longDevice is None else [None] + list(df[longDevice].dropna().unique())
+    longTestLabel = st.sidebar.selectbox(
+        label="Test device",
+        options=deviceOptions,
+        key='longTestLabel',
+        help="The measurements of the Test device are renamed to _Dev1_.",
+    )
+    longRefLabel = st.sidebar.selectbox(
+        label="Reference device",
+        options=deviceOptions,
+        key='longRefLabel',
+        help="The measurements of the Reference device are renamed to _Dev2_.",
+    )
 
 # cluster variable
 groupBy = st.sidebar.selectbox(
@@ -177,11 +249,35 @@ elif datetimeOptionSel == datetimeOptions[2]:
         key='timeCol',
     )
 
+# variables identifying a pair in long format
+if longDevice is not None:
+    longKeyDef = [groupBy]
+    if datetimeOptionSel == datetimeOptions[1]:  # datetime in single variable
+        longKeyDef.append(datetimeCol)
+    elif datetimeOptionSel == datetimeOptions[2]:  # date and time in separate variables
+        longKeyDef += [dateCol, timeCol]
+    longKey = st.sidebar.multiselect(
+        label="Variables identifying a pair",
+        options=df.columns.array.tolist(),
+        default=[col for col in longKeyDef if col is not None],
+        key='longKey',
+        help="The Test and Reference measurement with the same values in these variables are paired. Pairs with more "
+             "than one measurement of the Test or Reference device are removed. Other variables are not kept.",
+    )
+
 ####################################################### ERRORS ########################################################
 # error and stop if oldColDev1 or oldColDev2 is not selected
-if oldColDev1 is None or oldColDev2 is None:
+if layoutSel == layoutOptions[0] and (oldColDev1 is None or oldColDev2 is None):
     warn_c.error("Select Test and Reference device before continuing")
     st.stop()
+elif layoutSel == layoutOptions[1] and (longDevice is None or longValue is None or longTestLabel is None or
+                                        longRefLabel is None or longTestLabel == longRefLabel):
+    warn_c.error("Select the Device and Measurement variable, and two different Test and Reference devices before "
+                 "continuing")
+    st.stop()
+elif layoutSel == layoutOptions[1] and not all(col in longKey for col in longKeyDef if col is not None):
+    warn_c.error("The cluster and datetime variables should be selected in _Variables identifying a pair_")
+    st.stop()
 
 # error and stop if groupBy is not selected or consist of missing data
 
@@ -200,20 +296,11 @@ elif datetimeOptionSel == datetimeOptions[2]:  # date and time in separate varia
         warn_c.error("Select a date and time variable before continuing")
         st.stop()
 
-########################################### RENAME TEST AND REFERENCE DEVICE ###########################################
-df = pre.df_rename_col(
-    df=df,
-    column_name_old=oldColDev1,
-    column_name_new='Dev1',
-)
-df = pre.df_rename_col(
-    df=df,
-    column_name_old=oldColDev2,
-    column_name_new='Dev2',
-)
-
 ######################################### CONVERSION TYPE AND RENAME DATETIME ##########################################
 # change format and UNIX
+datetimeForm = None
+datetimeUnit = None
+datetimeTimezone = None
 if datetimeOptionSel == datetimeOptions[1] or datetimeOptionSel == datetimeOptions[2]:
     with st.sidebar.expander("**Datetime conversion settings**"):
         # Format
@@ -236,43 +323,113 @@ if datetimeOptionSel == datetimeOptions[1] or datetimeOptionSel == datetimeOptio
             datetimeUnit = 's'  # UNIX is number of seconds passed since January 1, 1970, at 00:00:00 UTC
         else:
             datetimeUnit = None  # false
-
-# conversion to datetime
+        # time zone
+        datetimeTimezone = st.text_input(  # default None
+            label="Time zone",
+            value='None',
+            key='datetimeTimezone',
+            help="Time zone of the measurements, e.g. _Europe/Amsterdam_. The datetime is converted to UTC, so it "
+                 "increases across the daylight saving time changes. Times in the skipped hour are shifted forward, "
+                 "times in the repeated hour are resolved from the order of the measurements of every cluster, and "
+                 "are removed (and reported) if that is not possible. The default value of _None_ keeps the local time."
+        )
+        if datetimeTimezone == 'None':
+            datetimeTimezone = None
+
+# downsample high-frequency measurements of the Test or Reference device
+downsampleDevice = None
+downsampleWindow = '1min'
+downsampleStatistic = 'mean'
+downsampleAnchor = None
+if datetimeOptionSel == datetimeOptions[1] or datetimeOptionSel == datetimeOptions[2]:
+    with st.sidebar.expander("**Downsampling of high-frequency measurements**"):
+        downsampleDevice = st.selectbox(
+            label="High-frequency device",
+            options=[None, 'Dev1', 'Dev2'],
+            format_func=lambda x: {None: 'None', 'Dev1': 'Test device', 'Dev2': 'Reference device'}.get(x),
+            key='downsampleDevice',
+            help="The measurements of this device, for example an arterial line, are summarised per window by the "
+                 "mean or median.",
+        )
+        if downsampleDevice is not None:
+            downsampleWindow = st.text_input(
+                label="Window size",
+                value='1min',
+                key='downsampleWindow',
+                help="For example _10s_ or _1min_. More information: "
+                     "https://pandas.pydata.org/docs/reference/api/pandas.Timedelta.html",
+            )
+            downsampleStatistic = st.selectbox(
+                label="Summary of the window",
+                options=['mean', 'median'],
+                format_func=lambda x: {'mean': 'Mean', 'median': 'Median'}.get(x),
+                key='downsampleStatistic',
+            )
+            if st.checkbox(
+                    label="Window around the measurements of the other device",
+                    value=True,
+                    key='downsampleAround',
+                    help="If selected, the window is centered around every measurement of the other device, which "
+                         "results in paired measurements. Otherwise, the windows are fixed intervals and the "
+                         "measurements can be paired afterwards.",
+            ):
+                downsampleAnchor = 'Dev2' if downsampleDevice == 'Dev1' else 'Dev1'
+            # error and stop if the window size is not a time duration
+            try:
+                if pd.Timedelta(downsampleWindow) <= pd.Timedelta(0):
+                    raise ValueError
+            except ValueError:
+                warn_c.error("The _Window size_ for downsampling is not a positive time duration, such as _1min_.")
+                st.stop()
+
+# pair unsynchronised measurements of the Test and Reference device
+pairAsof = False
+pairTolerance = None
+pairDirection = 'nearest'
+if datetimeOptionSel == datetimeOptions[1] or datetimeOptionSel == datetimeOptions[2]:
+    with st.sidebar.expander("**Pairing of unsynchronised measurements**"):
+        pairAsof = st.checkbox(
+            label="Pair Test and Reference measurements by time",
+            value=False,
+            key='pairAsof',
+            help="Use when the Test and Reference device record at different times, for example in separate files. "
+                 "Every Test measurement is paired with the Reference measurement of the same cluster that is nearest "
+                 "in time. Test measurements without a Reference measurement within the maximal time are removed.",
+        )
+        if pairAsof:
+            pairTolerance = st.text_input(
+                label="Maximal time between paired measurements",
+                value='5min',
+                key='pairTolerance',
+                help="For example _30s_, _5min_ or _1h_. More information: "
+                     "https://pandas.pydata.org/docs/reference/api/pandas.Timedelta.html",
+            )
+            pairDirection = st.selectbox(
+                label="Reference measurement",
+                options=['nearest', 'backward', 'forward'],
+                format_func=lambda x: {'nearest': 'Nearest in time', 'backward': 'At or before the Test measurement',
+                                       'forward': 'At or after the Test measurement'}.get(x),
+                key='pairDirection',
+            )
+            # error and stop if the maximal time is not a time duration
+            try:
+                pd.Timedelta(pairTolerance)
+            except ValueError:
+                warn_c.error("The _Maximal time between paired measurements_ is not a time duration, such as _5min_.")
+                st.stop()
+
+# column names after renaming Dev1, Dev2 and Datetime, without changing df
+renamedCols = {oldColDev1: 'Dev1', oldColDev2: 'Dev2'}
 if datetimeOptionSel == datetimeOptions[1]:  # datetime in single variable
-    df = pre.df_to_datetime(
-        df=df,  # extract out of session state to prevent that name change
-        separate_datetime=False,
-        datetime=datetimeCol,
-        format_strftime=datetimeForm,
-        datetime_unit=datetimeUnit
-    )
+    renamedCols[datetimeCol] = 'Datetime'
 elif datetimeOptionSel == datetimeOptions[2]:  # date and time in separate variables
-    df = pre.df_to_datetime(
-        df=df,  # extract out of session state to prevent that name change
-        separate_datetime=True,
-        date=dateCol,
-        time=timeCol,
-        format_strftime=datetimeForm,
-        datetime_unit=datetimeUnit
-    )
+    renamedCols[timeCol] = 'Datetime'
+if longDevice is None:
+    preprocessedCols = [renamedCols.get(col, col) for col in df.columns]
 else:
-    # undo to step before conversion when something went wrong
-    df = df.copy(deep=True)
-
-# error
-try:
-    st.session_state.dfBeforeMissing = df.copy(deep=True)  # copy to create new object
-except:
-    if datetimeOptionSel == datetimeOptions[1]:  # datetime in single variable
-        warn_c.error("Conversion of Datetime is not possible. Please ensure that the **Datetime variable** is "
-                       "correctly inserted and review the **Datetime type conversion settings** (consider using _None_ "
-                       "for the **format of datetime** whenever applicable).")
-        st.stop()
-    elif datetimeOptionSel == datetimeOptions[2]:  # datetime in single variable
-        warn_c.error("Conversion of Datetime is not possible. Please ensure that the **Date variable** and "
-                       "**Time variable** are correctly inserted and review the **Datetime type conversion settings** "
-                       "(consider using _None_ for the **format of datetime** whenever applicable).")
-        st.stop()
+    preprocessedCols = [renamedCols.get(col, col) for col in longKey] + ['Dev1', 'Dev2']
+if datetimeOptionSel == datetimeOptions[2]:
+    preprocessedCols.remove(dateCol)  # date is merged into Datetime
 
 ################################################## REMOVE MEASUREMENTS #################################################
 st.sidebar.subheader("Remove measurements")
@@ -284,15 +441,70 @@ if loaSelect not in ['Classic', 'Regression of difference']:
 
 subsetCol = st.sidebar.multiselect(
     label="Select variables utilised in the LoA analysis",
-    options=list(df.columns),
+    options=preprocessedCols,
     key='subsetCol',
     default=subsetColDef,
     help="It is not permitted to have missing values in the variables utilised for the LoA analysis. These missing "
          "values should be removed from the dataset."
 )
 
-# remove missing values in the selected variables (used for the LoA analysis)
-df, dfMissing = pre.missing(df=st.session_state.dfBeforeMissing.copy(deep=True), subset_col=subsetCol)
+dropDuplicates = st.sidebar.checkbox(
+    label="Remove duplicate measurements",
+    value=False,
+    key='dropDuplicates',
+    disabled=datetimeOptionSel == datetimeOptions[0],
+    help="Measurements with the same cluster variable, Datetime, _Dev1_ and _Dev2_ as an earlier measurement are "
+         "removed, for example when overlapping files are loaded. The number of duplicates per file is reported. "
+         "Requires a datetime, without it repeated measurements with equal values can not be told apart from "
+         "duplicates.",
+) and datetimeOptionSel != datetimeOptions[0]
+
+# rules for implausible measurements (artefacts)
+plausibilityRules = []
+with st.sidebar.expander("**Implausible measurements**"):
+    if st.checkbox(
+            label="Range of Dev1 and Dev2",
+            value=False,
+            key='ruleRange',
+            help="Measurements of _Dev1_ or _Dev2_ outside the range are removed, for example a systolic blood "
+                 "pressure below 40 or above 300 mmHg.",
+    ):
+        colMin, colMax = st.columns(2)
+        ruleRangeMin = colMin.number_input(label="Minimum", value=40.0, key='ruleRangeMin')
+        ruleRangeMax = colMax.number_input(label="Maximum", value=300.0, key='ruleRangeMax')
+        for col in ['Dev1', 'Dev2']:
+            plausibilityRules.append({'rule': 'range', 'column': col, 'min': ruleRangeMin, 'max': ruleRangeMax})
+    if st.checkbox(
+            label="Maximal absolute difference",
+            value=False,
+            key='ruleDiff',
+            help="Measurements with an absolute difference |Dev1 - Dev2| above the maximum are removed.",
+    ):
+        ruleDiffMax = st.number_input(label="Maximal |Diff|", value=50.0, min_value=0.0, key='ruleDiffMax')
+        plausibilityRules.append({'rule': 'range', 'column': 'Diff', 'abs': True, 'max': ruleDiffMax})
+    if datetimeOptionSel != datetimeOptions[0]:
+        if st.checkbox(
+                label="Maximal rate of change",
+                value=False,
+                key='ruleRate',
+                help="A spike of _Dev1_ or _Dev2_, a measurement that changes more than the maximum per minute "
+                     "compared to both the previous and the next measurement of the same cluster, is removed.",
+        ):
+            ruleRateMax = st.number_input(label="Maximal change per minute", value=20.0, min_value=0.0,
+                                          key='ruleRateMax')
+            for col in ['Dev1', 'Dev2']:
+                plausibilityRules.append({'rule': 'rate', 'column': col, 'max': ruleRateMax, 'unit': 'min'})
+        if st.checkbox(
+                label="Flat line",
+                value=False,
+                key='ruleFlatline',
+                help="Consecutive equal measurements of _Dev1_ or _Dev2_ within the same cluster are removed, for "
+                     "example when a device is disconnected.",
+        ):
+            ruleFlatlineLength = st.number_input(label="Minimal number of equal measurements", value=10, min_value=2,
+                                                 key='ruleFlatlineLength')
+            for col in ['Dev1', 'Dev2']:
+                plausibilityRules.append({'rule': 'flatline', 'column': col, 'min_length': int(ruleFlatlineLength)})
 
 # error
 # if loaSelect != 'Classic' and not all(col in subsetCol for col in ['Dev1', 'Dev2', groupBy]):
@@ -301,40 +513,102 @@ if loaSelect not in ['Classic', 'Regression of difference'] \
     warn_c.error(f"_Dev1_, _Dev2_ and _{groupBy}_ are not selected in _Select variables utilised in the LoA "
                    f"analysis_ to remove these measurements.")
     st.stop()
-# elif loaSelect == 'Classic' and not all(col in subsetCol for col in ['Dev1', 'Dev2']):
-elif loaSelect not in ['Classic', 'Regression of difference'] \
-        and not all(col in subsetCol for col in ['Dev1', 'Dev2']):
-    warn_c.error(f"_Dev1_ and _Dev2_ and are not selected in _Select variables utilised in the LoA analysis_ to "
+# Dev1 and Dev2 are always in subsetCol, so the preprocessed Dev1 and Dev2 (and cluster variable) have no missing values
+elif not all(col in subsetCol for col in ['Dev1', 'Dev2']):
+    warn_c.error(f"_Dev1_ and _Dev2_ are not selected in _Select variables utilised in the LoA analysis_ to "
                    f"remove these measurements.")
     st.stop()
-elif df['Dev1'].isnull().values.any():
-    warn_c.error("Dev1 contains missing measurements that should be removed. Select _Dev1_ in _Select variables "
-                   "utilised in the LoA analysis_ to remove these measurements.")
-    st.stop()
-elif df['Dev2'].isnull().values.any():
-    warn_c.error("Dev2 contains missing measurements that should be removed. Select _Dev2_ in _Select variables "
-                   "utilised in the LoA analysis_ to remove these measurements.")
-    st.stop()
-# elif loaSelect != 'Classic' and df[groupBy].isnull().values.any():
-elif loaSelect not in ['Classic', 'Regression of difference'] \
-        and df[groupBy].isnull().values.any():
-    warn_c.error(f"Cluster variable {groupBy} contains missing measurements that should be removed. Select "
-                   f"_{groupBy}_ in _Select variables utilised in the LoA analysis_ to remove these measurements.")
+
+##################################################### PREPROCESSING ####################################################
+# rename, convert datetime, remove missing values and calculate diff and mean on a single copy of df
+if datetimeOptionSel == datetimeOptions[1]:  # datetime in single variable
+    separateDatetime = False
+elif datetimeOptionSel == datetimeOptions[2]:  # date and time in separate variables
+    separateDatetime = True
+else:
+    separateDatetime = None
+
+preprocessingConfig = {
+    'test_device': oldColDev1,
+    'ref_device': oldColDev2,
+    'long_device': longDevice,
+    'long_value': longValue if longDevice is not None else None,
+    'long_key': longKey if longDevice is not None else None,
+    'long_test_label': longTestLabel if longDevice is not None else None,
+    'long_ref_label': longRefLabel if longDevice is not None else None,
+    'group_by': groupBy,
+    'separate_datetime': separateDatetime,
+    'datetime': datetimeCol if separateDatetime is False else None,
+    'date': dateCol if separateDatetime is True else None,
+    'time': timeCol if separateDatetime is True else None,
+    'format_strftime': datetimeForm,
+    'datetime_unit': datetimeUnit,
+    'timezone': datetimeTimezone,
+    'drop_duplicates': dropDuplicates,
+    'downsample': downsampleDevice,
+    'downsample_window': downsampleWindow,
+    'downsample_statistic': downsampleStatistic,
+    'downsample_anchor': downsampleAnchor,
+    'pair': pairAsof,
+    'pair_tolerance': pairTolerance,
+    'pair_direction': pairDirection,
+    'subset_col': subsetCol,
+    'rules': plausibilityRules,
+}
+
+with info_c, st.spinner(text="Preprocessing..."):
+    preprocessingResult = pipeline_cached(
+        fingerprint=st.session_state.dfLoadMergedFingerprint,
+        config=preprocessingConfig,
+        _df=df,
+    )
+
+# error
+if isinstance(preprocessingResult, Exception):
+    # the pipeline reports the failed step before the message, see pre.pipeline
+    datetimeFailed = str(preprocessingResult).startswith('Datetime:')
+    if datetimeFailed and datetimeOptionSel == datetimeOptions[1]:  # datetime in single variable
+        warn_c.error("Conversion of Datetime is not possible. Please ensure that the **Datetime variable** is "
+                       "correctly inserted and review the **Datetime type conversion settings** (consider using _None_ "
+                       "for the **format of datetime** whenever applicable).")
+    elif datetimeFailed and datetimeOptionSel == datetimeOptions[2]:  # date and time in separate variables
+        warn_c.error("Conversion of Datetime is not possible. Please ensure that the **Date variable** and "
+                       "**Time variable** are correctly inserted and review the **Datetime type conversion settings** "
+                       "(consider using _None_ for the **format of datetime** whenever applicable).")
+    warn_c.error(f"Preprocessing is not possible: {preprocessingResult}")
     st.stop()
 
-################################################# DIFFERENCE AND MEAN #################################################
+[df, dfMissing, dfTiming] = preprocessingResult
 
-# calculate diff and mean + add to df
-df = pre.df_diff_mean(df=df, ref_device='Dev2', test_device='Dev1')
+# df to session_state, df is created by pre.pipeline and shared with the cache (pages 4 and 5 work on a copy)
+st.session_state.dfPreprocessing = df
 
-# df to session_state
-st.session_state.dfPreprocessing = df.copy(deep=True)
+# cube of sufficient statistics per cluster and time bucket, for limits of agreement of subsets without the data
+st.session_state.dfCube = None
+if 'Datetime' in df.columns:
+    dfCube = cube_cached(
+        fingerprint=st.session_state.dfLoadMergedFingerprint,
+        config=preprocessingConfig,
+        bucket=cubeBucket,
+        _df=df,
+    )
+    if not isinstance(dfCube, Exception):
+        st.session_state.dfCube = dfCube
 
 ####################################################### DISPLAY ########################################################
 tabl_c.header("Table of preprocessed dataset")
 tabl_c.dataframe(df)
 
-miss_c.write("**Removed measurements** in counts (percentage): " + str(dfMissing.iloc[0,0]))
+miss_c.write("**Removed measurements** in counts (percentage): " +
+             f"{dfMissing['Counts']['Missing measurements']} ({dfMissing['Percentage']['Missing measurements']})")
+if 'Implausible measurements' in dfMissing.index:
+    miss_c.write("**Implausible measurements** in counts (percentage): " +
+                 f"{dfMissing['Counts']['Implausible measurements']} "
+                 f"({dfMissing['Percentage']['Implausible measurements']})")
+with miss_c.expander("**Removed measurements per preprocessing step**"):
+    st.table(dfMissing)
+with miss_c.expander("**Duration of the preprocessing steps**"):
+    st.table(dfTiming)
 
 # counts per cluster
 try:  # only calculate cluster info when groupBy is not None
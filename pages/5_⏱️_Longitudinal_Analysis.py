@@ -1,9 +1,42 @@
 import pandas as pd
 import streamlit as st
 import numpy as np
-from ValidSense import analysis
+from ValidSense import analysis, pre
 import datetime
 
+################################################## DEFAULT SETTINGS ###################################################
+maxEntriesCube = 50             # number of agreement series from the cube kept in memory, the least recently used is
+                                # evicted
+maxEntriesPerCluster = 10       # number of analyses per cluster kept in memory, the least recently used is evicted
+
+
+@st.cache_resource(max_entries=maxEntriesCube, show_spinner=False)
+def longitudinal_cube_cached(fingerprint: str, window_unit: str, window_size: int, window_stride: int, loa_subtype: str,
+                             group_by: str, clusters: tuple, min_observations: int, _df_cube: pd.DataFrame):
+    """
+    Cached analysis.longitudinal_cube of the requested window size only, from the cube of sufficient statistics of the
+    preprocessing, keyed on the fingerprint of the cube and the settings. _df_cube is not hashed. Returning to a window
+    size calculated before is a lookup, nothing is calculated in the background.
+    """
+    return analysis.longitudinal_cube(df_cube=_df_cube, window_unit=window_unit, window_size=window_size,
+                                      window_stride=window_stride, loa_subtype=loa_subtype, group_by=group_by,
+                                      clusters=list(clusters), min_observations=min_observations)
+
+
+@st.cache_resource(max_entries=maxEntriesPerCluster, show_spinner=False)
+def longitudinal_per_cluster_cached(fingerprint: str, group_by: str, window_unit: str, window_size: int,
+                                    col_datetime: str, window_stride: int, min_observations: int, window_mode: str,
+                                    _df: pd.DataFrame):
+    """
+    Cached analysis.longitudinal_per_cluster, keyed on the fingerprint of the filtered measurements and the settings.
+    _df is not hashed. A rerun of the page with the same settings does not start a new pool of processes.
+    """
+    return analysis.longitudinal_per_cluster(df=_df, group_by=group_by, window_unit=window_unit,
+                                             window_size=window_size, col_datetime=col_datetime,
+                                             window_stride=window_stride, min_observations=min_observations,
+                                             window_mode=window_mode)
+
+
 ###################################################### STREAMLIT ######################################################
 st.set_page_config(layout="wide", page_title="ValidSense toolbox - Time Series Analysis")
 st.title("⏱️Longitudinal Analysis")
@@ -75,11 +108,34 @@ if show_cs.checkbox("Show dataset table"):
     tab_c.dataframe(df)
 
 ################################################# LOA ANALYSIS SETTINGS ################################################
+biasOrderLongitudinal = 0
+loaOrderLongitudinal = 0
 if loaSelect == 'Regression of difference':
-    warn_c.error("The _Regression of difference_ variant of the LoA analysis is unsuitable for longitudinal "
-                 "analysis, as constant agreement over the measurement range is assumed. Please choose the _Classic_, "
-                 "_Repeated measurements_, or _Mixed-effects_ LoA analysis variant on the _Preprocessing page_.")
-    st.stop()
+    with exp_cs.expander("**Regression of difference LoA analysis settings**"):
+        # radio to determine fixed of flexible bias
+        biasOptions = ['Constant bias', 'Non-constant bias']
+        biasSelLongitudinal = st.radio(
+            label="**Bias** over the measurement range is constant or non-constant:",
+            options=biasOptions,
+            key='biasSelLongitudinal',
+            help="The bias of every window can be constant or non-constant over the measurement range. **Constant** "
+                 "means no systematic relationship between the _difference_ and _mean_. **Non-constant** means a "
+                 "linear relationship between the _difference_ and _mean_.",
+        )
+        biasOrderLongitudinal = biasOptions.index(biasSelLongitudinal)
+
+        # radio to determine limits of agreement order of equation
+        loaOptions = ['Constant 95% LoA', 'Non-constant 95% LoA']
+        loaSelLongitudinal = st.radio(
+            label="**95% LoA** over the measurement range is constant or non-constant:",
+            options=loaOptions,
+            key='loaSelLongitudinal',
+            help="The 95% LoA of every window can be constant or non-constant over the measurement range. "
+                 "**Constant** means no systematic relationship between the _difference_ and _mean_. **Non-constant** "
+                 "means a linear relationship between the _difference_ and _mean_. The agreement plot shows the "
+                 "intercepts, the slopes are in the additional information.",
+        )
+        loaOrderLongitudinal = loaOptions.index(loaSelLongitudinal)
 
 if loaSelect == 'Mixed-effect':
     with exp_cs.expander("**Mixed-effect LoA analysis settings**"):
@@ -131,24 +187,73 @@ else:
 with exp_cs.expander("**Longitudinal analysis settings**"):
     st.write(f"Longitudinal analysis is based on the {groupBy} LoA analysis variant.")
 
-    windowUnitOptions = {'D': 'Day(s)', 'h': 'Hour(s)'}  # options for window unit
-    windowUnit = st.selectbox(
-        label="Window unit",
-        options=windowUnitOptions,
-        format_func=lambda x: windowUnitOptions.get(x),
+    windowModeOptions = {'Time': 'Time span', 'Observations': 'Number of measurements',
+                         'Clusters': f'Number of {groupBy}'}  # options for window type
+    windowMode = st.selectbox(
+        label="Window type",
+        options=windowModeOptions,
+        format_func=lambda x: windowModeOptions.get(x),
         index=0,
-        key='windowUnit',
-        help="Select window size unit. More information:"
-             "https://numpy.org/doc/stable/reference/arrays.datetime.html#datetime-units"
+        key='windowMode',
+        help=f"Windows of a fixed time span, or adaptive windows with a fixed number of measurements, or of {groupBy} "
+             f"in order of their first measurement. Adaptive windows have a comparable precision."
     )
 
+    timeAxisOptions = {'Datetime': 'Date and time', 'First': f'Time since first measurement of {groupBy}'}
+    if 'EntryBP' in df.columns:
+        timeAxisOptions['EntryBP'] = f'Time since EntryBP of {groupBy}'
+    timeAxis = st.selectbox(
+        label="Time axis",
+        options=timeAxisOptions,
+        format_func=lambda x: timeAxisOptions.get(x),
+        index=0,
+        key='timeAxis',
+        help=f"Window on the date and time, or on the time since the first measurement (or EntryBP) of every "
+             f"{groupBy}, so every window holds the same stage of every {groupBy}. Relative time is shown from "
+             f"1970/01/01."
+    )
+
+    windowUnitOptions = {'W': 'Week(s)', 'D': 'Day(s)', 'h': 'Hour(s)', 'min': 'Minute(s)', 's': 'Second(s)'}
+    if windowMode == 'Time':
+        windowUnit = st.selectbox(
+            label="Window unit",
+            options=windowUnitOptions,
+            format_func=lambda x: windowUnitOptions.get(x),
+            index=1,
+            key='windowUnit',
+            help="Select window size unit. More information:"
+                 "https://numpy.org/doc/stable/reference/arrays.datetime.html#datetime-units"
+        )
+        windowUnitLabel = windowUnitOptions[windowUnit]
+    else:
+        windowUnit = 'h'  # not used by adaptive windows
+        windowUnitLabel = 'measurements' if windowMode == 'Observations' else str(groupBy)
+
     windowSize = st.text_input(
         label="Window size",
         value=1,
         key='windowSize',
-        help="Select the amount of " + str(windowUnit) + ". The table is filtered based on this window size."
+        help="Select the amount of " + windowUnitLabel + ". The table is filtered based on this window size."
+        )
+
+    windowStride = st.text_input(
+        label="Window stride",
+        value=1,
+        key='windowStride',
+        help="Select the amount of " + windowUnitLabel + " between the start of consecutive windows. A stride "
+             "smaller than the window size gives overlapping windows, a larger stride computes fewer windows."
         )
 
+    windowMinObservations = st.number_input(
+        label="Minimal measurements per window",
+        value=2,
+        min_value=2,
+        step=1,
+        key='windowMinObservations',
+        help="Windows with fewer measurements are skipped. With Repeated measurements, windows with fewer than two "
+             f"{groupBy} are skipped as well."
+    )
+
     # filter based on cluster variable
     df_filtered = st.session_state.dfPreprocessing.copy(deep=True)
     group_options_time_series = df_filtered[groupBy].unique()  # unique subjects
@@ -173,29 +278,77 @@ with exp_cs.expander("**Longitudinal analysis settings**"):
         warn_c.error("Window size is not a positive number.")
         st.stop()
 
+    try:
+        windowStride = int(windowStride)
+    except:
+        warn_c.error("Window stride is not of type integer or is empty.")
+        st.stop()
+
+    if windowStride <= 0:
+        warn_c.error("Window stride is not a positive number.")
+        st.stop()
+
     if len(group_selection) == 0:
         warn_c.error(f"The cluster variable for the longitudinal analysis filtering is empty. Please select minimal "
                      f"one _{groupBy}_ before continue.")
         st.stop()
 
     # filter cluster
+    # df is in (cluster, time) order since preprocessing, filtering keeps this order
     df_filtered = df_filtered[df_filtered[groupBy].isin(group_selection)]
-    df_filtered = df_filtered.sort_values([groupBy], ascending=[True])  # sort
 
-    with info_c, st.spinner(text="Calculating longitudinal analysis statistics..."):
-        # get longitudinal analysis statistics and assumptions
-        [dfBiasLoaTime, assumptions, modelBias, modelLoa, modelRep] = analysis.longitudinal_analysis(
-            df=df_filtered,
-            col_datetime='Datetime',
+    # relative time since the anchor of every cluster
+    colTime = 'Datetime'
+    if timeAxis != 'Datetime':
+        colTime = 'TimeRelative'
+        df_filtered = pre.df_relative_time(df=df_filtered, group_by=groupBy, col_datetime='Datetime',
+                                           col_anchor=None if timeAxis == 'First' else timeAxis, col_relative=colTime)
+        if isinstance(df_filtered, Exception):
+            warn_c.error(f"The {timeAxisOptions[timeAxis].lower()} can not be calculated: {df_filtered}")
+            st.stop()
+
+    # Classic and Repeated measurements on calendar time are calculated from the cube, if the window unit is a
+    # multiple of its bucket. Other windows and subtypes are calculated from the measurements.
+    dfBiasLoaTime = None
+    if st.session_state.get('dfCube') is not None and loaSelect in ['Classic', 'Repeated measurements'] and \
+            windowMode == 'Time' and colTime == 'Datetime':
+        result = longitudinal_cube_cached(
+            fingerprint=pre.df_fingerprint(st.session_state.dfCube),
             window_unit=windowUnit,
             window_size=windowSize,
+            window_stride=windowStride,
             loa_subtype=loaSelect,
-            rep_group_by=groupBy,
-            mem_bias_fixed_var=biasFixedLongitudinalVar,
-            mem_bias_random_var=[groupBy],
-            mem_loa_fixed_var=loaFixedLongitudinalVar,
-            mem_loa_random_var=[groupBy]
+            group_by=groupBy,
+            clusters=tuple(group_selection),
+            min_observations=int(windowMinObservations),
+            _df_cube=st.session_state.dfCube,
         )
+        if not isinstance(result, Exception):
+            [dfBiasLoaTime, assumptions] = result
+            [modelBias, modelLoa, modelRep] = [None, None, None]
+
+    if dfBiasLoaTime is None:
+        with info_c, st.spinner(text="Calculating longitudinal analysis statistics..."):
+            # get longitudinal analysis statistics and assumptions
+            [dfBiasLoaTime, assumptions, modelBias, modelLoa, modelRep] = analysis.longitudinal_analysis(
+                df=df_filtered,
+                col_datetime=colTime,
+                window_unit=windowUnit,
+                window_size=windowSize,
+                window_stride=windowStride,
+                window_mode=windowMode,
+                min_observations=int(windowMinObservations),
+                loa_subtype=loaSelect,
+                rep_group_by=groupBy,
+                mem_bias_fixed_var=biasFixedLongitudinalVar,
+                mem_bias_random_var=[groupBy],
+                mem_loa_fixed_var=loaFixedLongitudinalVar,
+                mem_loa_random_var=[groupBy],
+                df_previous=st.session_state.get('dfBiasLoaTime'),  # windows with unchanged data are reused
+                rod_bias_order=biasOrderLongitudinal,
+                rod_loa_order=loaOrderLongitudinal,
+            )
+        st.session_state.dfBiasLoaTime = dfBiasLoaTime  # with fingerprints, for the next run
 
     # error and stop if window is larger than window available in dataset (dfBiasLoaTime is empty)
     if dfBiasLoaTime.empty:
@@ -211,6 +364,28 @@ with exp_cs.expander("**Longitudinal analysis settings**"):
         agree_c.subheader("Additional information of the Longitudinal analysis")
         agree_c.dataframe(dfBiasLoaTime)
 
+    if windowMode != 'Clusters' and st.checkbox(
+            label=f"Show Longitudinal analysis per {groupBy}",
+            help=f"Classic longitudinal analysis of every {groupBy} on its own, with windows from its first "
+                 f"measurement, calculated in parallel processes."):
+        with info_c, st.spinner(text=f"Calculating longitudinal analysis per {groupBy}..."):
+            dfBiasLoaTimeCluster = longitudinal_per_cluster_cached(
+                fingerprint=pre.df_fingerprint(df_filtered),
+                group_by=groupBy,
+                window_unit=windowUnit,
+                window_size=windowSize,
+                col_datetime=colTime,
+                window_stride=windowStride,
+                min_observations=int(windowMinObservations),
+                window_mode=windowMode,
+                _df=df_filtered,
+            )
+        if isinstance(dfBiasLoaTimeCluster, Exception):
+            warn_c.error(f"The longitudinal analysis per {groupBy} can not be calculated: {dfBiasLoaTimeCluster}")
+        else:
+            agree_c.subheader(f"Longitudinal analysis per {groupBy}")
+            agree_c.dataframe(dfBiasLoaTimeCluster)
+
 # add fits and residuals to df if exist in locals and is not None
 if 'modelBias' in locals() and modelBias != None:
     df = analysis.df_add_model_fits_residuals(df, modelBias, 'Bias')
@@ -243,15 +418,61 @@ if show_cs.checkbox(label="Show Agreement plot", value=True,
             key='labelYAgreementPlot',
             help="Change label of the y-axis",
         )
-
+        # kernel-weighted curve instead of windows
+        kernelAgreementPlot = st.checkbox(
+            label="Kernel-weighted agreement curve",
+            value=False,
+            key='kernelAgreementPlot',
+            help="Classic bias and 95% LoA as smooth functions of time, with kernel weights of the measurements "
+                 "instead of hard windows.",
+        )
+        if kernelAgreementPlot:
+            kernelOptions = ['Gaussian', 'Epanechnikov']
+            kernelAgreementPlotKernel = st.selectbox(
+                label="Kernel",
+                options=kernelOptions,
+                index=0,
+                key='kernelAgreementPlotKernel',
+            )
+            kernelAgreementPlotBandwidth = st.text_input(
+                label="Bandwidth",
+                value="1h",
+                key='kernelAgreementPlotBandwidth',
+                help="Standard deviation of the Gaussian kernel or half-width of the Epanechnikov kernel, e.g. 30min, "
+                     "2h or 1D.",
+            )
+            kernelAgreementPlotStep = st.text_input(
+                label="Step between evaluation times",
+                value="10min",
+                key='kernelAgreementPlotStep',
+            )
 
     with info_c, st.spinner(text="Preparing agreement plot..."):
-        figAgreementPlot = analysis.fig_agreement_plot(
-            df_bias_loa_time=dfBiasLoaTime,
-            title_text=titleAgreementPlot,
-            xlabel=labelXAgreementPlot,
-            ylabel=labelYAgreementPlot,
-        )
+        if kernelAgreementPlot:
+            dfKernel = analysis.longitudinal_kernel(
+                df=df_filtered,
+                bandwidth=kernelAgreementPlotBandwidth,
+                grid_step=kernelAgreementPlotStep,
+                kernel=kernelAgreementPlotKernel,
+                col_datetime=colTime,
+            )
+            if isinstance(dfKernel, Exception):
+                warn_c.error(f"The kernel-weighted agreement curve can not be calculated: {dfKernel}")
+                st.stop()
+            figAgreementPlot = analysis.fig_agreement_plot(
+                df_bias_loa_time=dfKernel[0],
+                title_text=titleAgreementPlot,
+                xlabel=labelXAgreementPlot,
+                ylabel=labelYAgreementPlot,
+                col_time='Time',
+            )
+        else:
+            figAgreementPlot = analysis.fig_agreement_plot(
+                df_bias_loa_time=dfBiasLoaTime,
+                title_text=titleAgreementPlot,
+                xlabel=labelXAgreementPlot,
+                ylabel=labelYAgreementPlot,
+            )
 
     # agree_c.header("Agreement plot")
     fileNameTime = str("AgreementPlot" + "_" + "_" + loaSelect.replace(" ","") + "_" +
@@ -261,27 +482,40 @@ if show_cs.checkbox(label="Show Agreement plot", value=True,
                                                        'height': height,'width': width, 'scale': scale}})
 
 #################################################### SELECT WINDOW #####################################################
-# select start time of the window for the Bland-Altman plot
-sliderTimeStart = agree_c.select_slider(
+# select the window for the Bland-Altman plot, by its start time (windows of measurements can start at the same time)
+sliderIndex = agree_c.select_slider(
     label="**Window start time**",
-    options=dfBiasLoaTime['TimeStart'],
-    key='sliderTimeStart',
+    options=dfBiasLoaTime.index,
+    format_func=lambda x: str(dfBiasLoaTime['TimeStart'][x]),
+    key='sliderWindow',
     help="Time-slider to navigate through the agreement plot and show the Bland-Altman plot of a selected time window."
 )
 
 # show the selected time window, in 3 columns
-sliderIndex = dfBiasLoaTime[dfBiasLoaTime['TimeStart'] == sliderTimeStart].index[0]  # extract data from selected window
 col1, col2, col3 = agree_c.columns(3)
 col1.metric(label="Start window", value=str(dfBiasLoaTime['TimeStart'][sliderIndex]))
 col2.metric(label="End window", value=str(dfBiasLoaTime['TimeEnd'][sliderIndex]))
-col3.metric(label="Window size", value=str(str(windowSize) + " " + windowUnitOptions[windowUnit]))
+col3.metric(label="Window size", value=str(str(windowSize) + " " + windowUnitLabel))
 
 # convert dfBiasLoaTime to dfWindow
 [dfBiasLoa, dfWindow] = analysis.extract_df_bias_loa(
     df=df_filtered,
     df_bias_loa_time=dfBiasLoaTime,
-    time_start=sliderTimeStart
+    col_datetime=colTime,
+    window=int(sliderIndex),
+    window_mode=windowMode,
+    group_by=groupBy if windowMode == 'Clusters' else None,
 )
+if loaSelect == 'Regression of difference':
+    # models of the selected window only, for the additional information and the residual plot
+    [_, _, modelBias, modelLoa] = analysis.loa_regression_of_difference(
+        df=dfWindow.copy(),
+        bias_order=biasOrderLongitudinal,
+        loa_order=loaOrderLongitudinal,
+    )
+    for model, name in [(modelBias, 'Bias'), (modelLoa, '95LoA')]:
+        if model is not None:
+            dfWindow = analysis.df_add_model_fits_residuals(dfWindow.copy(), model, name)
 ################################################## BLAND-ALTMAN PLOT ###################################################
 if show_cs.checkbox(label="Show Bland-Altman plot", value=True,
                     help="Based on longitudinal analysis. Shows data of one selected window"):
@@ -353,7 +587,9 @@ if show_cs.checkbox(label="Show Bland-Altman plot", value=True,
             if modelLoa is not None:
                 bland_c.write("**Model 95% LoA**")
                 bland_c.write(modelLoa.summary())
-            if modelRep is not None:
+            if loaSelect == 'Repeated measurements':
+                # ANOVA of the selected window, the longitudinal analysis calculates it without a model
+                [_, _, modelRep] = analysis.loa_repeated_measurements(df=dfWindow.copy(), group_by=groupBy)
                 bland_c.write("**ANOVA model for Repeated Measurements**")
                 bland_c.write(modelRep.anova_summary)
 
@@ -880,7 +1116,7 @@ if show_cs.checkbox(label="Show Time series plot", value=True, help="Independent
             show_dev2 = show_dev2,
             show_dev1_trend=show_dev1_trend,
             show_dev2_trend=show_dev2_trend,
-            # entry_bp = 'EntryBP',
+            entry_bp='EntryBP' if timeAxis == 'EntryBP' else None,  # aligned as the longitudinal analysis
             window_size_trendline=window_size_trendline,
             xlabel=labelXTimeSeries,
             ylabel=labelYTimeSeries,
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def make_measurements():
+    """
+    Factory of random preprocessed measurements with columns 'Sub', 'Datetime', 'Mean' and 'Diff'.
+    :param n: (int = 300) number of measurements.
+    :param seed: (int = 0) seed of the random generator.
+    :param clusters: (int or list = 6) number of clusters 'p1', 'p2', ..., or the names of the clusters.
+    :param span: (int = 72 * 3600) measurements are at a random time in [0, span) units after 2024-01-01.
+    :param unit: (str = 's') unit of span and stagger.
+    :param stagger: (int = 0) start of every next cluster, in unit, for clusters measured in overlapping periods.
+    :param cluster_effect: (list = None) shift of Diff of every cluster.
+    :param slope: (float = 0.0) proportional bias, Diff increases with slope * Mean.
+    :param offset: (float = 0.0) offset of Mean and Diff, for numerically hard data.
+    """
+    def make(n=300, seed=0, clusters=6, span=72 * 3600, unit='s', stagger=0, cluster_effect=None, slope=0.0,
+             offset=0.0):
+        rng = np.random.default_rng(seed)
+        labels = np.array([f'p{i}' for i in range(1, clusters + 1)] if isinstance(clusters, int) else clusters)
+        code = rng.integers(0, len(labels), n)
+        time = stagger * code + rng.integers(0, span, n)
+        mean = rng.normal(100, 10, n) + offset
+        diff = rng.normal(0.5, 2, n) + slope * mean + offset
+        if cluster_effect is not None:
+            diff += np.asarray(cluster_effect, dtype=float)[code]
+        return pd.DataFrame({
+            'Sub': labels[code],
+            'Datetime': pd.Timestamp('2024-01-01') + pd.to_timedelta(time, unit=unit),
+            'Mean': mean,
+            'Diff': diff,
+        })
+
+    return make
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from ValidSense import analysis, pre
+
+
+def values(df_bias_loa):
+    return df_bias_loa[['Bias', 'UpperLoA', 'LowerLoA']].to_numpy(dtype=float)
+
+
+def test_loa_cube_same_as_loa_functions(make_measurements):
+    df = make_measurements(n=2000, seed=2, slope=0.02)
+    cube = pre.df_cube(df=df, group_by='Sub', bucket='1h')
+    clusters = ['p1', 'p3', 'p4']
+    [time_start, time_end] = [pd.Timestamp('2024-01-01 06:00'), pd.Timestamp('2024-01-02 18:00')]
+    df_subset = df[df['Sub'].isin(clusters) & (df['Datetime'] >= time_start) & (df['Datetime'] < time_end)].copy()
+
+    [classic, _] = analysis.loa_cube(df_cube=cube, group_by='Sub', clusters=clusters, time_start=time_start,
+                                     time_end=time_end)
+    [expected, _] = analysis.loa_classic(df=df_subset.copy())
+    np.testing.assert_allclose(values(classic), values(expected), rtol=1e-9)
+
+    [repeated, _] = analysis.loa_cube(df_cube=cube, loa_subtype='Repeated measurements', group_by='Sub',
+                                      clusters=clusters, time_start=time_start, time_end=time_end)
+    [expected, _, _] = analysis.loa_repeated_measurements(df=df_subset.copy(), group_by='Sub')
+    np.testing.assert_allclose(values(repeated), values(expected), rtol=1e-9)
+
+    [rod, _] = analysis.loa_cube(df_cube=cube, loa_subtype='Regression of difference', group_by='Sub',
+                                 clusters=clusters, time_start=time_start, time_end=time_end)
+    expected = analysis.loa_regression_of_difference(df=df_subset.copy(), bias_order=1, loa_order=0)[0]
+    np.testing.assert_allclose(values(rod), values(expected), rtol=1e-9)
+
+
+def test_loa_cube_large_offset(make_measurements):
+    # the sums of squares of the cube do not cancel for a large offset of Diff and Mean
+    df = make_measurements(n=2000, seed=2, slope=0.02, offset=1e8)
+    cube = pre.df_cube(df=df, group_by='Sub', bucket='1h')
+    [classic, _] = analysis.loa_cube(df_cube=cube)
+    [expected, _] = analysis.loa_classic(df=df.copy())
+    np.testing.assert_allclose(values(classic), values(expected), rtol=1e-12)
+    assert abs(classic['UpperLoA']['Intercept'] - classic['Bias']['Intercept']) > 1
+
+    # the slope and the width of the limits of agreement do not depend on the offset
+    [rod, _] = analysis.loa_cube(df_cube=cube, loa_subtype='Regression of difference')
+    expected = analysis.loa_regression_of_difference(df=make_measurements(n=2000, seed=2, slope=0.02), bias_order=1,
+                                                     loa_order=0)[0]
+    np.testing.assert_allclose(rod['Bias']['Slope'], expected['Bias']['Slope'], rtol=1e-6)
+    np.testing.assert_allclose(rod['UpperLoA']['Intercept'] - rod['Bias']['Intercept'],
+                               expected['UpperLoA']['Intercept'] - expected['Bias']['Intercept'], rtol=1e-6)
+
+
+def test_loa_cube_regression_of_difference_needs_data(make_measurements):
+    df = make_measurements(n=2, seed=2, slope=0.02)
+    cube = pre.df_cube(df=df, group_by='Sub', bucket='1h')
+    assert isinstance(analysis.loa_cube(df_cube=cube, loa_subtype='Regression of difference'), ValueError)
+
+    df = make_measurements(n=2000, seed=2, slope=0.02)
+    df['Mean'] = 100.0
+    cube = pre.df_cube(df=df, group_by='Sub', bucket='1h')
+    assert isinstance(analysis.loa_cube(df_cube=cube, loa_subtype='Regression of difference'), ValueError)
+
+
+def test_longitudinal_cube_same_as_longitudinal_analysis(make_measurements):
+    df = make_measurements(n=2000, seed=2, slope=0.02, offset=1e6)
+    cube = pre.df_cube(df=df, group_by='Sub', bucket='1h')
+    for loa_subtype in ['Classic', 'Repeated measurements']:
+        [result, _] = analysis.longitudinal_cube(df_cube=cube, window_unit='h', window_size=6, window_stride=2,
+                                                 loa_subtype=loa_subtype, group_by='Sub')
+        expected = analysis.longitudinal_analysis(df=df.copy(), window_unit='h', window_size=6, window_stride=2,
+                                                  loa_subtype=loa_subtype, rep_group_by='Sub')[0]
+        assert len(result) == len(expected) > 0
+        assert list(result['TimeStart']) == list(expected['TimeStart'])
+        np.testing.assert_allclose(values(result), values(expected), rtol=1e-9)
+
+
+def test_longitudinal_cube_clusters_apart_in_time(make_measurements):
+    # every cluster covers its own day, most windows overlap only one or two clusters
+    df = make_measurements(n=3000, seed=4, slope=0.02)
+    df['Datetime'] += pd.to_timedelta(df['Sub'].str[1:].astype(int) * 20, unit='h')
+    cube = pre.df_cube(df=df, group_by='Sub', bucket='1h')
+    for loa_subtype in ['Classic', 'Repeated measurements']:
+        [result, _] = analysis.longitudinal_cube(df_cube=cube, window_unit='h', window_size=30, window_stride=7,
+                                                 loa_subtype=loa_subtype, group_by='Sub', clusters=['p2', 'p3', 'p5'])
+        df_selected = df[df['Sub'].isin(['p2', 'p3', 'p5'])].copy()
+        expected = analysis.longitudinal_analysis(df=df_selected, window_unit='h', window_size=30, window_stride=7,
+                                                  loa_subtype=loa_subtype, rep_group_by='Sub')[0]
+        assert len(result) == len(expected) > 0
+        assert list(result['TimeStart']) == list(expected['TimeStart'])
+        np.testing.assert_allclose(values(result), values(expected), rtol=1e-9)
+
+
+def test_df_cube_save_load(tmp_path, make_measurements):
+    cube = pre.df_cube(df=make_measurements(n=2000, seed=2, slope=0.02), group_by='Sub', bucket='1h')
+    path = pre.df_cube_save(df_cube=cube, path=str(tmp_path / 'cube.pkl'))
+    cube_loaded = pre.df_cube_load(path=path)
+    pd.testing.assert_frame_equal(cube_loaded, cube)
+    assert cube_loaded.attrs['cube'] == cube.attrs['cube']
+    assert isinstance(pre.df_cube_load(path=str(tmp_path / 'missing.pkl')), Exception)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+def make_df(seed=6):
+    rng = np.random.default_rng(seed)
+    # arterial line every few seconds, Test device every few minutes
+    n_line = 3000
+    n_test = 40
+    line = pd.DataFrame({
+        'Sub': rng.choice(['p1', 'p2'], n_line),
+        'Datetime': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 3 * 3600, n_line), unit='s'),
+        'Dev1': np.nan,
+        'Dev2': rng.normal(80, 10, n_line),
+    })
+    test = pd.DataFrame({
+        'Sub': rng.choice(['p1', 'p2'], n_test),
+        'Datetime': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 3 * 3600, n_test), unit='s'),
+        'Dev1': rng.normal(80, 10, n_test),
+        'Dev2': np.nan,
+    })
+    return pd.concat([line, test], ignore_index=True)
+
+
+def test_fixed_windows_same_as_groupby():
+    df = make_df()
+    line = df[df['Dev2'].notna()]
+    for statistic in ['mean', 'median']:
+        df_downsampled = pre.df_downsample(df=df, device='Dev2', group_by='Sub', window='5min', statistic=statistic)
+        result = df_downsampled[df_downsampled['Dev2'].notna()].set_index(['Sub', 'Datetime']).sort_index()
+        expected = line.groupby(['Sub', line['Datetime'].dt.floor('5min')])['Dev2'].agg([statistic, 'size'])
+        np.testing.assert_allclose(result['Dev2'].to_numpy(), expected[statistic].to_numpy(), rtol=1e-12)
+        np.testing.assert_array_equal(result['Dev2Count'].to_numpy(), expected['size'].to_numpy())
+        assert df_downsampled['Dev1'].notna().sum() == df['Dev1'].notna().sum()
+
+
+def test_windows_around_anchor_same_as_every_anchor():
+    df = make_df()
+    line = df[df['Dev2'].notna()]
+    half = pd.Timedelta('1min')
+    df_downsampled = pre.df_downsample(df=df, device='Dev2', group_by='Sub', window='2min', statistic='median',
+                                       anchor='Dev1')
+    assert len(df_downsampled) == df['Dev1'].notna().sum()
+    for row in df_downsampled.itertuples():
+        values = line[(line['Sub'] == row.Sub) & (line['Datetime'] >= row.Datetime - half) &
+                      (line['Datetime'] <= row.Datetime + half)]['Dev2']
+        assert row.Dev2Count == len(values)
+        if len(values) > 0:
+            np.testing.assert_allclose(row.Dev2, values.median(), rtol=1e-12)
+        else:
+            assert np.isnan(row.Dev2)
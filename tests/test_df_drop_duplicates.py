@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ValidSense import pre
+
+
+def make_df():
+    return pd.DataFrame({
+        'Sub': ['a', 'a', 'a', 'b', 'a'],
+        'Datetime': pd.to_datetime(['2024-01-01 00:00', '2024-01-01 00:05', '2024-01-01 00:00', '2024-01-01 00:00',
+                                    '2024-01-01 00:05']),
+        'Dev1': [120.0, 118.0, 120.0, 120.0, 118.0],
+        'Dev2': [121.0, 119.0, 121.0, 121.0, 119.0],
+        'Filename': ['f1', 'f1', 'f2', 'f2', 'f2'],
+    })
+
+
+def test_drop_duplicates_keeps_first_occurrence():
+    [df, df_duplicates] = pre.df_drop_duplicates(df=make_df(), key_col=['Sub', 'Datetime', 'Dev1', 'Dev2'])
+    assert list(df.index) == [0, 1, 3]
+    assert df_duplicates.loc['Duplicate measurements', 'Counts'] == 2
+    assert df_duplicates.loc['Duplicate measurements: f2', 'Counts'] == 2
+
+
+def test_drop_duplicates_hash_collision_keeps_rows(monkeypatch):
+    # every row gets the same hash: only rows with equal key values are duplicates
+    monkeypatch.setattr(pd.util, 'hash_pandas_object',
+                        lambda obj, index=False: pd.Series(np.zeros(len(obj), dtype=np.uint64)))
+    [df, _] = pre.df_drop_duplicates(df=make_df(), key_col=['Sub', 'Datetime', 'Dev1', 'Dev2'])
+    assert list(df.index) == [0, 1, 3]
+
+
+def test_pipeline_drop_duplicates_requires_datetime():
+    config = {'test_device': 'Dev1', 'ref_device': 'Dev2', 'group_by': 'Sub', 'drop_duplicates': True}
+    with pytest.raises(ValueError):
+        pre.pipeline(df=make_df().drop(columns='Datetime'), config=config)
+
+
+def test_pipeline_drop_duplicates_with_datetime():
+    config = {'test_device': 'Dev1', 'ref_device': 'Dev2', 'group_by': 'Sub', 'drop_duplicates': True,
+              'separate_datetime': False, 'datetime': 'Datetime'}
+    [df, _, _] = pre.pipeline(df=make_df(), config=config)
+    assert len(df) == 3
+
+
+def test_pipeline_reports_failed_step():
+    config = {'test_device': 'Dev1', 'ref_device': 'Dev2', 'group_by': 'Sub', 'separate_datetime': False,
+              'datetime': 'Datetime', 'drop_duplicates': True, 'rules': [{'rule': 'unknown'}]}
+    result = pre.pipeline(df=make_df(), config=config)
+    assert isinstance(result, Exception)
+    assert str(result).startswith('Plausibility:')
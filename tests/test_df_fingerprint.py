@@ -0,0 +1,27 @@
+import pandas as pd
+from ValidSense import pre
+
+
+def test_fingerprint_same_content(make_measurements):
+    df = make_measurements(n=100, seed=11)
+    assert pre.df_fingerprint(df) == pre.df_fingerprint(df.copy())
+    assert pre.df_fingerprint(df) == pre.df_fingerprint(make_measurements(n=100, seed=11))
+
+
+def test_fingerprint_changes_with_content(make_measurements):
+    df = make_measurements(n=100, seed=11)
+    fingerprint = pre.df_fingerprint(df)
+
+    df_value = df.copy()
+    df_value.loc[50, 'Diff'] += 1e-9
+    df_column = df.rename(columns={'Diff': 'Difference'})
+    df_dtype = df.astype({'Sub': 'category'})
+    df_index = df.set_axis(df.index + 1)
+    df_order = df.iloc[::-1]
+    df_rows = df.iloc[:-1]
+    for df_changed in [df_value, df_column, df_dtype, df_index, df_order, df_rows]:
+        assert pre.df_fingerprint(df_changed) != fingerprint
+
+
+def test_fingerprint_of_empty_dataframe():
+    assert pre.df_fingerprint(pd.DataFrame()) != pre.df_fingerprint(pd.DataFrame(columns=['Diff']))
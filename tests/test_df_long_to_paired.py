@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+def make_long_df():
+    return pd.DataFrame({
+        'Sub': ['a', 'a', 'a', 'a', 'a', 'b', 'b', 'b', 'b'],
+        'Datetime': pd.to_datetime(['2024-01-01 00:00', '2024-01-01 00:00', '2024-01-01 00:05', '2024-01-01 00:05',
+                                    '2024-01-01 00:05', '2024-01-01 00:00', '2024-01-01 00:00', '2024-01-01 00:10',
+                                    '2024-01-01 00:00']),
+        'Device': ['Cuff', 'Line', 'Cuff', 'Cuff', 'Line', 'Line', 'Cuff', 'Cuff', 'Other'],
+        'Value': [120.0, 118.0, 121.0, 122.0, 119.0, 90.0, 92.0, 93.0, 1.0],
+    })
+
+
+def test_long_to_paired_pairs_and_removes_duplicate_keys():
+    [df_paired, df_duplicates] = pre.df_long_to_paired(df=make_long_df(), col_device='Device', col_value='Value',
+                                                       key_col=['Sub', 'Datetime'], test_label='Cuff',
+                                                       ref_label='Line')
+    # key (a, 00:05) has two Test measurements, it is reported with all its rows and removed
+    assert list(df_duplicates.index) == [2, 3, 4]
+    expected = pd.DataFrame({
+        'Sub': ['a', 'b', 'b'],
+        'Datetime': pd.to_datetime(['2024-01-01 00:00', '2024-01-01 00:00', '2024-01-01 00:10']),
+        'Dev1': [120.0, 92.0, 93.0],
+        'Dev2': [118.0, 90.0, np.nan],
+    })
+    pd.testing.assert_frame_equal(df_paired, expected)
+
+
+def test_long_to_paired_same_as_pivot(make_measurements):
+    # without duplicate keys the paired format is the pivot of the long format
+    df = make_measurements(n=200, seed=12).drop_duplicates(subset=['Sub', 'Datetime'])
+    df_long = pd.concat([df.assign(Device='Test', Value=df['Mean']), df.assign(Device='Ref', Value=df['Diff'])])
+    df_long = df_long.sample(frac=1, random_state=0).drop(index=df_long.index[:5])
+    [df_paired, df_duplicates] = pre.df_long_to_paired(df=df_long, col_device='Device', col_value='Value',
+                                                       key_col=['Sub', 'Datetime'], test_label='Test',
+                                                       ref_label='Ref')
+    assert df_duplicates.empty
+    expected = df_long.pivot(index=['Sub', 'Datetime'], columns='Device', values='Value')
+    result = df_paired.set_index(['Sub', 'Datetime']).sort_index()
+    np.testing.assert_array_equal(result['Dev1'].to_numpy(), expected['Test'].to_numpy())
+    np.testing.assert_array_equal(result['Dev2'].to_numpy(), expected['Ref'].to_numpy())
+
+
+def test_pipeline_long_device_reports_duplicates():
+    config = {'long_device': 'Device', 'long_value': 'Value', 'long_key': ['Sub', 'Datetime'],
+              'long_test_label': 'Cuff', 'long_ref_label': 'Line', 'group_by': 'Sub', 'separate_datetime': False,
+              'datetime': 'Datetime'}
+    [df, df_removed, _] = pre.pipeline(df=make_long_df(), config=config)
+    # the key without a Reference measurement is removed as missing value
+    assert list(df['Dev1']) == [120.0, 92.0]
+    assert list(df['Dev2']) == [118.0, 90.0]
+    assert df_removed.loc['Measurements in long format', 'Counts'] == 8
+    assert df_removed.loc['Measurements with duplicate key', 'Counts'] == 3
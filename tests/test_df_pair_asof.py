@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+def make_df(n=400, seed=5):
+    rng = np.random.default_rng(seed)
+    # every measurement at its own time
+    minutes = rng.choice(np.arange(10000), n, replace=False)
+    is_test = rng.random(n) < 0.5
+    values = rng.normal(100, 10, n)
+    return pd.DataFrame({
+        'Sub': rng.choice(['p1', 'p2', 'p3'], n),
+        'Datetime': pd.Timestamp('2024-01-01') + pd.to_timedelta(minutes, unit='min'),
+        'Dev1': np.where(is_test, values, np.nan),
+        'Dev2': np.where(is_test, np.nan, values),
+    })
+
+
+def test_pair_asof_same_as_nearest_of_every_test_measurement():
+    df = make_df()
+    tolerance = pd.Timedelta('30min')
+    [df_paired, df_pairing] = pre.df_pair_asof(df=df, group_by='Sub', tolerance='30min')
+
+    expected = []
+    test = df[df['Dev1'].notna()].sort_values('Datetime')
+    ref = df[df['Dev2'].notna()].sort_values('Datetime')  # at equal distance the earlier one, as merge_asof
+    for row in test.itertuples():
+        ref_sub = ref[ref['Sub'] == row.Sub]
+        distance = (ref_sub['Datetime'] - row.Datetime).abs()
+        if len(ref_sub) > 0 and distance.min() <= tolerance:
+            nearest = ref_sub.loc[distance.idxmin()]
+            expected.append([row.Sub, row.Datetime, row.Dev1, nearest['Dev2'], nearest['Datetime']])
+    expected = pd.DataFrame(expected, columns=['Sub', 'Datetime', 'Dev1', 'Dev2', 'DatetimeRef'])
+
+    pd.testing.assert_frame_equal(df_paired[['Sub', 'Datetime', 'Dev1', 'Dev2', 'DatetimeRef']], expected)
+    assert df_pairing['Counts']['Paired measurements'] == len(expected)
+    assert df_pairing['Counts']['Unpaired measurements'] == len(test) - len(expected)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ValidSense import analysis, pre
+
+
+@pytest.fixture
+def df(make_measurements):
+    # 'p10' sorts between 'p1' and 'p2'
+    return make_measurements(n=200, seed=0, clusters=['p1', 'p2', 'p3', 'p10'], span=10000, unit='min')
+
+
+def test_sort_cluster_order_and_offsets(df):
+    [df, offsets] = pre.df_sort_cluster(df=df, group_by='Sub', col_datetime='Datetime')
+    assert list(df.columns) == ['Sub', 'Datetime', 'Mean', 'Diff']
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        assert df['Sub'].iloc[start:end].nunique() == 1
+        assert df['Datetime'].iloc[start:end].is_monotonic_increasing
+    assert list(df['Sub'].iloc[offsets[:-1]]) == sorted(df['Sub'].unique())
+
+
+def test_cluster_codes_after_selecting_rows(df):
+    [df, _] = pre.df_sort_cluster(df=df, group_by='Sub', col_datetime='Datetime')
+    df_selected = df[df['Sub'].isin(['p1', 'p3']) & (df['Diff'] > 0)]
+    [codes, labels] = pre.cluster_codes(df=df_selected, group_by='Sub')
+    assert list(labels[codes]) == list(df_selected['Sub'])
+    [result, offsets] = pre.df_sort_cluster(df=df_selected, group_by='Sub', col_datetime='Datetime')
+    assert result is df_selected
+    assert list(offsets) == [0, int((df_selected['Sub'] == 'p1').sum()), len(df_selected)]
+
+
+def test_cluster_codes_of_unsorted_rows(df):
+    [df, _] = pre.df_sort_cluster(df=df, group_by='Sub', col_datetime='Datetime')
+    df_shuffled = df.sample(frac=1, random_state=1)
+    [codes, labels] = pre.cluster_codes(df=df_shuffled, group_by='Sub')
+    assert list(labels[codes]) == list(df_shuffled['Sub'])
+
+
+def test_analysis_frame_clusters(df):
+    [df, _] = pre.df_sort_cluster(df=df, group_by='Sub', col_datetime='Datetime')
+    af = analysis.AnalysisFrame(df=df[df['Sub'] != 'p2'], group_by='Sub', col_datetime='Datetime')
+    assert list(af.cluster_labels[af.cluster]) == list(df['Sub'][df['Sub'] != 'p2'])
+
+
+def test_bland_altman_plot_does_not_change_df(df):
+    df['Sub'] = df['Sub'].str[1:].astype(int)
+    [df, _] = pre.df_sort_cluster(df=df, group_by='Sub', col_datetime='Datetime')
+    df_before = df.copy()
+    [df_bias_loa, _] = analysis.loa_classic(df=df)
+    analysis.fig_bland_altman_plot(df=df, df_bias_loa=df_bias_loa, group_color='Sub')
+    pd.testing.assert_frame_equal(df, df_before)
+
+
+def test_sort_cluster_offsets_follow_edited_clusters():
+    df = pd.DataFrame({'Sub': ['a', 'a', 'b', 'b'], 'Datetime': pd.date_range('2024-01-01', periods=4, freq='h'),
+                       'Mean': 1.0, 'Diff': 0.0})
+    [df, offsets] = pre.df_sort_cluster(df=df, group_by='Sub', col_datetime='Datetime')
+    assert list(offsets) == [0, 2, 4]
+    df.loc[1, 'Sub'] = 'b'
+    [result, offsets] = pre.df_sort_cluster(df=df, group_by='Sub', col_datetime='Datetime')
+    assert list(offsets) == [0, 1, 4]
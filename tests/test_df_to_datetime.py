@@ -0,0 +1,91 @@
+import datetime as dt
+import pandas as pd
+from ValidSense import pre
+
+
+def test_separate_datetime_format_with_spaces_in_date():
+    df = pd.DataFrame({'Date': ['27 Oct 2024', '28 Oct 2024'], 'Time': ['01:30', '13:45']})
+    df = pre.df_to_datetime(df=df, separate_datetime=True, date='Date', time='Time', format_strftime='%d %b %Y %H:%M')
+    assert list(df['Datetime']) == [pd.Timestamp('2024-10-27 01:30'), pd.Timestamp('2024-10-28 13:45')]
+
+
+def test_separate_datetime_format_with_am_pm():
+    df = pd.DataFrame({'Date': ['27-10-2024', '28-10-2024'], 'Time': ['01:30 AM', '01:45 PM']})
+    df = pre.df_to_datetime(df=df, separate_datetime=True, date='Date', time='Time',
+                            format_strftime='%d-%m-%Y %I:%M %p')
+    assert list(df['Datetime']) == [pd.Timestamp('2024-10-27 01:30'), pd.Timestamp('2024-10-28 13:45')]
+
+
+def test_separate_datetime_equals_string_concatenation():
+    df = pd.DataFrame({'Date': ['01-02-2024', '01-02-2024', '03-02-2024'], 'Time': ['00:00', '23:59', '12:00']})
+    expected = pd.to_datetime(df['Date'] + ' ' + df['Time'], format='%d-%m-%Y %H:%M')
+    df = pre.df_to_datetime(df=df, separate_datetime=True, date='Date', time='Time', format_strftime='%d-%m-%Y %H:%M')
+    assert (df['Datetime'] == expected).all()
+    assert 'Date' not in df.columns
+
+
+def test_separate_datetime_excel_cells():
+    df = pd.DataFrame({'Date': [dt.date(2024, 2, 1), dt.date(2024, 2, 2)], 'Time': [dt.time(8, 15), dt.time(20, 0)]})
+    df = pre.df_to_datetime(df=df, separate_datetime=True, date='Date', time='Time')
+    assert list(df['Datetime']) == [pd.Timestamp('2024-02-01 08:15'), pd.Timestamp('2024-02-02 20:00')]
+
+
+def test_separate_datetime_integer_date_is_not_epoch():
+    df = pd.DataFrame({'Date': [20240201, 20240202], 'Time': ['08:15:00', '20:00:00']})
+    df = pre.df_to_datetime(df=df, separate_datetime=True, date='Date', time='Time')
+    assert list(df['Datetime']) == [pd.Timestamp('2024-02-01 08:15'), pd.Timestamp('2024-02-02 20:00')]
+
+
+def test_separate_datetime_integer_time_needs_format():
+    df = pd.DataFrame({'Date': ['2024-02-01'], 'Time': [815]})
+    result = pre.df_to_datetime(df=df.copy(), separate_datetime=True, date='Date', time='Time')
+    assert isinstance(result, Exception)
+    result = pre.df_to_datetime(df=df.copy(), separate_datetime=True, date='Date', time='Time',
+                                format_strftime='%Y-%m-%d %H%M')
+    assert list(result['Datetime']) == [pd.Timestamp('2024-02-01 08:15')]
+
+
+def make_autumn_df():
+    # 15-minute measurements of two patients around the end of daylight saving time in Europe/Amsterdam, the local
+    # times 02:00-02:45 occur twice
+    local = pd.date_range('2024-10-27 00:00', '2024-10-27 04:00', freq='15min', tz='Europe/Amsterdam')
+    times = local.tz_localize(None).strftime('%Y-%m-%d %H:%M').tolist()
+    return pd.DataFrame({'Sub': ['a'] * len(times) + ['b'] * len(times), 'Datetime': times + times,
+                         'Dev1': 1.0, 'Dev2': 2.0}), local
+
+
+def test_timezone_repeated_hour_is_resolved_per_cluster():
+    [df, local] = make_autumn_df()
+    df = pre.df_to_datetime(df=df, separate_datetime=False, datetime='Datetime', timezone='Europe/Amsterdam',
+                            group_by='Sub')
+    expected = list(local.tz_convert('UTC').tz_localize(None))
+    assert len(df) == 2 * len(local)
+    assert list(df['Datetime'][df['Sub'] == 'a']) == expected
+    assert list(df['Datetime'][df['Sub'] == 'b']) == expected
+    assert df['Datetime'][df['Sub'] == 'a'].is_monotonic_increasing
+    assert 'DatetimeEpoch' not in df.columns
+
+
+def test_timezone_unresolved_repeated_hour_is_removed():
+    # a single measurement at 02:30 can not be placed before or after the change
+    df = pd.DataFrame({'Datetime': ['2024-10-27 01:30', '2024-10-27 02:30', '2024-10-27 03:30'], 'Dev1': 1.0})
+    df = pre.df_to_datetime(df=df, separate_datetime=False, datetime='Datetime', timezone='Europe/Amsterdam')
+    assert list(df['Datetime']) == [pd.Timestamp('2024-10-26 23:30'), pd.Timestamp('2024-10-27 02:30')]
+
+
+def test_timezone_skipped_hour_is_shifted_forward():
+    df = pd.DataFrame({'Datetime': ['2024-03-31 01:45', '2024-03-31 02:15', '2024-03-31 03:15']})
+    df = pre.df_to_datetime(df=df, separate_datetime=False, datetime='Datetime', timezone='Europe/Amsterdam')
+    assert list(df['Datetime']) == [pd.Timestamp('2024-03-31 00:45'), pd.Timestamp('2024-03-31 01:00'),
+                                    pd.Timestamp('2024-03-31 01:15')]
+    assert df['Datetime'].notna().all()
+
+
+def test_pipeline_reports_unresolved_times():
+    df = pd.DataFrame({'Datetime': ['2024-10-27 01:30', '2024-10-27 02:30', '2024-10-27 03:30'], 'Dev1': 1.0,
+                       'Dev2': 2.0})
+    config = {'test_device': 'Dev1', 'ref_device': 'Dev2', 'separate_datetime': False, 'datetime': 'Datetime',
+              'timezone': 'Europe/Amsterdam'}
+    [df, df_removed, _] = pre.pipeline(df=df, config=config)
+    assert len(df) == 2
+    assert df_removed.loc["Ambiguous local times at the end of daylight saving time", 'Counts'] == 1
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+from ValidSense import analysis
+
+
+def make_df():
+    return pd.DataFrame({
+        'Datetime': pd.to_datetime(['2024-01-01 00:00', '2024-01-01 00:30', '2024-01-01 01:00', '2024-01-01 01:30',
+                                    '2024-01-01 02:00']),
+        'Mean': [100.0, 101.0, 102.0, 103.0, 104.0],
+        'Diff': [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+
+def test_window_is_half_open():
+    df = make_df()
+    [df_bias_loa_time, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='h', window_size=1)
+    [df_bias_loa, df_window] = analysis.extract_df_bias_loa(df=df, df_bias_loa_time=df_bias_loa_time,
+                                                           time_start=pd.Timestamp('2024-01-01 01:00'))
+    assert list(df_window['Diff']) == [3.0, 4.0]  # the measurement at TimeEnd belongs to the next window
+    np.testing.assert_allclose(df_bias_loa['Bias']['Intercept'], 3.5)
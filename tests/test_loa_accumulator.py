@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from ValidSense import analysis, pre
+
+
+def values(df_bias_loa):
+    return df_bias_loa[['Bias', 'UpperLoA', 'LowerLoA']].to_numpy(dtype=float)
+
+
+def test_chunks_same_as_all_data(make_measurements):
+    df = make_measurements(n=1000, seed=13, cluster_effect=[0, 1, -1, 2, 0, 3])
+    accumulator = analysis.LoAAccumulator()
+    for start in range(0, len(df), 170):
+        accumulator.update(diff=df['Diff'].iloc[start:start + 170], cluster=df['Sub'].iloc[start:start + 170])
+    np.testing.assert_allclose(values(accumulator.loa_classic()[0]), values(analysis.loa_classic(df=df.copy())[0]),
+                               rtol=1e-10)
+    np.testing.assert_allclose(values(accumulator.loa_repeated_measurements()[0]),
+                               values(analysis.loa_repeated_measurements(df=df.copy(), group_by='Sub')[0]), rtol=1e-10)
+
+
+def test_merge_of_workers_same_as_one_accumulator(make_measurements):
+    # every worker has its own rows, most clusters are spread over several workers
+    df = make_measurements(n=1000, seed=14, clusters=12, cluster_effect=np.linspace(-2, 2, 12), offset=1e6)
+    worker = np.random.default_rng(0).integers(0, 4, len(df))
+    accumulators = [analysis.LoAAccumulator().update(diff=df['Diff'][worker == i], cluster=df['Sub'][worker == i])
+                    for i in range(4)]
+    merged = analysis.LoAAccumulator()
+    for accumulator in [analysis.LoAAccumulator()] + accumulators:    # an empty accumulator changes nothing
+        merged.merge(accumulator)
+    single = analysis.LoAAccumulator().update(diff=df['Diff'], cluster=df['Sub'])
+    assert merged.n == single.n == len(df)
+    assert sorted(merged.cluster_labels) == sorted(single.cluster_labels)
+    np.testing.assert_allclose(values(merged.loa_classic()[0]), values(single.loa_classic()[0]), rtol=1e-12)
+    np.testing.assert_allclose(values(merged.loa_repeated_measurements()[0]),
+                               values(single.loa_repeated_measurements()[0]), rtol=1e-12)
+    np.testing.assert_allclose(values(merged.loa_repeated_measurements()[0]),
+                               values(analysis.loa_repeated_measurements(df=df.copy(), group_by='Sub')[0]), rtol=1e-9)
+
+
+def test_missing_values_are_skipped(make_measurements):
+    df = make_measurements(n=200, seed=15)
+    df.loc[::9, 'Diff'] = np.nan
+    df.loc[::13, 'Sub'] = None
+    accumulator = analysis.LoAAccumulator().update(diff=df['Diff'], cluster=df['Sub'])
+    df_valid = df.dropna(subset=['Diff', 'Sub'])
+    assert accumulator.n == len(df_valid)
+    np.testing.assert_allclose(values(accumulator.loa_repeated_measurements()[0]),
+                               values(analysis.loa_repeated_measurements(df=df_valid.copy(), group_by='Sub')[0]),
+                               rtol=1e-10)
+
+
+def test_from_sums_same_as_update(make_measurements):
+    df = make_measurements(n=500, seed=16)
+    cube = pre.df_cube(df=df, group_by='Sub', bucket='1D')
+    sums = cube.groupby('Sub')[['N', 'SumDiff', 'SumDiff2']].sum()
+    accumulator = analysis.LoAAccumulator.from_sums(n=sums['N'], sum_diff=sums['SumDiff'], sum_diff2=sums['SumDiff2'],
+                                                    cluster_labels=list(sums.index),
+                                                    shift=cube.attrs['cube']['shift_diff'])
+    single = analysis.LoAAccumulator().update(diff=df['Diff'], cluster=df['Sub'])
+    np.testing.assert_allclose(values(accumulator.loa_classic()[0]), values(single.loa_classic()[0]), rtol=1e-10)
+    np.testing.assert_allclose(values(accumulator.loa_repeated_measurements()[0]),
+                               values(single.loa_repeated_measurements()[0]), rtol=1e-10)
+
+
+def test_too_few_clusters_gives_missing_statistics():
+    accumulator = analysis.LoAAccumulator().update(diff=pd.Series([1.0, 2.0, 3.0]), cluster=pd.Series(['a'] * 3))
+    assert np.isnan(values(accumulator.loa_repeated_measurements()[0])).all()
+    assert not np.isnan(values(accumulator.loa_classic()[0])).any()
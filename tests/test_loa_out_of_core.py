@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ValidSense import analysis, pre
+
+
+def values(df_bias_loa):
+    return df_bias_loa[['Bias', 'UpperLoA', 'LowerLoA']].to_numpy(dtype=float)
+
+
+@pytest.fixture
+def df(make_measurements):
+    # device measurements with missing values
+    df = make_measurements(n=1500, seed=17, cluster_effect=[0, 1, -1, 2, 0, 3])
+    df = pd.DataFrame({'Sub': df['Sub'], 'Cuff': df['Mean'] + df['Diff'] / 2, 'Line': df['Mean'] - df['Diff'] / 2})
+    df.loc[::37, 'Cuff'] = np.nan
+    df.loc[::53, 'Line'] = np.nan
+    return df
+
+
+def test_out_of_core_same_as_in_memory(df, tmp_path):
+    # two files, read in chunks that do not align with the files or clusters
+    paths = [str(tmp_path / 'part1.csv'), str(tmp_path / 'part2.csv')]
+    df.iloc[:700].to_csv(paths[0], sep=';', index=False)
+    df.iloc[700:].to_csv(paths[1], sep=';', index=False)
+    [classic, repeated, hist_diff, hist_mean, df_counts] = analysis.loa_out_of_core(
+        path=paths, test_device='Cuff', ref_device='Line', group_by='Sub', chunksize=128, bin_width=0.5)
+
+    df_valid = pre.df_diff_mean(df=df.dropna(), test_device='Cuff', ref_device='Line')
+    np.testing.assert_allclose(values(classic), values(analysis.loa_classic(df=df_valid.copy())[0]), rtol=1e-10)
+    np.testing.assert_allclose(values(repeated),
+                               values(analysis.loa_repeated_measurements(df=df_valid.copy(), group_by='Sub')[0]),
+                               rtol=1e-10)
+
+    # histograms with the counts of np.histogram on the same bins
+    for hist, column in [(hist_diff, 'Diff'), (hist_mean, 'Mean')]:
+        assert hist['Counts'].sum() == len(df_valid)
+        edges = np.append(hist['BinStart'].to_numpy(), hist['BinEnd'].iloc[-1])
+        counts = np.histogram(df_valid[column], bins=np.arange(edges[0], edges[-1] + 0.25, 0.5))[0]
+        assert list(hist['Counts']) == list(counts[counts > 0])
+
+    assert list(df_counts['Counts']) == [len(df), len(df) - len(df_valid)]
+
+
+def test_out_of_core_without_clusters(df, tmp_path):
+    path = str(tmp_path / 'data.csv')
+    df.to_csv(path, sep=';', index=False)
+    [classic, repeated, _, _, _] = analysis.loa_out_of_core(path=path, test_device='Cuff', ref_device='Line')
+    df_valid = pre.df_diff_mean(df=df.dropna(), test_device='Cuff', ref_device='Line')
+    np.testing.assert_allclose(values(classic), values(analysis.loa_classic(df=df_valid.copy())[0]), rtol=1e-10)
+    assert repeated is None
+
+
+def test_out_of_core_parquet_same_as_csv(df, tmp_path):
+    pytest.importorskip('pyarrow')
+    df.to_csv(str(tmp_path / 'data.csv'), sep=';', index=False)
+    df.to_parquet(str(tmp_path / 'data.parquet'), index=False)
+    result_csv = analysis.loa_out_of_core(path=str(tmp_path / 'data.csv'), test_device='Cuff', ref_device='Line',
+                                          group_by='Sub', chunksize=200)
+    result_parquet = analysis.loa_out_of_core(path=str(tmp_path / 'data.parquet'), test_device='Cuff',
+                                              ref_device='Line', group_by='Sub', chunksize=200)
+    for expected, result in zip(result_csv, result_parquet):
+        pd.testing.assert_frame_equal(result, expected)
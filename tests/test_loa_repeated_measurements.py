@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from ValidSense import analysis
+
+
+def test_analysis_frame_same_as_dataframe(make_measurements):
+    df = make_measurements(n=300, seed=1, clusters=5, cluster_effect=[0, 1, -1, 2, 0])
+    [bias_df, assumptions_df, model_df] = analysis.loa_repeated_measurements(df=df.copy(), group_by='Sub')
+    [bias_af, assumptions_af, model_af] = analysis.loa_repeated_measurements(
+        df=analysis.AnalysisFrame(df, group_by='Sub'), group_by='Sub')
+    assert assumptions_af == assumptions_df
+    assert list(bias_af.columns) == list(bias_df.columns)
+    np.testing.assert_allclose(bias_af.to_numpy(dtype=float), bias_df.to_numpy(dtype=float), rtol=1e-10)
+    assert type(model_af) is type(model_df)
+    assert list(model_af.anova_summary.index) == list(model_df.anova_summary.index)
+    assert list(model_af.anova_summary.columns) == list(model_df.anova_summary.columns)
+    np.testing.assert_allclose(model_af.anova_summary.to_numpy(), model_df.anova_summary.to_numpy(), rtol=1e-10)
+
+
+def test_df_from(make_measurements):
+    df = make_measurements(n=300, seed=1, clusters=5, cluster_effect=[0, 1, -1, 2, 0])
+    assert analysis.df_from(df) is df
+    df_converted = analysis.df_from(analysis.AnalysisFrame(df, group_by='Sub'))
+    pd.testing.assert_frame_equal(df_converted[['Sub', 'Mean', 'Diff']], df[['Sub', 'Mean', 'Diff']])
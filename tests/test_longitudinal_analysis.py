@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ValidSense import analysis
+
+
+@pytest.fixture
+def df(make_measurements):
+    # the clusters are measured in overlapping periods, so the windows hold different numbers of clusters
+    return make_measurements(n=600, seed=3, clusters=8, span=12 * 60, unit='min', stagger=6 * 60,
+                             cluster_effect=0.3 * np.arange(1, 9))
+
+
+def values(df_bias_loa):
+    return df_bias_loa[['Bias', 'UpperLoA', 'LowerLoA']].to_numpy(dtype=float)
+
+
+def windows_by_time(df, df_bias_loa_time):
+    for row in df_bias_loa_time.itertuples():
+        yield row, df[(df['Datetime'] >= row.TimeStart) & (df['Datetime'] < row.TimeEnd)].copy()
+
+
+def test_repeated_measurements_same_as_every_window(df):
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='h', window_size=4,
+                                                          loa_subtype='Repeated measurements', rep_group_by='Sub',
+                                                          min_clusters=3)
+    assert len(result) > 0
+    for row, df_window in windows_by_time(df, result):
+        [expected, _, _] = analysis.loa_repeated_measurements(df=df_window, group_by='Sub')
+        np.testing.assert_allclose([row.Bias, row.UpperLoA, row.LowerLoA], values(expected)[0], rtol=1e-9)
+
+    # the windows with fewer than min_clusters clusters are not calculated
+    starts = pd.date_range(df['Datetime'].min().floor('h'), df['Datetime'].max().ceil('h') - pd.Timedelta('4h'),
+                           freq='h')
+    expected_starts = [start for start in starts if
+                       df[(df['Datetime'] >= start) & (df['Datetime'] < start + pd.Timedelta('4h'))]['Sub'].nunique()
+                       >= 3]
+    assert list(result['TimeStart']) == expected_starts
+
+
+def test_classic_same_as_every_window_and_reuse(df):
+    settings = dict(window_unit='h', window_size=3, window_stride=2)
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), **settings)
+    assert len(result) > 0
+    for row, df_window in windows_by_time(df, result):
+        [expected, _] = analysis.loa_classic(df=df_window)
+        np.testing.assert_allclose([row.Bias, row.UpperLoA, row.LowerLoA], values(expected)[0], rtol=1e-9)
+
+    # rows appended at the end: the reused windows equal a new calculation
+    df_appended = pd.concat([df, df.sample(n=20, random_state=4).assign(Datetime=lambda x: x['Datetime'] +
+                                                                          pd.Timedelta('48h'))], ignore_index=True)
+    [reused, _, _, _, _] = analysis.longitudinal_analysis(df=df_appended.copy(), df_previous=result, **settings)
+    [expected, _, _, _, _] = analysis.longitudinal_analysis(df=df_appended.copy(), **settings)
+    pd.testing.assert_frame_equal(reused, expected)
+
+
+def test_reuse_only_windows_with_unchanged_rows_and_settings(df):
+    settings = dict(window_unit='h', window_size=3, window_stride=1)
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), **settings)
+
+    # marked statistics of df_previous show which windows are reused
+    df_previous = result.assign(Bias=-1.0)
+    df_changed = df.copy()
+    changed = df_changed['Datetime'].idxmin()
+    df_changed.loc[changed, 'Diff'] += 1
+    [reused, _, _, _, _] = analysis.longitudinal_analysis(df=df_changed.copy(), df_previous=df_previous, **settings)
+    [expected, _, _, _, _] = analysis.longitudinal_analysis(df=df_changed.copy(), **settings)
+    contains_changed = (expected['TimeStart'] <= df_changed.loc[changed, 'Datetime']) & \
+                       (expected['TimeEnd'] > df_changed.loc[changed, 'Datetime'])
+    is_reused = (reused['Bias'] == -1.0).to_numpy()
+    assert not is_reused[contains_changed.to_numpy()].any()
+    assert not is_reused[-1]    # the last window is always calculated
+    assert is_reused[~contains_changed.to_numpy()][:-1].all()
+    assert list(reused['Fingerprint'][~contains_changed]) == list(result['Fingerprint'][~contains_changed])
+    pd.testing.assert_frame_equal(reused.drop(columns='Bias'), expected.drop(columns='Bias'))
+
+    # other settings do not reuse the windows
+    [repeated, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), df_previous=df_previous,
+                                                            loa_subtype='Repeated measurements', rep_group_by='Sub',
+                                                            **settings)
+    assert not (repeated['Bias'] == -1.0).any()
+
+
+def test_window_stride_larger_than_window_and_units(df):
+    # windows of 30 minutes every 45 minutes, the measurements between the windows are in no window
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='min', window_size=30,
+                                                          window_stride=45, min_observations=3)
+    first = df['Datetime'].min().floor('min')
+    starts = pd.date_range(first, df['Datetime'].max().ceil('min') - pd.Timedelta('30min'), freq='45min')
+    expected_starts = [start for start in starts
+                       if ((df['Datetime'] >= start) & (df['Datetime'] < start + pd.Timedelta('30min'))).sum() >= 3]
+    assert list(result['TimeStart']) == expected_starts
+    assert (result['TimeEnd'] - result['TimeStart'] == pd.Timedelta('30min')).all()
+    for row, df_window in windows_by_time(df, result):
+        [expected, _] = analysis.loa_classic(df=df_window)
+        np.testing.assert_allclose([row.Bias, row.UpperLoA, row.LowerLoA], values(expected)[0], rtol=1e-9)
+
+    # the same windows in seconds, the measurements are at whole minutes
+    [result_s, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='s', window_size=1800,
+                                                            window_stride=2700, min_observations=3)
+    pd.testing.assert_frame_equal(result_s[['Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd']],
+                                  result[['Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd']])
+
+
+def test_window_unit_weeks_and_unknown_unit(df):
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='W', window_size=1)
+    assert list(result['TimeStart']) == [df['Datetime'].min().floor('7D')]
+    [expected, _] = analysis.loa_classic(df=df.copy())
+    np.testing.assert_allclose(values(result)[0], values(expected)[0], rtol=1e-9)
+    with pytest.raises(KeyError):
+        analysis.longitudinal_analysis(df=df.copy(), window_unit='m', window_size=1)
+
+
+def test_extract_windows_of_measurements_with_equal_times(df):
+    df['Datetime'] = df['Datetime'].dt.floor('6h')  # many measurements share their time
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='h', window_size=20,
+                                                          window_stride=10, window_mode='Observations')
+    assert result['TimeStart'].duplicated().any()
+    for window in result.index:
+        [df_bias_loa, df_window] = analysis.extract_df_bias_loa(df=df, df_bias_loa_time=result, window=int(window),
+                                                               window_mode='Observations')
+        assert len(df_window) == 20
+        [expected, _] = analysis.loa_classic(df=df_window.copy())
+        np.testing.assert_allclose(values(df_bias_loa)[0], values(expected)[0], rtol=1e-9)
+
+
+def test_extract_windows_of_clusters(df):
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='h', window_size=3,
+                                                          window_mode='Clusters', loa_subtype='Repeated measurements',
+                                                          rep_group_by='Sub')
+    assert len(result) == 6
+    entry = df.groupby('Sub')['Datetime'].min().sort_values()
+    for window in result.index:
+        [df_bias_loa, df_window] = analysis.extract_df_bias_loa(df=df, df_bias_loa_time=result, window=int(window),
+                                                               window_mode='Clusters', group_by='Sub')
+        clusters = list(entry.index[window:window + 3])
+        assert sorted(df_window['Sub'].unique()) == sorted(clusters)
+        assert len(df_window) == df['Sub'].isin(clusters).sum()
+        [expected, _, _] = analysis.loa_repeated_measurements(df=df_window.copy(), group_by='Sub')
+        np.testing.assert_allclose(values(df_bias_loa)[0], values(expected)[0], rtol=1e-9)
+
+
+def test_regression_of_difference_same_as_every_window(df):
+    for [bias_order, loa_order] in [[0, 0], [1, 0], [0, 1], [1, 1]]:
+        [result, _, _, _, _] = analysis.longitudinal_analysis(
+            df=df.copy(), window_unit='h', window_size=6, window_stride=3, loa_subtype='Regression of difference',
+            rod_bias_order=bias_order, rod_loa_order=loa_order)
+        assert len(result) > 0
+        for row, df_window in windows_by_time(df, result):
+            expected = analysis.loa_regression_of_difference(df=df_window, bias_order=bias_order,
+                                                             loa_order=loa_order)[0]
+            np.testing.assert_allclose([[row.Bias, row.UpperLoA, row.LowerLoA],
+                                        [row.BiasSlope, row.UpperLoASlope, row.LowerLoASlope]],
+                                       values(expected), rtol=1e-8, atol=1e-12)
+
+
+def test_regression_of_difference_default_orders(df):
+    [result, _, _, _, _] = analysis.longitudinal_analysis(df=df.copy(), window_unit='h', window_size=6,
+                                                          loa_subtype='Regression of difference')
+    row, df_window = next(windows_by_time(df, result))
+    expected = analysis.loa_regression_of_difference(df=df_window)[0]
+    np.testing.assert_allclose([row.Bias, row.UpperLoA, row.LowerLoA], values(expected)[0], rtol=1e-8)
+
+
+def test_per_cluster_same_as_every_cluster_alone(df):
+    columns = ['Bias', 'UpperLoA', 'LowerLoA', 'TimeStart', 'TimeEnd', 'RowStart', 'RowEnd']
+    for max_workers in [1, 2]:
+        result = analysis.longitudinal_per_cluster(df=df, group_by='Sub', window_unit='h', window_size=2,
+                                                   window_stride=1, min_observations=3, max_workers=max_workers)
+        assert sorted(result['Sub'].unique()) == sorted(df['Sub'].unique())
+        for cluster in df['Sub'].unique():
+            [expected, _, _, _, _] = analysis.longitudinal_analysis(df=df[df['Sub'] == cluster].copy(),
+                                                                    window_unit='h', window_size=2, window_stride=1,
+                                                                    min_observations=3, loa_subtype='Classic')
+            result_cluster = result[result['Sub'] == cluster]
+            assert list(result_cluster['Window']) == list(range(len(expected)))
+            pd.testing.assert_frame_equal(result_cluster[columns].reset_index(drop=True),
+                                          expected[columns].reset_index(drop=True), check_dtype=False)
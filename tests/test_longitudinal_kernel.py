@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ValidSense import analysis
+
+
+@pytest.fixture
+def df(make_measurements):
+    # a slow trend on a large offset of the difference
+    df = make_measurements(n=500, seed=7, clusters=1, span=24 * 60, unit='min').drop(columns='Sub')
+    minutes = ((df['Datetime'] - pd.Timestamp('2024-01-01')) / pd.Timedelta('1min')).to_numpy()
+    df['Diff'] += np.sin(minutes / 200) + 1e4
+    return df
+
+
+kernels = {
+    'Gaussian': [lambda u: np.exp(-0.5 * np.square(u)), 4.0],
+    'Epanechnikov': [lambda u: np.maximum(1 - np.square(u), 0), 1.0],
+}
+
+
+def test_direct_same_as_weighted_moments_of_every_evaluation_time(df):
+    bandwidth = pd.Timedelta('1h')
+    for kernel in ['Gaussian', 'Epanechnikov']:
+        [result, _] = analysis.longitudinal_kernel(df=df, bandwidth='1h', grid_step='30min', kernel=kernel,
+                                                   method='Direct')
+        assert len(result) > 0
+        [weight, support] = kernels[kernel]
+        for row in result.itertuples():
+            u = ((df['Datetime'] - row.Time) / bandwidth).to_numpy()
+            w = np.where(np.abs(u) <= support, weight(u), 0)
+            d = df['Diff'].to_numpy()
+            bias = np.sum(w * d) / np.sum(w)
+            std = np.sqrt(np.sum(w * np.square(d - bias)) / (np.sum(w) - np.sum(np.square(w)) / np.sum(w)))
+            np.testing.assert_allclose([row.Bias, row.UpperLoA, row.LowerLoA],
+                                       [bias, bias + 1.96 * std, bias - 1.96 * std], rtol=1e-10)
+            np.testing.assert_allclose(row.EffectiveN, np.sum(w) ** 2 / np.sum(np.square(w)), rtol=1e-10)
+
+
+def test_binned_same_as_direct_on_the_grid(df):
+    # measurements at evaluation times, binning does not move them
+    df['Datetime'] = df['Datetime'].dt.floor('10min')
+    [direct, _] = analysis.longitudinal_kernel(df=df, bandwidth='1h', grid_step='10min', method='Direct')
+    [binned, _] = analysis.longitudinal_kernel(df=df, bandwidth='1h', grid_step='10min', method='Binned')
+    pd.testing.assert_frame_equal(binned, direct, rtol=1e-8)
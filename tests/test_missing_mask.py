@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+def test_missing_mask_only_in_subset(make_measurements):
+    df = make_measurements(n=50, seed=8)
+    df.loc[[1, 2], 'Diff'] = np.nan
+    df.loc[[2, 3], 'Mean'] = np.nan
+    df.loc[4, 'Sub'] = None
+    df_before = df.copy()
+    [mask, df_missing] = pre.missing_mask(df=df, subset_col=['Mean', 'Diff'])
+    assert list(np.flatnonzero(~mask)) == [1, 2, 3]
+    assert list(df_missing.index) == ['Mean', 'Diff', 'Missing measurements', 'Total']
+    assert list(df_missing['Counts']) == [2, 2, 3, 50]
+    assert list(df_missing['Percentage']) == [4.0, 4.0, 6.0, 100.0]
+    pd.testing.assert_frame_equal(df, df_before)
+
+    # all columns without subset
+    [mask, df_missing] = pre.missing_mask(df=df)
+    assert list(np.flatnonzero(~mask)) == [1, 2, 3, 4]
+    assert df_missing.loc['Missing measurements', 'Counts'] == 4
+
+
+def test_missing_same_as_dropna(make_measurements):
+    df = make_measurements(n=50, seed=9)
+    df.loc[df.index % 7 == 0, 'Diff'] = np.nan
+    [df_valid, df_missing] = pre.missing(df=df, subset_col=['Diff'])
+    pd.testing.assert_frame_equal(df_valid, df.dropna(subset=['Diff']))
+    assert df_missing.loc['Missing measurements', 'Removed measurements, counts (%)'] == '8 (16.0)'
+
+
+def test_pipeline_removes_missing_values(make_measurements):
+    df = make_measurements(n=20, seed=10).rename(columns={'Mean': 'Dev1', 'Diff': 'Dev2'})
+    df.loc[[3, 5], 'Dev1'] = np.nan
+    config = {'test_device': 'Dev1', 'ref_device': 'Dev2', 'group_by': 'Sub', 'separate_datetime': False,
+              'datetime': 'Datetime', 'subset_col': ['Dev1', 'Dev2']}
+    [df_pre, df_removed, _] = pre.pipeline(df=df, config=config)
+    assert len(df_pre) == 18
+    assert df_removed.loc['Missing measurements', 'Counts'] == 2
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from ValidSense import pre
+
+
+def make_df(dev1, sub=None, minutes=None):
+    n = len(dev1)
+    return pd.DataFrame({
+        'Sub': ['a'] * n if sub is None else sub,
+        'Datetime': pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(n) if minutes is None else minutes,
+                                                                 unit='min'),
+        'Dev1': np.asarray(dev1, dtype=float),
+        'Dev2': 100.0,
+    })
+
+
+def test_range_rule():
+    df = make_df(dev1=[30.0, 100.0, 350.0, np.nan])
+    df['Diff'] = [0.0, -5.0, 5.0, 0.0]
+    rules = [{'rule': 'range', 'column': 'Dev1', 'min': 40, 'max': 300},
+             {'rule': 'range', 'column': 'Diff', 'abs': True, 'max': 4}]
+    [mask, df_rules] = pre.plausibility_mask(df=df, rules=rules)
+    assert list(mask) == [False, False, False, True]
+    assert list(df_rules['Counts']) == [2, 2, 3]
+
+
+def test_rate_rule_removes_only_the_spike():
+    # the spike at 00:02 is removed, the measurement after it and the step at 00:05 are plausible
+    df = make_df(dev1=[100, 101, 200, 102, 103, 180, 181, 182])
+    [mask, df_rules] = pre.plausibility_mask(df=df, rules=[{'rule': 'rate', 'column': 'Dev1', 'max': 20}],
+                                             group_by='Sub')
+    assert list(mask) == [True, True, False, True, True, True, True, True]
+    assert df_rules['Counts'].iloc[0] == 1
+
+
+def test_rate_rule_per_cluster_and_unit():
+    # the jump between the clusters is no change, 60 per hour is 1 per minute
+    df = make_df(dev1=[100, 130, 100, 200, 100, 200], sub=['a', 'a', 'a', 'b', 'b', 'b'], minutes=[0, 1, 2, 0, 1, 2])
+    rules = [{'rule': 'rate', 'column': 'Dev1', 'max': 60, 'unit': 'h'}]
+    [mask, _] = pre.plausibility_mask(df=df.sample(frac=1, random_state=0), rules=rules, group_by='Sub')
+    [mask_sorted, _] = pre.plausibility_mask(df=df, rules=rules, group_by='Sub')
+    assert list(mask_sorted) == [True, False, True, True, False, True]
+    assert list(mask) == list(mask_sorted[df.sample(frac=1, random_state=0).index])
+
+
+def test_rate_rule_zero_time_step():
+    # a change between measurements at the same time does not exceed the maximum
+    df = make_df(dev1=[100, 200, 100, 100], minutes=[0, 1, 1, 2])
+    [mask, df_rules] = pre.plausibility_mask(df=df, rules=[{'rule': 'rate', 'column': 'Dev1', 'max': 20}],
+                                             group_by='Sub')
+    assert mask.all()
+    assert np.isfinite(df_rules['Percentage']).all()
+
+
+def test_flatline_rule():
+    df = make_df(dev1=[100, 100, 100, 101, 101, 100, 100, 100], sub=['a'] * 4 + ['b'] * 4)
+    [mask, df_rules] = pre.plausibility_mask(df=df, rules=[{'rule': 'flatline', 'column': 'Dev1', 'min_length': 3}],
+                                             group_by='Sub')
+    assert list(mask) == [False, False, False, True, True, False, False, False]
+    assert df_rules['Counts'].iloc[0] == 6
+
+
+def test_pipeline_reports_counts_per_rule():
+    df = make_df(dev1=[100, 101, 200, 102, 103, 30, 104, 105])
+    rules = [{'rule': 'range', 'column': 'Dev1', 'min': 40, 'max': 300},
+             {'rule': 'rate', 'column': 'Dev1', 'max': 20, 'name': 'Spike Dev1'}]
+    config = {'test_device': 'Dev1', 'ref_device': 'Dev2', 'group_by': 'Sub', 'separate_datetime': False,
+              'datetime': 'Datetime', 'rules': rules}
+    [df_pre, df_missing, _] = pre.pipeline(df=df, config=config)
+    assert len(df_pre) == 6
+    assert df_missing.loc['Range Dev1 [40, 300]', 'Counts'] == 1
+    assert df_missing.loc['Spike Dev1', 'Counts'] == 2
+    assert df_missing.loc['Implausible measurements', 'Counts'] == 2